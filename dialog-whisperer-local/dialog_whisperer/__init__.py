@@ -1,3 +1,3 @@
 """Dialog Whisperer package"""
 
-__all__ = ["main", "ocr", "tts", "capture", "gui"]
+__all__ = ["main", "ocr", "tts", "capture", "gui", "aio", "templates", "profiles"]
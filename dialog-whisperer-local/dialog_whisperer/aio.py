@@ -0,0 +1,173 @@
+"""Asyncio API for the capture/OCR/TTS pipeline.
+
+The blocking helpers in ``capture``, ``ocr`` and ``tts`` are wrapped as
+awaitables that run on executors, so they can be embedded in asyncio code.
+``AsyncReader`` replaces the polling threads used by the GUI: it waits on an
+event instead of sleeping, so ``stop()`` takes effect immediately.
+"""
+
+import asyncio
+import contextlib
+import functools
+
+
+async def _run(executor, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def capture_region(bbox=None, executor=None):
+    """Awaitable version of ``capture.capture_region``."""
+    from . import capture
+    return await _run(executor, capture.capture_region, bbox)
+
+
+async def image_to_text(pil_image, executor=None):
+    """Awaitable version of ``ocr.image_to_text``."""
+    from . import ocr
+    return await _run(executor, ocr.image_to_text, pil_image)
+
+
+async def speak(text, rate=None, volume=None, executor=None):
+    """Awaitable version of ``tts.speak``."""
+    from . import tts
+    return await _run(executor, tts.speak, text, rate=rate, volume=volume)
+
+
+class AsyncReader:
+    """Read text from a screen region as an async iterator of new lines.
+
+    Example:
+        reader = AsyncReader((0, 0, 400, 100))
+        async for line in reader:
+            await speak(line)
+
+    Capture/OCR and speech use separate single-worker executors so a long
+    utterance never delays the next capture tick.
+    """
+
+    def __init__(self, bbox, interval=0.5, reference_image=None, conversation_timeout=20):
+        """Create a reader for a region.
+
+        Args:
+            bbox: tuple (left, top, right, bottom)
+            interval: seconds between capture ticks
+            reference_image: optional PIL.Image of the UI; frames similar to it are skipped
+            conversation_timeout: seconds without new text before repeated text is read again
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.bbox = bbox
+        self.interval = interval
+        self.reference_image = reference_image
+        self._matcher = None
+        self.conversation_timeout = conversation_timeout
+        self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-capture")
+        self._speech_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-speech")
+        self._stopped = None
+
+    def _stop_event(self):
+        # Created lazily so the event binds to the loop that runs the reader
+        if self._stopped is None:
+            self._stopped = asyncio.Event()
+        return self._stopped
+
+    def stop(self):
+        """Stop iteration. Safe to call from the event loop thread only."""
+        self._stop_event().set()
+
+    @property
+    def stopped(self):
+        return self._stopped is not None and self._stopped.is_set()
+
+    async def _wait_interval(self):
+        """Sleep for one interval, waking early if the reader is stopped."""
+        try:
+            await asyncio.wait_for(self._stop_event().wait(), self.interval)
+        except asyncio.TimeoutError:
+            pass
+
+    def _matches_reference(self, img):
+        """True if img looks like the UI reference (runs on the capture executor)."""
+        from . import capture
+
+        if self._matcher is None:
+            self._matcher = capture.ReferenceMatcher(self.reference_image)
+        return self._matcher.matches(img)
+
+    async def read_once(self):
+        """Capture the region once and return its text, or None if the UI reference is visible."""
+        img = await capture_region(self.bbox, executor=self._capture_executor)
+        if self.reference_image is not None:
+            # Fingerprinting a frame is numpy work; keep it off the event loop
+            if await _run(self._capture_executor, self._matches_reference, img):
+                return None
+        text = await image_to_text(img, executor=self._capture_executor)
+        return text.strip()
+
+    async def lines(self):
+        """Yield each new non-empty line of text until stopped or cancelled."""
+        loop = asyncio.get_running_loop()
+        stopped = self._stop_event()
+        last_text = None
+        last_activity = loop.time()
+        while not stopped.is_set():
+            try:
+                text = await self.read_once()
+            except Exception as e:
+                print(f"Monitor error: {e}")
+                text = None
+
+            if text and text != last_text:
+                last_activity = loop.time()
+                last_text = text
+                yield text
+
+            if loop.time() - last_activity > self.conversation_timeout:
+                last_text = None  # Reset for new conversation
+
+            await self._wait_interval()
+
+    def __aiter__(self):
+        return self.lines()
+
+    async def speak_lines(self, rate=None, volume=None):
+        """Read and speak lines until stopped.
+
+        Lines are handed to a speaker task through an ``asyncio.Queue`` so
+        capture keeps ticking while an utterance plays. Lines still pending
+        when the reader stops are dropped.
+        """
+        pending = asyncio.Queue()
+
+        async def speaker():
+            while True:
+                line = await pending.get()
+                try:
+                    await speak(line, rate=rate, volume=volume, executor=self._speech_executor)
+                except Exception as e:
+                    print(f"Speech error: {e}")
+
+        task = asyncio.create_task(speaker())
+        try:
+            async for line in self.lines():
+                pending.put_nowait(line)
+        finally:
+            task.cancel()
+            # Let the speaker finish unwinding before the reader is closed
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def close(self):
+        """Stop the reader and release its executors without waiting for running work."""
+        if self._stopped is not None:
+            self._stopped.set()
+        self._capture_executor.shutdown(wait=False, cancel_futures=True)
+        self._speech_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+        return False
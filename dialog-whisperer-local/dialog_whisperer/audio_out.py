@@ -0,0 +1,246 @@
+"""Persistent audio output for synthesized speech (lazy imports).
+
+``sd.play()``/``sd.wait()`` opens and tears down a PortAudio stream for
+every utterance, which adds start-up latency and an audible gap between
+lines. ``PlaybackDevice`` keeps one callback-driven ``OutputStream`` open and
+feeds it from a ring buffer; utterances are resampled to the device rate
+and appended as PCM blocks, so back-to-back lines play without gaps.
+
+``NullStream`` stands in for the sound card in tests and headless runs
+(``DIALOG_WHISPER_AUDIO=null``).
+"""
+
+import functools
+import threading
+
+
+@functools.lru_cache(maxsize=None)
+def _ratio(src_rate, dst_rate):
+    """Reduced up/down factors for a rate pair, computed once per model rate."""
+    import math
+    g = math.gcd(int(src_rate), int(dst_rate))
+    return int(dst_rate) // g, int(src_rate) // g
+
+
+def resample(audio, src_rate, dst_rate):
+    """Resample mono float32 audio. Uses scipy's polyphase filter when available."""
+    import numpy as np
+
+    audio = np.asarray(audio, dtype='float32').ravel()
+    if src_rate == dst_rate or not len(audio):
+        return audio
+    up, down = _ratio(src_rate, dst_rate)
+    try:
+        from scipy.signal import resample_poly
+        return resample_poly(audio, up, down).astype('float32')
+    except ImportError:
+        n_out = int(round(len(audio) * up / down))
+        positions = np.arange(n_out) * (down / up)
+        return np.interp(positions, np.arange(len(audio)), audio).astype('float32')
+
+
+class RingBuffer:
+    """Fixed-size single-producer/single-consumer float32 sample buffer."""
+
+    def __init__(self, capacity):
+        import numpy as np
+        self._data = np.zeros(capacity, dtype='float32')
+        self.capacity = capacity
+        self._read = 0  # total samples read
+        self._write = 0  # total samples written
+
+    def __len__(self):
+        return self._write - self._read
+
+    def free(self):
+        return self.capacity - len(self)
+
+    def write(self, samples):
+        """Append as many samples as fit; returns how many were written."""
+        n = min(len(samples), self.free())
+        start = self._write % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:n - first] = samples[first:n]
+        self._write += n
+        return n
+
+    def read_into(self, out):
+        """Fill out with queued samples, padding with silence; returns samples read."""
+        n = min(len(out), len(self))
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:n] = self._data[:n - first]
+        out[n:] = 0
+        self._read += n
+        return n
+
+    def clear(self):
+        self._read = self._write
+
+    @property
+    def total_read(self):
+        return self._read
+
+    @property
+    def total_written(self):
+        return self._write
+
+
+class NullStream:
+    """Output stream that discards audio, pulling blocks like a sound card would.
+
+    Args match the subset of ``sounddevice.OutputStream`` that PlaybackDevice
+    uses. With realtime=False blocks are pulled as fast as possible. Played
+    samples are kept in ``played`` when record=True.
+    """
+
+    def __init__(self, samplerate, blocksize, callback, realtime=False, record=False):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self.realtime = realtime
+        self.record = record
+        self.played = []
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="whisper-null-audio", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import numpy as np
+        out = np.zeros((self.blocksize, 1), dtype='float32')
+        interval = self.blocksize / self.samplerate if self.realtime else 0.0005
+        while not self._stopped.wait(interval):
+            self.callback(out, self.blocksize, None, None)
+            if self.record:
+                self.played.append(out[:, 0].copy())
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(1)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+
+
+class PlaybackDevice:
+    """One long-lived output stream fed from a ring buffer."""
+
+    def __init__(self, sample_rate=None, blocksize=1024, buffer_seconds=10, stream_factory=None):
+        """Create a device (the stream opens on start()).
+
+        Args:
+            sample_rate: device rate; defaults to the output device's default rate
+                (48000 for NullStream)
+            blocksize: frames per callback
+            buffer_seconds: ring buffer length; longer utterances are fed in as it drains
+            stream_factory: callable(samplerate, blocksize, callback) returning a stream
+                with start/stop/close; defaults to sounddevice.OutputStream, or
+                NullStream when DIALOG_WHISPER_AUDIO=null
+        """
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.buffer_seconds = buffer_seconds
+        self.stream_factory = stream_factory
+        self._stream = None
+        self._ring = None
+        self._cond = threading.Condition()
+        self._epoch = 0
+        self.underruns = 0
+
+    def _default_factory(self):
+        import os
+        if os.environ.get("DIALOG_WHISPER_AUDIO", "").lower() == "null":
+            return NullStream, self.sample_rate or 48000
+        try:
+            import sounddevice as sd
+        except Exception as e:
+            raise ImportError("sounddevice is required for audio playback: %s" % e)
+        rate = self.sample_rate or int(sd.query_devices(kind='output')['default_samplerate'])
+
+        def factory(samplerate, blocksize, callback):
+            return sd.OutputStream(samplerate=samplerate, blocksize=blocksize, channels=1,
+                                   dtype='float32', callback=callback)
+        return factory, rate
+
+    def start(self):
+        """Open and start the output stream. Calling start twice is a no-op."""
+        if self._stream is not None:
+            return
+        factory = self.stream_factory
+        if factory is None:
+            factory, self.sample_rate = self._default_factory()
+        elif self.sample_rate is None:
+            self.sample_rate = 48000
+        self._ring = RingBuffer(int(self.sample_rate * self.buffer_seconds))
+        self._stream = factory(self.sample_rate, self.blocksize, self._callback)
+        self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        # Runs on the audio thread: no allocation beyond the lock
+        with self._cond:
+            n = self._ring.read_into(outdata[:, 0])
+            if n:
+                self._cond.notify_all()
+            elif status:
+                self.underruns += 1
+
+    def play(self, audio, sample_rate, wait=True, when=None):
+        """Queue an utterance after whatever is already playing.
+
+        Args:
+            audio: mono float samples
+            sample_rate: rate of audio; resampled to the device rate if different
+            wait: block until the utterance has played or stop() was called
+            when: optional callable checked under the device lock; the utterance
+                is skipped if it returns False (e.g. a stop arrived meanwhile)
+
+        Returns:
+            bool: False if the utterance was cancelled before it finished
+        """
+        self.start()
+        samples = resample(audio, sample_rate, self.sample_rate)
+        with self._cond:
+            if when is not None and not when():
+                return False
+            epoch = self._epoch
+            offset = 0
+            while offset < len(samples):
+                offset += self._ring.write(samples[offset:])
+                if offset < len(samples):
+                    self._cond.wait(0.5)
+                    if epoch != self._epoch:
+                        return False
+            end = self._ring.total_written
+            if not wait:
+                return True
+            while self._ring.total_read < end:
+                self._cond.wait(0.5)
+                if epoch != self._epoch:
+                    return False
+            return True
+
+    def stop(self):
+        """Drop queued audio and release play() callers. The stream stays open."""
+        with self._cond:
+            self._epoch += 1
+            if self._ring is not None:
+                self._ring.clear()
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop and close the stream."""
+        self.stop()
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            finally:
+                self._stream = None
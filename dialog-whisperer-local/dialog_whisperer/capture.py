@@ -1,5 +1,7 @@
 """Screen capture tools using mss and PIL (lazy imports)."""
 
+import threading
+
 def compare_images(img1, img2, threshold=0.80):
     """Compare two images and return True if they are similar.
     
@@ -22,52 +24,310 @@ def compare_images(img1, img2, threshold=0.80):
         return False
         
     # Apply slight blur to reduce impact of small movements/changes
-    gray1 = img1.convert('L').filter(ImageFilter.GaussianBlur(radius=2))
-    gray2 = img2.convert('L').filter(ImageFilter.GaussianBlur(radius=2))
-    
-    # Convert to numpy arrays and normalize
-    arr1 = np.array(gray1).astype('float32') / 255
-    arr2 = np.array(gray2).astype('float32') / 255
+    arr1 = _blurred_array(img1)
+    arr2 = _blurred_array(img2)
     
-    # Calculate structural similarity
-    # Break the image into blocks and compare
-    block_size = 16
+    return _block_similarity(arr1, arr2, 16) >= threshold
+
+def _blurred_array(img, radius=2):
+    """Grayscale, Gaussian-blurred float32 array in [0, 1]."""
+    import numpy as np
+    from PIL import ImageFilter
+
+    gray = img.convert('L').filter(ImageFilter.GaussianBlur(radius=radius))
+    return np.asarray(gray, dtype='float32') / 255
+
+def _block_similarity(arr1, arr2, block_size):
+    """Median over block_size x block_size blocks of (1 - block MSE).
+
+    Taking the median makes the comparison robust to small local changes.
+    Partial blocks at the right/bottom edges are ignored.
+    """
+    import numpy as np
+
     h, w = arr1.shape
     num_blocks_h = h // block_size
     num_blocks_w = w // block_size
-    
-    similarities = []
-    for i in range(num_blocks_h):
-        for j in range(num_blocks_w):
-            y1 = i * block_size
-            y2 = (i + 1) * block_size
-            x1 = j * block_size
-            x2 = (j + 1) * block_size
-            
-            block1 = arr1[y1:y2, x1:x2]
-            block2 = arr2[y1:y2, x1:x2]
-            
-            # Calculate similarity for this block
-            mse = np.mean((block1 - block2) ** 2)
-            similarities.append(1 - mse)
-    
-    # Get the median similarity across all blocks
-    # This makes the comparison more robust to small changes
-    similarity = np.median(similarities)
-    
-    return similarity >= threshold
+    if num_blocks_h == 0 or num_blocks_w == 0:
+        return 0.0
+    diff = arr1[:num_blocks_h * block_size, :num_blocks_w * block_size] - \
+        arr2[:num_blocks_h * block_size, :num_blocks_w * block_size]
+    blocks = (diff ** 2).reshape(num_blocks_h, block_size, num_blocks_w, block_size)
+    mse = blocks.mean(axis=(1, 3))
+    return float(np.median(1 - mse))
+
+class ReferenceMatcher:
+    """Compare frames against a fixed UI reference image.
+
+    The reference is converted to grayscale, blurred and downsampled once.
+    Frames are compared at a coarse pyramid level first (``factor`` times
+    smaller); only results within ``margin`` of the threshold are re-checked
+    at full resolution with the same metric as ``compare_images``.
+
+    Averaging pixels into blocks can only lower a block's MSE, so the coarse
+    level errs towards "similar" and a coarse result below the threshold is
+    taken as final.
+    """
+
+    def __init__(self, reference, threshold=0.80, factor=4, margin=0.05, block_size=16):
+        """Precompute reference arrays.
+
+        Args:
+            reference: PIL.Image of the UI to detect
+            threshold: similarity at or above which frames match
+            factor: downsampling factor for the coarse level
+            margin: coarse results within this distance above the threshold
+                are re-checked at full resolution
+            block_size: block size in full-resolution pixels
+        """
+        try:
+            import numpy as np
+        except Exception as e:
+            raise ImportError("numpy and Pillow are required for image comparison: %s" % e)
+
+        self.size = reference.size
+        self.threshold = threshold
+        self.factor = max(1, int(factor))
+        self.margin = margin
+        self.block_size = block_size
+        self._coarse_block = max(1, block_size // self.factor)
+        self._ref_full = _blurred_array(reference)
+        self._ref_coarse = self._coarse_array(reference)
+        # Counters for tuning: how often the coarse level was enough
+        self.coarse_decisions = 0
+        self.full_checks = 0
+
+    def _coarse_array(self, img):
+        import numpy as np
+        from PIL import ImageFilter
+
+        gray = img.convert('L')
+        if self.factor > 1:
+            gray = gray.reduce(self.factor)
+        gray = gray.filter(ImageFilter.GaussianBlur(radius=2.0 / self.factor))
+        return np.asarray(gray, dtype='float32') / 255
+
+    def similarity(self, img):
+        """Full-resolution similarity to the reference (as in compare_images)."""
+        if img.size != self.size:
+            return 0.0
+        return _block_similarity(_blurred_array(img), self._ref_full, self.block_size)
+
+    def matches(self, img):
+        """True if the frame shows the reference UI."""
+        if img.size != self.size:
+            return False
+        coarse = _block_similarity(self._coarse_array(img), self._ref_coarse, self._coarse_block)
+        if coarse < self.threshold or coarse >= self.threshold + self.margin:
+            self.coarse_decisions += 1
+            return coarse >= self.threshold
+        self.full_checks += 1
+        return self.similarity(img) >= self.threshold
 
-def capture_region(bbox=None):
+def text_bands(gray, ink_threshold=2.0, min_gap=3, pad=2):
+    """Split a grayscale array into horizontal bands that contain text lines.
+
+    A row holds ink when its mean horizontal gradient exceeds ink_threshold;
+    runs of ink rows separated by fewer than min_gap empty rows are merged.
+
+    Args:
+        gray: 2-D array with values 0-255
+        ink_threshold: mean absolute difference between neighbouring pixels
+        min_gap: empty rows needed to split two lines
+        pad: rows added above and below each band
+
+    Returns:
+        list of (top, bottom) row ranges, top to bottom
+    """
+    import numpy as np
+
+    if gray.shape[1] < 2:
+        return []
+    ink = np.abs(np.diff(gray, axis=1)).mean(axis=1) > ink_threshold
+    rows = np.flatnonzero(ink)
+    if not len(rows):
+        return []
+    # Start a new band wherever the gap to the previous ink row is large enough
+    breaks = np.flatnonzero(np.diff(rows) > min_gap)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+    height = gray.shape[0]
+    bands = []
+    for top, bottom in zip(starts, ends):
+        top = max(int(top) - pad, bands[-1][1] if bands else 0)
+        bands.append((top, min(int(bottom) + pad, height)))
+    return bands
+
+class DirtyRegionDetector:
+    """Find which text lines changed between consecutive frames of a region.
+
+    Each update diffs the new frame against the previous one row by row. If
+    no row changed, the previous line bands are returned as all clean without
+    re-segmenting. Otherwise the frame is split into line bands and a band is
+    dirty if any of its rows changed or it did not exist in the previous frame.
+    """
+
+    def __init__(self, diff_threshold=24, min_pixels=2, ink_threshold=2.0, min_gap=3, pad=2):
+        """Create a detector.
+
+        Args:
+            diff_threshold: gray-level change for a pixel to count as changed
+            min_pixels: changed pixels needed to mark a row dirty
+            ink_threshold, min_gap, pad: line segmentation settings (see text_bands)
+        """
+        self.diff_threshold = diff_threshold
+        self.min_pixels = min_pixels
+        self.ink_threshold = ink_threshold
+        self.min_gap = min_gap
+        self.pad = pad
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frame so the next update marks every band dirty."""
+        self._previous = None
+        self._bands = []
+
+    def update(self, frame):
+        """Diff a frame against the previous one.
+
+        Args:
+            frame: PIL.Image of the region
+
+        Returns:
+            tuple: (bands, dirty) where bands is a list of (top, bottom) row
+            ranges and dirty[i] is True if band i must be read again
+        """
+        import numpy as np
+
+        gray = np.asarray(frame.convert('L'), dtype='int16')
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            changed = np.ones(gray.shape[0], dtype=bool)
+        else:
+            changed = (np.abs(gray - previous) > self.diff_threshold).sum(axis=1) >= self.min_pixels
+            if not changed.any():
+                return list(self._bands), [False] * len(self._bands)
+
+        old_bands = set(self._bands)
+        self._bands = text_bands(gray, self.ink_threshold, self.min_gap, self.pad)
+        dirty = [band not in old_bands or bool(changed[band[0]:band[1]].any())
+                 for band in self._bands]
+        return list(self._bands), dirty
+
+_local = threading.local()
+
+def _grabber():
+    """Per-thread mss instance, reused across captures.
+
+    mss objects are not thread-safe, and opening one per capture costs a
+    display connection (and on Windows a DC) every tick.
+    """
+    sct = getattr(_local, "sct", None)
+    if sct is None:
+        import mss
+        sct = _local.sct = mss.mss()
+    return sct
+
+def dpi_scale():
+    """Physical pixels per logical pixel for region coordinates.
+
+    Read from DIALOG_WHISPER_DPI_SCALE (default 1.0). Not needed once
+    ``enable_dpi_awareness`` succeeded, because Tk then reports physical pixels.
+    """
+    import os
+    try:
+        return float(os.environ.get("DIALOG_WHISPER_DPI_SCALE", "1.0"))
+    except ValueError:
+        return 1.0
+
+def enable_dpi_awareness():
+    """Make the process per-monitor DPI aware on Windows so Tk and mss agree on pixels.
+
+    Must run before the first Tk window is created. Returns True on success.
+    """
+    import sys
+    if sys.platform != "win32":
+        return False
+    try:
+        import ctypes
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)  # PROCESS_PER_MONITOR_DPI_AWARE
+        return True
+    except Exception:
+        try:
+            import ctypes
+            return bool(ctypes.windll.user32.SetProcessDPIAware())
+        except Exception:
+            return False
+
+def to_physical(bbox, scale):
+    """Scale a logical (left, top, right, bottom) box to physical pixels.
+
+    The physical size depends only on the logical size, so a box that moves
+    keeps capturing frames of the same size.
+    """
+    if scale == 1:
+        return tuple(int(v) for v in bbox)
+    left, top, right, bottom = bbox
+    x, y = int(round(left * scale)), int(round(top * scale))
+    return x, y, x + int(round((right - left) * scale)), y + int(round((bottom - top) * scale))
+
+def to_logical(bbox, scale, size=None):
+    """Convert a physical box back to logical units.
+
+    Args:
+        bbox: (left, top, right, bottom) in physical pixels
+        scale: physical pixels per logical pixel
+        size: optional logical (width, height) to keep instead of rescaling the box's size
+    """
+    left, top, right, bottom = bbox
+    x, y = int(round(left / scale)), int(round(top / scale))
+    if size is None:
+        size = (int(round((right - left) / scale)), int(round((bottom - top) / scale)))
+    return x, y, x + size[0], y + size[1]
+
+def _intersect(bbox, monitor):
+    left, top, right, bottom = bbox
+    m_right = monitor["left"] + monitor["width"]
+    m_bottom = monitor["top"] + monitor["height"]
+    return (max(left, monitor["left"]), max(top, monitor["top"]),
+            min(right, m_right), min(bottom, m_bottom))
+
+def monitor_for(bbox, monitors):
+    """The monitor dict with the largest overlap with bbox, or None if none overlaps."""
+    best, best_area = None, 0
+    for monitor in monitors:
+        left, top, right, bottom = _intersect(bbox, monitor)
+        area = max(0, right - left) * max(0, bottom - top)
+        if area > best_area:
+            best, best_area = monitor, area
+    return best
+
+def _to_image(sct_img):
+    from PIL import Image
+    import numpy as np
+
+    arr = np.asarray(sct_img)
+    # mss returns BGRA
+    return Image.fromarray(arr[:, :, :3][:, :, ::-1])
+
+def capture_region(bbox=None, scale=None):
     """Capture a screen region and return a PIL Image.
 
+    Only the monitor that holds most of the region is grabbed, so regions on
+    secondary monitors (including ones at negative coordinates) get the
+    right pixels and never spill across the virtual desktop. Parts of the
+    region outside that monitor come back black: the image always has the
+    region's full (physical) size, which frame comparisons rely on.
+
     Args:
-        bbox: tuple (left, top, right, bottom) or None for full screen
+        bbox: tuple (left, top, right, bottom) or None for the whole virtual desktop
+        scale: physical pixels per logical pixel; defaults to ``dpi_scale()``
 
     Returns:
         PIL.Image
     
     Raises:
-        ValueError: If the bounding box has zero or negative size
+        ValueError: If the bounding box has zero or negative size or is off screen
         ImportError: If required dependencies are not available
     """
     try:
@@ -77,25 +337,70 @@ def capture_region(bbox=None):
     except Exception as e:
         raise ImportError("mss, Pillow and numpy are required for capture: %s" % e)
 
-    with mss.mss() as sct:
-        if bbox is None:
-            monitor = sct.monitors[0]
-        else:
-            left, top, right, bottom = bbox
-            # Handle negative coordinates
-            width = right - left
-            height = bottom - top
-            
-            # Check for invalid dimensions
-            if width <= 0 or height <= 0:
-                raise ValueError("Invalid bounding box dimensions: box must have positive width and height")
-            
-            # Adjust negative coordinates to screen bounds
-            left = max(0, left)
-            top = max(0, top)
-            monitor = {"left": left, "top": top, "width": width, "height": height}
-        sct_img = sct.grab(monitor)
-        arr = np.asarray(sct_img)
-        # mss returns BGRA
-        img = Image.fromarray(arr[:, :, :3][:, :, ::-1])
-        return img
+    if bbox is None:
+        sct = _grabber()
+        monitor = sct.monitors[0]
+    else:
+        left, top, right, bottom = to_physical(bbox, dpi_scale() if scale is None else scale)
+        width = right - left
+        height = bottom - top
+        
+        # Check for invalid dimensions
+        if width <= 0 or height <= 0:
+            raise ValueError("Invalid bounding box dimensions: box must have positive width and height")
+        
+        sct = _grabber()
+        # Clip to the monitor holding the region
+        holder = monitor_for((left, top, right, bottom), sct.monitors[1:])
+        if holder is None:
+            raise ValueError("Bounding box %r is not on any monitor" % (bbox,))
+        clipped = _intersect((left, top, right, bottom), holder)
+        monitor = {"left": clipped[0], "top": clipped[1],
+                   "width": clipped[2] - clipped[0], "height": clipped[3] - clipped[1]}
+        if clipped != (left, top, right, bottom):
+            canvas = Image.new('RGB', (width, height))
+            canvas.paste(_to_image(sct.grab(monitor)), (clipped[0] - left, clipped[1] - top))
+            return canvas
+    return _to_image(sct.grab(monitor))
+
+def capture_monitor(bbox=None):
+    """Capture the whole monitor that holds bbox (the primary monitor if None).
+
+    Args:
+        bbox: logical (left, top, right, bottom), like capture_region
+
+    Returns:
+        tuple: (PIL.Image, (left, top)); the image is in physical pixels and so is
+        the monitor's origin. Use to_logical with dpi_scale() to map positions back.
+    """
+    try:
+        import mss
+        from PIL import Image
+        import numpy as np
+    except Exception as e:
+        raise ImportError("mss, Pillow and numpy are required for capture: %s" % e)
+
+    sct = _grabber()
+    monitor = None
+    if bbox is not None:
+        monitor = monitor_for(to_physical(bbox, dpi_scale()), sct.monitors[1:])
+    if monitor is None:
+        monitor = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+    return _to_image(sct.grab(monitor)), (monitor["left"], monitor["top"])
+
+def monitors():
+    """Physical monitors as mss dicts with left, top, width and height."""
+    try:
+        import mss
+    except Exception as e:
+        raise ImportError("mss is required for capture: %s" % e)
+    return list(_grabber().monitors[1:])
+
+def virtual_screen():
+    """Bounds of the whole virtual desktop as (left, top, width, height)."""
+    try:
+        import mss
+    except Exception as e:
+        raise ImportError("mss is required for capture: %s" % e)
+    m = _grabber().monitors[0]
+    return m["left"], m["top"], m["width"], m["height"]
@@ -52,12 +52,11 @@ def _setup_hotkeys(capture_fn, toggle_speak_fn):
 def start_gui():
     try:
         import tkinter as tk
-        from tkinter import messagebox
+        from tkinter import messagebox, simpledialog, filedialog
         import os
         from collections import deque
         import time
         import threading
-        import queue
         import atexit
     except Exception as e:
         raise ImportError("Tkinter is required for GUI: %s" % e)
@@ -100,14 +99,26 @@ def start_gui():
                 os.environ[f"DIALOG_WHISPER_HOTKEY_{key.upper()}"] = entry.get()
             self.hide()
 
-    from . import capture, ocr, tts
+    from . import capture, ocr, ocr_backends, tts
     from . import region_selector
+    from . import profiles
+    from .transcript import TranscriptStore
+    from .playback import AdaptiveRate, PlaybackController
+    from .templates import TemplateLibrary
+    from .tracker import RegionTracker
+    from .monitor import Monitor
+    from .hotkeys import TkDispatcher
+    from . import recorder
 
     # Initialize tkinter before class definitions
     global root
+    capture.enable_dpi_awareness()  # before the first window, so Tk reports physical pixels
     root = tk.Tk()
     root.title("Dialog Whisperer — Local MVP")
-    root.geometry("420x180")  # Made taller for hotkey info
+    root.geometry("420x210")  # Made taller for hotkey info and profiles
+    # Hotkeys fire on the keyboard hook thread; their callbacks run on the Tk thread
+    dispatcher = TkDispatcher(root)
+    dispatcher.start()
 
     coords = {"x1": 100, "y1": 100, "x2": 500, "y2": 300}
     speaking_enabled = {"value": True}  # Use dict for mutable state
@@ -119,99 +130,201 @@ def start_gui():
         "speaking": False,
         "last_text": None,
         "last_activity": time.time(),
-        "text_queue": queue.Queue(),
+        "playback": None,
         "conversation_timeout": 20,  # seconds before considering conversation ended
         "reference_image": None,
-        "ui_visible": True,
-        "bbox": None
+        "ui_templates": TemplateLibrary(),
+        "ui_visible": False,
+        "bbox": None,
+        "confidence_gate": ocr.ConfidenceGate(),
+        "profile": None,
+        "transcript": None,
+        "tracker": None,
+        "ocr_config": ocr_backends.default_config(),  # languages/PSM for the dialog region
+        "band_reader": None,  # ocr.BandReader, re-OCRs only the lines that changed
+        "monitor": None,  # monitor.Monitor while monitoring
+        "recorder": None,  # recorder.FrameRecorder while recording (DIALOG_WHISPER_RECORD)
     }
+
+    state["band_reader"] = ocr.BandReader(config=state["ocr_config"])
+
+    try:
+        state["transcript"] = TranscriptStore()
+        state["transcript"].start()
+    except Exception as e:
+        print(f"Transcript disabled: {e}")
     
     def capture_text():
-        """Capture and process text from the selected region."""
+        """Capture and read the selected region the way the monitor does (errors propagate).
+
+        Going through the band reader and confidence gate gives the exact text
+        the monitor's first tick will compare against.
+        """
+        img = capture.capture_region((coords["x1"], coords["y1"], coords["x2"], coords["y2"]))
+        result = state["band_reader"].read(img)
+        gate = state["confidence_gate"]
+        return gate.text(result).strip() if gate.accepts(result) else ""
+
+    def on_region_moved(bbox):
+        """Monitor callback: the tracker followed the dialog box to bbox."""
+        coords.update(zip(("x1", "y1", "x2", "y2"), bbox))
+        state["bbox"] = bbox
+        dispatcher.post(update_region_label, key="region_label")
+
+    def submit_line(text, confidence):
+        """Monitor callback: queue a newly read line for speaking."""
+        state["last_activity"] = time.time()
+        state["playback"].submit(text, meta=line_meta(confidence))
+
+    def start_recorder():
+        """Record this monitoring run if DIALOG_WHISPER_RECORD names a directory."""
+        directory = recorder.default_directory()
+        if directory is None:
+            return None
         try:
-            img = capture.capture_region((coords["x1"], coords["y1"], coords["x2"], coords["y2"]))
-            return ocr.image_to_text(img).strip()
+            state["recorder"] = recorder.FrameRecorder(recorder.new_session_path(directory))
+            state["recorder"].start()
+            print(f"Debug: Recording frames to {state['recorder'].path}")
         except Exception as e:
-            print(f"Capture error: {e}")
-            return None
+            print(f"Recording disabled: {e}")
+            state["recorder"] = None
+        return state["recorder"]
 
-    def monitor_text():
-        """Background thread to monitor for text changes."""
-        last_text = None
-        last_image = None
-        while state["monitoring"]:
-            if not speaking_enabled["value"]:
-                time.sleep(0.5)
-                continue
-                
-            # Capture current region
-            try:
-                current_image = capture.capture_region((coords["x1"], coords["y1"], coords["x2"], coords["y2"]))
-                
-                # If we have a reference image for the UI, compare current image
-                if state["reference_image"] is not None:
-                    state["ui_visible"] = capture.compare_images(current_image, state["reference_image"])
-                    
-                # If UI is visible, don't process text
-                if state["ui_visible"]:
-                    time.sleep(0.5)
-                    continue
-                    
-                # Process text only when UI is not visible
-                current_text = ocr.image_to_text(current_image).strip()
-                if current_text and current_text != last_text:
-                    state["last_activity"] = time.time()
-                    state["text_queue"].put(current_text)
-                    last_text = current_text
-                
-                # Check for conversation timeout
-                if time.time() - state["last_activity"] > state["conversation_timeout"]:
-                    last_text = None  # Reset for new conversation
-            except Exception as e:
-                print(f"Monitor error: {e}")
-                
-            time.sleep(0.5)  # Poll interval
+    def close_recorder(block=False):
+        """Flush and close the recorder; on a worker thread unless block is set."""
+        rec, state["recorder"] = state["recorder"], None
+        if rec is None:
+            return
+
+        def report(_=None):
+            print(f"Debug: Recorded {rec.recorded} frames ({rec.dropped} dropped)")
+
+        if block:
+            rec.close()
+            report()
+        else:
+            # Writing the last chunk can take seconds; keep it off the Tk thread
+            dispatcher.run_async(rec.close, report)
+
+    def make_monitor(initial_text=None):
+        """Create the monitor loop for the selected region and current settings.
+
+        initial_text is the line already queued, so the first tick does not repeat it.
+        """
+        return Monitor(
+            (coords["x1"], coords["y1"], coords["x2"], coords["y2"]),
+            submit_line,
+            reader=state["band_reader"],
+            gate=state["confidence_gate"],
+            templates=state["ui_templates"],
+            tracker=state["tracker"],
+            conversation_timeout=state["conversation_timeout"],
+            enabled=lambda: speaking_enabled["value"],
+            on_move=on_region_moved,
+            recorder=start_recorder(),
+            last_text=initial_text,
+        )
     
-    def speak_queue():
-        """Background thread to speak queued text sequentially."""
-        while state["monitoring"]:
-            try:
-                # Wait for text in the queue
-                text = state["text_queue"].get(timeout=0.5)
-                if text:
-                    state["speaking"] = True
-                    update_speaking_buttons()
-                    tts.speak(text)
-                    state["speaking"] = False
-                    update_speaking_buttons()
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Speech error: {e}")
-                state["speaking"] = False
-                update_speaking_buttons()
+    def on_playback_state(speaking):
+        """Called from the playback thread when an utterance starts or ends."""
+        state["speaking"] = speaking
+        dispatcher.post(update_speaking_buttons, key="speaking_buttons")
+
+    def line_meta(confidence=None):
+        """Transcript details carried with a recognized line through playback."""
+        return {"timestamp": time.time(), "region": state["bbox"], "confidence": confidence}
+
+    def log_line(text, meta, tts_latency):
+        """Playback callback: record each line once its audio starts or it is dropped."""
+        if state["transcript"] is None or not meta or meta.get("replay"):
+            return
+        state["transcript"].log(text, region=meta["region"], confidence=meta["confidence"],
+                                tts_latency=tts_latency, profile=state["profile"],
+                                timestamp=meta["timestamp"])
+
+    def make_playback():
+        """Create the playback controller.
+
+        DIALOG_WHISPER_PLAYBACK=queue reads every line in order, speaking up to
+        DIALOG_WHISPER_BATCH (default 4) waiting lines in one batch. Speech speeds up
+        to keep the backlog under DIALOG_WHISPER_TARGET_LAG seconds (0 disables);
+        DIALOG_WHISPER_SKIP_LAG=1 also skips lines it cannot catch up with.
+        """
+        mode = os.environ.get("DIALOG_WHISPER_PLAYBACK", "latest").lower()
+        rate_control = None
+        try:
+            target_lag = float(os.environ.get("DIALOG_WHISPER_TARGET_LAG", "5"))
+        except ValueError:
+            target_lag = 5.0
+        if target_lag > 0:
+            rate_control = AdaptiveRate(target_lag=target_lag,
+                                        skip=os.environ.get("DIALOG_WHISPER_SKIP_LAG") == "1")
+        try:
+            max_batch = int(os.environ.get("DIALOG_WHISPER_BATCH", "4"))
+        except ValueError:
+            max_batch = 4
+        return PlaybackController(preempt=(mode != "queue"), on_state=on_playback_state,
+                                  on_line=log_line, rate_control=rate_control,
+                                  max_batch=max_batch)
     
     def start_monitoring():
-        """Start continuous text monitoring."""
-        if state["monitoring"]:
+        """Start continuous text monitoring.
+
+        The tracker snapshot and the first OCR run on a worker thread, so the
+        window stays responsive; finish_start_monitoring continues on the Tk thread.
+        """
+        if state["monitoring"] or dispatcher.busy("start"):
             return
             
         if not speaking_enabled["value"]:
             messagebox.showinfo("Speaking Disabled", "Speaking is currently disabled (Alt+Shift+S to enable)")
             return
         
-        # Initial capture to verify region has text
-        initial_text = capture_text()
+        bbox = (coords["x1"], coords["y1"], coords["x2"], coords["y2"])
+        track = track_var.get()
+
+        def prepare():
+            state["band_reader"].reset()
+            # Remember how the dialog box looks so it can be followed if it moves
+            tracker = None
+            if track:
+                try:
+                    tracker = RegionTracker(capture.capture_region(bbox), bbox,
+                                            pixel_scale=capture.dpi_scale())
+                except Exception as e:
+                    print(f"Region tracking disabled: {e}")
+            # Initial capture to verify region has text
+            return tracker, capture_text()
+
+        btn_start.config(text="Reading...", state=tk.DISABLED)
+        dispatcher.run_async(prepare, finish_start_monitoring, fail_start_monitoring, key="start")
+
+    def fail_start_monitoring(error):
+        """Tk thread: report why the first capture could not run."""
+        btn_start.config(text="Start Monitoring")
+        update_speaking_buttons()
+        messagebox.showerror("Error", f"Could not start monitoring: {error}")
+
+    def finish_start_monitoring(prepared):
+        """Tk thread: start playback and the monitor loop once the first text was read."""
+        state["tracker"], initial_text = prepared
+        btn_start.config(text="Start Monitoring")
+        update_speaking_buttons()
         if not initial_text:
             messagebox.showinfo("OCR Result", "No text detected in selected region")
             return
+        if state["monitoring"]:
+            return
             
         state["monitoring"] = True
-        state["text_queue"].put(initial_text)  # Queue initial text
+        if state["playback"] is None:
+            state["playback"] = make_playback()
+        state["playback"].start()
+        state["playback"].submit(initial_text, meta=line_meta())  # Queue initial text
         
-        # Start monitoring and speaking threads
-        threading.Thread(target=monitor_text, daemon=True).start()
-        threading.Thread(target=speak_queue, daemon=True).start()
+        # Start monitoring thread; speech runs on the playback thread
+        state["monitor"] = make_monitor(initial_text)
+        threading.Thread(target=state["monitor"].run, name="whisper-monitor", daemon=True).start()
         
         # Update UI
         btn_start.config(text="Monitoring...", state=tk.DISABLED)
@@ -220,34 +333,31 @@ def start_gui():
             root.iconify()
     
     def capture_ui_reference():
-        """Capture a reference image of the UI for comparison."""
+        """Capture a reference image of the UI and add it to the template library."""
         if state["bbox"] is None:
             messagebox.showinfo("Error", "Please select a region first")
             return
             
         try:
             state["reference_image"] = capture.capture_region((coords["x1"], coords["y1"], coords["x2"], coords["y2"]))
-            messagebox.showinfo("Success", "UI reference image captured. Text will be read only when the UI is not visible.")
+            templates = state["ui_templates"]
+            templates.add(f"ui-{len(templates) + 1}", state["reference_image"])
+            messagebox.showinfo("Success", f"UI reference {len(templates)} captured. Text will be read only when no captured UI is visible.")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to capture reference UI: {e}")
 
-    def stop_monitoring():
-        """Stop text monitoring and speech."""
-        state["monitoring"] = False
-        state["speaking"] = False
-        # Clear queue
-        while not state["text_queue"].empty():
-            state["text_queue"].get()
-        
-        # Update UI
     def stop_monitoring():
         """Stop text monitoring and speech."""
         try:
             state["monitoring"] = False
             state["speaking"] = False
-            # Clear queue
-            while not state["text_queue"].empty():
-                state["text_queue"].get()
+            if state["monitor"] is not None:
+                state["monitor"].stop()
+                state["monitor"] = None
+            close_recorder()
+            # Drop queued lines and cut off the current utterance
+            if state["playback"] is not None:
+                state["playback"].shutdown()
             
             # Update UI
             btn_start.config(text="Start Monitoring", state=tk.NORMAL)
@@ -261,6 +371,9 @@ def start_gui():
     def toggle_speaking():
         speaking_enabled["value"] = not speaking_enabled["value"]
         state["speaking"] = False  # Reset speaking state
+        if not speaking_enabled["value"] and state["playback"] is not None:
+            state["playback"].clear()
+            state["playback"].cancel_current()
         status = "enabled" if speaking_enabled["value"] else "disabled"
         status_label.config(text=f"Speaking: {'ON' if speaking_enabled['value'] else 'OFF'}", 
                           fg='green' if speaking_enabled['value'] else 'red')
@@ -282,6 +395,8 @@ def start_gui():
     def pause_speaking():
         """Stop current speech and restore window"""
         state["speaking"] = False
+        if state["playback"] is not None:
+            state["playback"].cancel_current()
         update_speaking_buttons()
         root.deiconify()
     
@@ -308,8 +423,8 @@ def start_gui():
     
     # Setup global hotkey
     cleanup_hotkeys = _setup_hotkeys(
-        lambda: start_monitoring() if not state["monitoring"] else None,
-        toggle_speaking
+        dispatcher.handler(lambda: start_monitoring() if not state["monitoring"] else None, key="capture"),
+        dispatcher.handler(toggle_speaking, key="toggle_speak"),
     )
     root.bind("<Destroy>", lambda e: (state.update(monitoring=False), cleanup_hotkeys()))  # Clean up on window close
 
@@ -335,7 +450,8 @@ def start_gui():
         """Handle new region selection."""
         coords.update({'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2})
         state["bbox"] = (x1, y1, x2, y2)
-        state["reference_image"] = None  # Reset reference image when region changes
+        state["reference_image"] = None  # Reset reference images when region changes
+        state["ui_templates"].clear()
         update_region_label()
         # Enable monitoring when region is selected
         update_speaking_buttons()
@@ -346,7 +462,14 @@ def start_gui():
             # Minimize main window during selection if requested
             if minimize_var.get():
                 root.iconify()
-            selector = region_selector.RegionSelector(on_region_selected)
+            bounds = None
+            try:
+                # Span every monitor; a single monitor keeps the plain fullscreen overlay
+                if len(capture.monitors()) > 1:
+                    bounds = capture.virtual_screen()
+            except Exception as e:
+                print(f"Debug: Could not read monitor layout, using primary screen: {e}")
+            selector = region_selector.RegionSelector(on_region_selected, bounds=bounds)
             selector.root.mainloop()
         finally:
             # Only restore if window still exists
@@ -380,6 +503,9 @@ def start_gui():
     minimize_var = tk.BooleanVar(value=True)
     tk.Checkbutton(left_frame, text="Minimize on Start", variable=minimize_var).pack(side=tk.LEFT, padx=4)
 
+    # Follow the dialog box when the game window moves
+    track_var = tk.BooleanVar(value=False)
+
     # Right side buttons
     right_frame = tk.Frame(btn_frame)
     right_frame.pack(side=tk.RIGHT)
@@ -390,10 +516,153 @@ def start_gui():
     btn_settings = tk.Button(right_frame, text="Settings", command=toggle_settings)
     btn_settings.pack(side=tk.RIGHT, padx=4)
 
+    def current_profile(name):
+        """Snapshot the current region, UI templates and settings as a profile."""
+        return profiles.Profile(
+            name,
+            region=state["bbox"],
+            templates=state["ui_templates"],
+            hotkeys={key: os.environ.get(f"DIALOG_WHISPER_HOTKEY_{key.upper()}", default)
+                     for key, default in _DEFAULT_HOTKEYS.items()},
+            ocr=dict(state["ocr_config"].to_dict(),
+                     backend=os.environ.get("DIALOG_WHISPER_OCR_BACKEND", "pytesseract"),
+                     min_confidence=state["confidence_gate"].min_confidence),
+            tts={"backend": os.environ.get("DIALOG_WHISPER_TTS_BACKEND", "pyttsx3")},
+        )
+
+    def apply_profile(profile):
+        """Restore a loaded profile into the running session."""
+        if profile.region:
+            on_region_selected(*profile.region)  # also clears the current templates
+        state["ui_templates"] = profile.templates
+        if state["monitor"] is not None:
+            state["monitor"].templates = profile.templates
+        for key, value in profile.hotkeys.items():
+            os.environ[f"DIALOG_WHISPER_HOTKEY_{key.upper()}"] = value
+        if profile.ocr.get("backend"):
+            os.environ["DIALOG_WHISPER_OCR_BACKEND"] = profile.ocr["backend"]
+        if profile.ocr.get("min_confidence") is not None:
+            state["confidence_gate"].min_confidence = profile.ocr["min_confidence"]
+        if any(profile.ocr.get(key) is not None for key in ("lang", "psm", "whitelist", "dpi")):
+            state["ocr_config"] = ocr_backends.OCRConfig.from_dict(profile.ocr)
+        else:
+            state["ocr_config"] = ocr_backends.default_config()
+        state["band_reader"].set_config(state["ocr_config"])
+        if profile.tts.get("backend"):
+            os.environ["DIALOG_WHISPER_TTS_BACKEND"] = profile.tts["backend"]
+        state["profile"] = profile.name
+        root.title(f"Dialog Whisperer — {profile.name}")
+
+    def save_profile():
+        name = simpledialog.askstring("Save Profile", "Profile name (e.g. the game):",
+                                      initialvalue=state["profile"] or "", parent=root)
+        if not name:
+            return
+        try:
+            path = profiles.save_profile(current_profile(name))
+            state["profile"] = name
+            messagebox.showinfo("Profile Saved", f"Saved profile to {path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save profile: {e}")
+
+    def load_profile():
+        names = profiles.list_profiles()
+        if not names:
+            messagebox.showinfo("Load Profile", "No saved profiles yet")
+            return
+        name = simpledialog.askstring("Load Profile", "Profile name:\n" + ", ".join(names),
+                                      initialvalue=state["profile"] or names[0], parent=root)
+        if not name:
+            return
+        try:
+            apply_profile(profiles.load_profile(name))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load profile: {e}")
+
+    def show_transcript():
+        """Search past dialog and replay a line without re-running OCR."""
+        store = state["transcript"]
+        if store is None:
+            messagebox.showinfo("Transcript", "Transcript is not available")
+            return
+        # Show what the writer has stored so far without freezing on a slow disk
+        store.flush(timeout=0.5)
+
+        window = tk.Toplevel(root)
+        window.title("Transcript")
+        window.geometry("480x320")
+        search_frame = tk.Frame(window)
+        search_frame.pack(fill=tk.X, padx=8, pady=4)
+        search_var = tk.StringVar()
+        search_entry = tk.Entry(search_frame, textvariable=search_var)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        listbox = tk.Listbox(window)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=8)
+        results = []
+
+        def refresh(event=None):
+            results[:] = store.search(search_var.get())
+            listbox.delete(0, tk.END)
+            for entry in results:
+                stamp = time.strftime("%H:%M:%S", time.localtime(entry["timestamp"]))
+                listbox.insert(tk.END, f"{stamp}  {entry['text']}")
+
+        def replay():
+            selection = listbox.curselection()
+            if not selection:
+                return
+            if state["playback"] is None:
+                state["playback"] = make_playback()
+            state["playback"].start()
+            state["playback"].submit(results[selection[0]]["text"], priority=1, meta={"replay": True})
+
+        def export():
+            path = filedialog.asksaveasfilename(parent=window, defaultextension=".jsonl",
+                                                filetypes=[("JSON Lines", "*.jsonl"), ("CSV", "*.csv")])
+            if not path:
+                return
+            try:
+                count = store.export(path)
+                messagebox.showinfo("Export", f"Exported {count} lines to {path}", parent=window)
+            except Exception as e:
+                messagebox.showerror("Error", f"Export failed: {e}", parent=window)
+
+        search_entry.bind("<Return>", refresh)
+        tk.Button(search_frame, text="Search", command=refresh).pack(side=tk.LEFT, padx=4)
+        action_frame = tk.Frame(window)
+        action_frame.pack(fill=tk.X, padx=8, pady=4)
+        tk.Button(action_frame, text="Replay", command=replay).pack(side=tk.LEFT, padx=4)
+        tk.Button(action_frame, text="Export", command=export).pack(side=tk.LEFT, padx=4)
+        refresh()
+
+    profile_frame = tk.Frame(root)
+    profile_frame.pack(padx=8, pady=4, fill=tk.X)
+    tk.Button(profile_frame, text="Save Profile", command=save_profile).pack(side=tk.LEFT, padx=4)
+    tk.Button(profile_frame, text="Load Profile", command=load_profile).pack(side=tk.LEFT, padx=4)
+    tk.Checkbutton(profile_frame, text="Track Region", variable=track_var).pack(side=tk.LEFT, padx=4)
+    tk.Button(profile_frame, text="Transcript", command=show_transcript).pack(side=tk.RIGHT, padx=4)
+
+    # Load the profile named in DIALOG_WHISPER_PROFILE so sessions start ready to read
+    startup_profile = os.environ.get("DIALOG_WHISPER_PROFILE")
+    if startup_profile:
+        try:
+            apply_profile(profiles.load_profile(startup_profile))
+        except Exception as e:
+            print(f"Failed to load profile {startup_profile}: {e}")
+
     def cleanup():
         """Clean up resources on exit."""
+        dispatcher.stop()
         state["monitoring"] = False
+        if state["monitor"] is not None:
+            state["monitor"].stop()
+        # The app is exiting: write the last chunk before the process ends
+        close_recorder(block=True)
         state["speaking"] = False
+        if state["playback"] is not None:
+            state["playback"].shutdown()
+        if state["transcript"] is not None:
+            state["transcript"].close()
         
         # Clean up hotkeys
         try:
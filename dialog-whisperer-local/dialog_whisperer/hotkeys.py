@@ -0,0 +1,132 @@
+"""Run hotkey callbacks and background work results on the Tk thread.
+
+Global hotkeys from the ``keyboard`` module fire on its hook thread. Tk
+widgets must only be touched from the thread running ``mainloop``. Slow work
+such as capture and OCR must not run there either, or the window freezes.
+``TkDispatcher`` puts hotkey events on a thread-safe queue, and Tk drains it
+with ``after()`` polling. ``run_async`` runs slow work on a worker thread and
+hands its result back the same way.
+"""
+
+import queue
+import threading
+
+
+class TkDispatcher:
+    """Queue callables from any thread and call them on the Tk thread."""
+
+    def __init__(self, root, poll_ms=30):
+        """Create a dispatcher (call start() once the Tk root exists).
+
+        Args:
+            root: Tk root (anything with after() and after_cancel())
+            poll_ms: milliseconds between queue checks
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = set()  # keys queued but not yet run
+        self._busy = set()  # keys of run_async work in progress
+        self._after_id = None
+        self._stopped = False
+
+    def post(self, fn, *args, key=None):
+        """Queue fn(*args) for the Tk thread. Safe from any thread; never blocks.
+
+        Posts with a key that is already queued are dropped, so holding a
+        hotkey down does not pile up events.
+
+        Returns:
+            bool: False if the call was dropped
+        """
+        with self._lock:
+            if self._stopped or (key is not None and key in self._pending):
+                return False
+            if key is not None:
+                self._pending.add(key)
+        self._queue.put((key, fn, args))
+        return True
+
+    def handler(self, fn, key=None):
+        """A zero-argument callback (e.g. for keyboard.add_hotkey) that posts fn."""
+        key = fn if key is None else key
+        return lambda: self.post(fn, key=key)
+
+    def start(self):
+        """Start polling the queue from the Tk loop."""
+        self._stopped = False
+        if self._after_id is None:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def stop(self):
+        """Stop polling; queued calls are discarded."""
+        with self._lock:
+            self._stopped = True
+            self._pending.clear()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _poll(self):
+        self._after_id = None
+        self.run_pending()
+        if not self._stopped:
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def run_pending(self):
+        """Run every queued call now (on the calling thread). Returns how many ran."""
+        ran = 0
+        while not self._stopped:
+            try:
+                key, fn, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._pending.discard(key)
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Hotkey error: {e}")
+            ran += 1
+        return ran
+
+    def run_async(self, work, done=None, error=None, key=None):
+        """Run work() on a worker thread, then done(result) or error(exc) on the Tk thread.
+
+        Work with a key that is still running is not started again.
+
+        Returns:
+            bool: False if work with the same key is already running
+        """
+        with self._lock:
+            if key is not None:
+                if key in self._busy:
+                    return False
+                self._busy.add(key)
+
+        def finish(callback, value):
+            with self._lock:
+                self._busy.discard(key)
+            if callback is not None:
+                callback(value)
+
+        def run():
+            try:
+                result = work()
+            except Exception as e:
+                print(f"Debug: Background task failed - {e}")
+                self.post(finish, error, e)
+                return
+            self.post(finish, done, result)
+
+        threading.Thread(target=run, name="whisper-task", daemon=True).start()
+        return True
+
+    def busy(self, key):
+        """True while run_async work with this key is running."""
+        with self._lock:
+            return key in self._busy
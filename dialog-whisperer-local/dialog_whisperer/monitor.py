@@ -0,0 +1,259 @@
+"""The capture -> OCR -> speak monitor loop, with injectable time and screen.
+
+``Monitor`` is the loop the GUI runs on its monitoring thread. It reads the
+time through a clock object and frames through a frame source, so tests and
+benchmarks can drive it with ``SimulatedClock`` and ``SyntheticScreen``:
+thousands of ticks run in milliseconds and every run is identical.
+"""
+
+import time
+
+
+class SystemClock:
+    """Wall-clock time."""
+
+    def now(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Clock whose time only moves when sleep() or advance() is called."""
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self._now += max(0.0, seconds)
+
+    advance = sleep
+
+
+class ScreenSource:
+    """Frames from the real screen (see ``capture``)."""
+
+    def capture(self, bbox):
+        from . import capture
+        return capture.capture_region(bbox)
+
+    def grab_monitor(self, bbox):
+        """Capture of the monitor holding bbox, with its top-left screen coordinate."""
+        from . import capture
+        return capture.capture_monitor(bbox)
+
+
+class SyntheticScreen:
+    """In-memory screen that shows scripted dialog boxes, rendered with PIL.
+
+    Example:
+        clock = SimulatedClock()
+        screen = SyntheticScreen(clock, [(0, ["Hello"]), (2.0, ["Goodbye"]), (5.0, None)])
+
+    Each script entry is (time, lines) or (time, lines, box): from that time
+    on, the dialog box shows those lines (None hides it). ``box`` is the
+    (left, top, right, bottom) of the dialog box and defaults to ``box``.
+    Frames are cached, so a tick costs one crop.
+    """
+
+    def __init__(self, clock, script=(), size=(1280, 720), box=(100, 500, 1180, 680),
+                 background=(70, 110, 160), box_color=(20, 20, 40), text_color=(255, 255, 255),
+                 font_size=28):
+        self.clock = clock
+        self.script = sorted(script, key=lambda entry: entry[0])
+        self.size = size
+        self.box = tuple(box)
+        self.background = background
+        self.box_color = box_color
+        self.text_color = text_color
+        self.font_size = font_size
+        self._font = None
+        self._frames = {}
+        self.captures = 0
+
+    def _current(self):
+        current = None
+        now = self.clock.now()
+        for entry in self.script:
+            if entry[0] > now:
+                break
+            current = entry
+        if current is None or current[1] is None:
+            return None, None
+        box = tuple(current[2]) if len(current) > 2 else self.box
+        return tuple(current[1]), box
+
+    def _get_font(self):
+        if self._font is None:
+            from PIL import ImageFont
+            try:
+                self._font = ImageFont.truetype("arial.ttf", self.font_size)
+            except Exception:
+                try:
+                    self._font = ImageFont.load_default(size=self.font_size)
+                except TypeError:
+                    # Pillow < 10.1 has a single fixed-size default font
+                    self._font = ImageFont.load_default()
+        return self._font
+
+    def frame(self):
+        """The whole screen as it looks at the clock's current time."""
+        from PIL import Image, ImageDraw
+
+        key = self._current()
+        frame = self._frames.get(key)
+        if frame is None:
+            lines, box = key
+            frame = Image.new('RGB', self.size, self.background)
+            if lines is not None:
+                draw = ImageDraw.Draw(frame)
+                draw.rectangle(box, fill=self.box_color)
+                y = box[1] + 16
+                for line in lines:
+                    draw.text((box[0] + 20, y), line, fill=self.text_color, font=self._get_font())
+                    y += int(self.font_size * 1.4)
+            self._frames[key] = frame
+        return frame
+
+    def capture(self, bbox):
+        self.captures += 1
+        return self.frame().crop(tuple(bbox))
+
+    def grab_monitor(self, bbox):
+        self.captures += 1
+        return self.frame(), (0, 0)
+
+
+class Monitor:
+    """Poll a region, read new dialog text and hand it to a callback.
+
+    Each tick follows the dialog box if a tracker is set, skips frames that
+    show a UI template, OCRs the frame through the confidence gate and calls
+    ``submit(text, confidence)`` when the text differs from the last line.
+    Repeated text is read again after ``conversation_timeout`` seconds
+    without new text.
+    """
+
+    def __init__(self, bbox, submit, source=None, clock=None, reader=None, gate=None,
+                 templates=None, tracker=None, interval=0.5, conversation_timeout=20,
+                 enabled=None, on_move=None, recorder=None, last_text=None):
+        """Create a monitor.
+
+        Args:
+            bbox: (left, top, right, bottom) region to read
+            submit: callable(text, confidence) for each new line
+            source: frame source with capture(bbox) and grab_monitor(bbox); default ScreenSource
+            clock: object with now() and sleep(seconds); default SystemClock
+            reader: ocr.BandReader (one is created if None)
+            gate: ocr.ConfidenceGate (one is created if None)
+            templates: optional templates.TemplateLibrary of UI screens to skip
+            tracker: optional tracker.RegionTracker to follow a moving dialog box
+            interval: seconds between ticks
+            conversation_timeout: seconds without new text before repeats are read again
+            enabled: optional callable; while it returns False ticks do nothing
+            on_move: optional callable(bbox) when the tracker moves the region
+            recorder: optional recorder.FrameRecorder that gets every frame the loop reads
+            last_text: line already submitted by the caller (e.g. the first read), so
+                the first tick does not submit it again
+        """
+        from . import ocr
+
+        self.bbox = tuple(bbox)
+        self.submit = submit
+        self.source = source or ScreenSource()
+        self.clock = clock or SystemClock()
+        self.reader = reader or ocr.BandReader()
+        self.gate = gate or ocr.ConfidenceGate()
+        self.templates = templates
+        self.tracker = tracker
+        self.interval = interval
+        self.conversation_timeout = conversation_timeout
+        self.enabled = enabled
+        self.on_move = on_move
+        self.recorder = recorder
+        self.last_text = last_text
+        self.last_activity = self.clock.now()
+        self.ui_visible = False
+        self.running = False
+        self.ticks = 0
+        self._stopped = False
+
+    def read(self, image):
+        """OCR a frame, re-capturing while the confidence gate rejects it.
+
+        Returns (text, mean confidence); text is None if the frame stayed low quality.
+        """
+        gate = self.gate
+        result = self.reader.read(image)
+        for _ in range(gate.retries):
+            if gate.accepts(result):
+                break
+            # Do not keep garbage lines; the retry reads every band again
+            self.reader.reset()
+            self.clock.sleep(gate.retry_delay)
+            result = self.reader.read(self.source.capture(self.bbox))
+        if not gate.accepts(result):
+            self.reader.reset()
+            print(f"Debug: Dropped low-confidence frame ({result.mean_confidence:.0f})")
+            return None, result.mean_confidence
+        return gate.text(result).strip(), result.mean_confidence
+
+    def tick(self):
+        """Run one capture/read cycle. Returns the submitted text or None."""
+        self.ticks += 1
+        if self.enabled is not None and not self.enabled():
+            return None
+        image = self.source.capture(self.bbox)
+
+        # Follow the dialog box if it moved since the last tick
+        if self.tracker is not None:
+            moved_to = self.tracker.follow(image, lambda: self.source.grab_monitor(self.bbox),
+                                           now=self.clock.now())
+            if moved_to is not None:
+                print(f"Debug: Dialog box moved to {moved_to}")
+                self.bbox = tuple(moved_to)
+                if self.on_move is not None:
+                    self.on_move(self.bbox)
+                image = self.source.capture(self.bbox)
+
+        if self.recorder is not None:
+            self.recorder.add(image, self.clock.now(), self.bbox)
+
+        # Skip frames that show one of the UI reference templates
+        self.ui_visible = self.templates is not None and self.templates.match(image) is not None
+        if self.ui_visible:
+            return None
+
+        text, confidence = self.read(image)
+        submitted = None
+        now = self.clock.now()
+        if text and text != self.last_text:
+            self.last_activity = now
+            self.last_text = text
+            self.submit(text, confidence)
+            submitted = text
+
+        if now - self.last_activity > self.conversation_timeout:
+            self.last_text = None  # Reset for new conversation
+        return submitted
+
+    def run(self, max_ticks=None):
+        """Tick every interval until stop() is called (or max_ticks ticks ran)."""
+        self.running = True
+        count = 0
+        while not self._stopped and (max_ticks is None or count < max_ticks):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Monitor error: {e}")
+            count += 1
+            self.clock.sleep(self.interval)
+        self.running = False
+
+    def stop(self):
+        """End run() after the current tick. Safe to call before run() starts."""
+        self._stopped = True
@@ -1,58 +1,195 @@
-"""Simple wrapper around pytesseract with lazy import."""
+"""OCR entry points; the engine comes from ``ocr_backends`` (lazy imports)."""
 
-def image_to_text(pil_image):
-    """Run OCR on a PIL image and return text. If pytesseract is missing, raises ImportError.
+from collections import namedtuple
+
+# One recognized word. conf is 0-100 (None if the engine has no confidences);
+# line groups words that Tesseract put on the same text line.
+OCRWord = namedtuple("OCRWord", "text conf left top width height line")
+
+
+class OCRResult:
+    """Recognized words with their confidences and bounding boxes."""
+
+    def __init__(self, words=(), text=None):
+        self.words = list(words)
+        self._text = text
+
+    @classmethod
+    def from_data(cls, data):
+        """Build a result from pytesseract ``image_to_data`` dict output."""
+        words = []
+        for i, word in enumerate(data["text"]):
+            if not word or not word.strip():
+                continue
+            conf = float(data["conf"][i])
+            words.append(OCRWord(
+                word, conf if conf >= 0 else None,
+                data["left"][i], data["top"][i], data["width"][i], data["height"][i],
+                (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+            ))
+        return cls(words)
+
+    @property
+    def text(self):
+        """Words joined with spaces, one text line per output line."""
+        if self._text is not None:
+            return self._text
+        return self.text_above(None)
+
+    def text_above(self, min_conf):
+        """Text built only from words whose confidence is at least min_conf."""
+        lines = {}
+        for w in self.words:
+            if min_conf is None or w.conf is None or w.conf >= min_conf:
+                lines.setdefault(w.line, []).append(w.text)
+        return "\n".join(" ".join(words) for words in lines.values())
+
+    @property
+    def mean_confidence(self):
+        """Character-weighted mean word confidence, or None if unknown."""
+        scored = [w for w in self.words if w.conf is not None]
+        if not scored:
+            return None
+        chars = sum(len(w.text) for w in scored)
+        return sum(w.conf * len(w.text) for w in scored) / chars
+
+    def __bool__(self):
+        return bool(self.text.strip())
+
+    def __repr__(self):
+        return "OCRResult(%r, mean_confidence=%r)" % (self.text, self.mean_confidence)
+
+
+class ConfidenceGate:
+    """Policy deciding whether an OCR result is clean enough to speak.
+
+    Transitional frames (fades, animations) produce garbage with low word
+    confidences. The monitor loop re-captures such frames up to ``retries``
+    times, ``retry_delay`` seconds apart, and drops them if they stay bad.
+    """
+
+    def __init__(self, min_confidence=60, min_word_confidence=30, max_low_ratio=0.5,
+                 retries=2, retry_delay=0.15):
+        """Create a gate.
+
+        Args:
+            min_confidence: minimum mean confidence (0-100) for a frame
+            min_word_confidence: words below this are considered garbage and not spoken
+            max_low_ratio: reject frames where more than this fraction of words is garbage
+            retries: re-captures to attempt for a rejected frame
+            retry_delay: seconds to wait before each re-capture
+        """
+        self.min_confidence = min_confidence
+        self.min_word_confidence = min_word_confidence
+        self.max_low_ratio = max_low_ratio
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    def accepts(self, result):
+        """True if the result should be spoken (empty and unscored results pass)."""
+        scored = [w for w in result.words if w.conf is not None]
+        if not scored:
+            return True
+        low = sum(1 for w in scored if w.conf < self.min_word_confidence)
+        if low / len(scored) > self.max_low_ratio:
+            return False
+        return result.mean_confidence >= self.min_confidence
+
+    def text(self, result):
+        """Text of an accepted result with garbage words removed."""
+        return result.text_above(self.min_word_confidence)
+
+
+class TextClassifier:
+    """Cheap check for whether a frame can contain text, run before OCR.
+
+    Text is made of sharp strokes, so a frame with text has steps between
+    neighbouring pixels that are much larger than in backgrounds, gradients
+    or compression noise. The frame is converted to grayscale and box-reduced
+    so its longer side is at most ``max_side`` pixels. Steps larger than
+    ``edge_threshold`` are counted horizontally and vertically. The frame may
+    hold text when that edge density is at least ``min_edge_density``. A
+    1080x180 dialog region takes about 0.4 ms. The box reduction still reads
+    every pixel, so the cost grows with the frame: a full 1920x1080 screen
+    takes about 3 ms. Run it on the dialog region, not the whole monitor.
+    Blank, uniformly colored and empty dialog boxes never reach Tesseract.
+    """
+
+    def __init__(self, max_side=400, edge_threshold=40, min_edge_density=0.0003, max_edge_density=None):
+        """Create a classifier.
+
+        Args:
+            max_side: longer side of the reduced frame (0 keeps full resolution)
+            edge_threshold: gray-level step (0-255) that counts as a stroke edge
+            min_edge_density: fraction of edge pixels needed to call the frame text
+            max_edge_density: optional upper bound; busier frames (foliage, noise)
+                are treated as containing no dialog text
+        """
+        self.max_side = max_side
+        self.edge_threshold = edge_threshold
+        self.min_edge_density = min_edge_density
+        self.max_edge_density = max_edge_density
+
+    def edge_density(self, pil_image):
+        """Fraction of neighbouring pixel pairs with a step above edge_threshold."""
+        import numpy as np
+
+        # Box-reduce before the grayscale conversion so only the small frame is converted
+        longest = max(pil_image.size)
+        if self.max_side and longest > self.max_side:
+            pil_image = pil_image.reduce(-(-longest // self.max_side))
+        gray = pil_image.convert('L')
+        pixels = np.asarray(gray, dtype=np.int16)
+        if pixels.shape[0] < 2 or pixels.shape[1] < 2:
+            return 0.0
+        edges = (np.count_nonzero(np.abs(np.diff(pixels, axis=1)) > self.edge_threshold)
+                 + np.count_nonzero(np.abs(np.diff(pixels, axis=0)) > self.edge_threshold))
+        return edges / (2.0 * pixels.size)
+
+    def likely_has_text(self, pil_image):
+        """True if the frame has enough stroke edges to be worth OCR."""
+        density = self.edge_density(pil_image)
+        if density < self.min_edge_density:
+            return False
+        return self.max_edge_density is None or density <= self.max_edge_density
+
+
+# Used for every OCR call; set its attributes to tune the thresholds
+text_classifier = TextClassifier()
+
+
+def _is_blank(pil_image):
+    """True if the image has no text-like edges (blank, uniform or empty box)."""
+    return not text_classifier.likely_has_text(pil_image)
+
+def image_to_text(pil_image, backend=None, config=None):
+    """Run OCR on a PIL image and return text. If the OCR engine is missing, raises ImportError.
 
     Args:
         pil_image: PIL.Image instance
+        backend: optional backend name; defaults to $DIALOG_WHISPER_OCR_BACKEND
+        config: optional ocr_backends.OCRConfig (languages, page segmentation mode, ...)
 
     Returns:
         str: recognized text (may be empty)
-        
+
     Raises:
-        ImportError: If pytesseract is not available
+        ImportError: If the OCR engine (pytesseract by default) is not available
     """
-    try:
-        import pytesseract
-        from PIL import ImageStat
-        import os
-        
-        # Check common Windows installation path
-        tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-        if os.path.exists(tesseract_path):
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
-            print(f"Debug: Found Tesseract at {tesseract_path}")
-        else:
-            print("Debug: Tesseract not found in Program Files, will try PATH")
-    except ImportError as e:
-        if "pytesseract" in str(e):
-            raise ImportError(
-                "Tesseract not found. Please install Tesseract OCR:\n"
-                "1. Download from: https://github.com/UB-Mannheim/tesseract/wiki\n"
-                "2. Install to C:\\Program Files\\Tesseract-OCR\n"
-                "3. Restart the application"
-            )
-        raise ImportError(str(e))
-
-    # Check if image is blank or nearly blank
-    stat = ImageStat.Stat(pil_image)
-    if len(stat.mean) >= 3:  # RGB or RGBA image
-        # Check if image is mostly white
-        if all(x > 250 for x in stat.mean[:3]):  # Check RGB channels
-            print("Debug: Image appears to be blank (mostly white)")
-            return ""
+    from .ocr_backends import config_kwargs, get_backend
+    engine = get_backend(backend)
+
+    if _is_blank(pil_image):
+        print("Debug: Image appears to be blank (no text-like edges)")
+        return ""
 
     try:
-        # Try to get tesseract version to confirm it's working
-        version = pytesseract.get_tesseract_version()
-        print(f"Debug: Tesseract version {version}")
-        
         # Save debug image to see what's being processed
         debug_path = "ocr_debug.png"
         pil_image.save(debug_path)
         print(f"Debug: Saved capture to {debug_path}")
-        
-        text = pytesseract.image_to_string(pil_image)
+
+        text = engine.image_to_text(pil_image, **config_kwargs(config))
         if not text.strip():
             print("Debug: OCR returned no text")
         else:
@@ -61,3 +198,190 @@ def image_to_text(pil_image):
     except Exception as e:
         print(f"Debug: OCR failed - {str(e)}")
         return ""
+
+def images_to_text(images, backend=None, config=None):
+    """Run OCR on several crops (e.g. name, body, choices) in one engine invocation.
+
+    Blank crops are skipped. The pytesseract backend tiles the remaining crops
+    into one image so a single tesseract process handles all of them; the
+    tesserocr backend feeds them through its persistent engine.
+
+    Args:
+        images: list of PIL.Image
+        backend: optional backend name; defaults to $DIALOG_WHISPER_OCR_BACKEND
+        config: optional ocr_backends.OCRConfig (languages, page segmentation mode, ...)
+
+    Returns:
+        list of str: one result per input image, in order
+
+    Raises:
+        ImportError: If the OCR engine is not available
+    """
+    from .ocr_backends import config_kwargs, get_backend
+    engine = get_backend(backend)
+
+    results = [""] * len(images)
+    todo = [i for i, img in enumerate(images) if not _is_blank(img)]
+    if not todo:
+        return results
+    try:
+        texts = engine.images_to_text([images[i] for i in todo], **config_kwargs(config))
+    except Exception as e:
+        print(f"Debug: OCR failed - {str(e)}")
+        return results
+    for i, text in zip(todo, texts):
+        results[i] = text
+    return results
+
+def image_to_result(pil_image, backend=None, config=None):
+    """Run OCR and return an OCRResult with per-word confidences and boxes.
+
+    Args:
+        pil_image: PIL.Image instance
+        backend: optional backend name; defaults to $DIALOG_WHISPER_OCR_BACKEND
+        config: optional ocr_backends.OCRConfig (languages, page segmentation mode, ...)
+
+    Returns:
+        OCRResult: empty for blank images or when OCR fails
+
+    Raises:
+        ImportError: If the OCR engine is not available
+    """
+    from .ocr_backends import config_kwargs, get_backend
+    engine = get_backend(backend)
+
+    if _is_blank(pil_image):
+        return OCRResult()
+    try:
+        return engine.image_to_result(pil_image, **config_kwargs(config))
+    except Exception as e:
+        print(f"Debug: OCR failed - {str(e)}")
+        return OCRResult()
+
+def images_to_results(images, backend=None, config=None):
+    """Like ``images_to_text`` but returns an OCRResult per crop.
+
+    Returns:
+        list of OCRResult: one per input image, empty for blank crops
+
+    Raises:
+        ImportError: If the OCR engine is not available
+    """
+    from .ocr_backends import config_kwargs, get_backend
+    engine = get_backend(backend)
+
+    results = [OCRResult() for _ in images]
+    todo = [i for i, img in enumerate(images) if not _is_blank(img)]
+    if not todo:
+        return results
+    try:
+        found = engine.images_to_results([images[i] for i in todo], **config_kwargs(config))
+    except Exception as e:
+        print(f"Debug: OCR failed - {str(e)}")
+        return results
+    for i, result in zip(todo, found):
+        results[i] = result
+    return results
+
+
+class BandReader:
+    """OCR a region incrementally, re-reading only the text lines that changed.
+
+    Frames are split into line bands by ``capture.DirtyRegionDetector``.
+    Clean bands keep their previous result; dirty bands are looked up by
+    content first (so lines that scrolled to a new position are not read
+    again) and the rest are recognized together in one ``images_to_results``
+    call. OCR cost follows the number of changed lines, not the region size.
+    Under a single-line config (PSM 7 and similar) bands are read one by one
+    instead, since the tiled image holds several lines.
+    """
+
+    def __init__(self, detector=None, backend=None, cache_size=256, config=None):
+        """Create a reader.
+
+        Args:
+            detector: capture.DirtyRegionDetector; a default one is created if None
+            backend: optional OCR backend name
+            cache_size: band images remembered by content
+            config: optional ocr_backends.OCRConfig for this region (see set_config)
+        """
+        from collections import OrderedDict
+        from .capture import DirtyRegionDetector
+
+        self.detector = detector or DirtyRegionDetector()
+        self.backend = backend
+        self.config = config
+        self.cache_size = cache_size
+        self._by_band = {}
+        self._by_content = OrderedDict()
+        self._result = OCRResult()
+        # Counters for tuning: bands recognized vs. taken from a cache
+        self.bands_read = 0
+        self.bands_reused = 0
+
+    def reset(self):
+        """Drop all cached results, e.g. after a frame was rejected as garbage."""
+        self.detector.reset()
+        self._by_band.clear()
+        self._by_content.clear()
+        self._result = OCRResult()
+
+    def set_config(self, config):
+        """Use another OCR config; cached results from the old one are dropped."""
+        if config != self.config:
+            self.config = config
+            self.reset()
+
+    def read(self, image):
+        """Return an OCRResult for the whole region.
+
+        Word boxes are in region coordinates and each band's lines stay separate.
+        """
+        bands, dirty = self.detector.update(image)
+        if not any(dirty) and set(bands) == set(self._by_band):
+            self.bands_reused += len(bands)
+            return self._result
+
+        results = [None] * len(bands)
+        keys = {}
+        for i, band in enumerate(bands):
+            if not dirty[i] and band in self._by_band:
+                results[i] = self._by_band[band]
+                continue
+            crop = image.crop((0, band[0], image.width, band[1]))
+            key = (crop.size, hash(crop.tobytes()))
+            cached = self._by_content.get(key)
+            if cached is not None:
+                self._by_content.move_to_end(key)
+                results[i] = cached
+            else:
+                keys[i] = (key, crop)
+        self.bands_reused += len(bands) - len(keys)
+
+        if keys:
+            todo = sorted(keys)
+            crops = [keys[i][1] for i in todo]
+            if self.config is not None and self.config.single_line:
+                # Tiling stacks bands into one multi-line image, which a
+                # single-line PSM would misread; each band is one line anyway
+                found = [images_to_results([crop], backend=self.backend, config=self.config)[0]
+                         for crop in crops]
+            else:
+                found = images_to_results(crops, backend=self.backend, config=self.config)
+            self.bands_read += len(todo)
+            for i, result in zip(todo, found):
+                results[i] = result
+                self._by_content[keys[i][0]] = result
+            while len(self._by_content) > self.cache_size:
+                self._by_content.popitem(last=False)
+
+        self._by_band = dict(zip(bands, results))
+        words = []
+        texts = []
+        for i, (band, result) in enumerate(zip(bands, results)):
+            words.extend(w._replace(top=w.top + band[0], line=(i, w.line)) for w in result.words)
+            if not result.words and result.text:
+                texts.append(result.text)
+        # Engines without word data only return text
+        self._result = OCRResult(words, text=None if words else "\n".join(texts))
+        return self._result
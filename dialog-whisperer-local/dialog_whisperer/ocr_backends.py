@@ -0,0 +1,500 @@
+"""Pluggable OCR backends (lazy imports).
+
+The backend is selected with the ``DIALOG_WHISPER_OCR_BACKEND`` environment
+variable, the same way ``DIALOG_WHISPER_TTS_BACKEND`` selects the TTS engine.
+Built in:
+- ``pytesseract``: runs the tesseract executable once per call (default)
+- ``tesserocr``: keeps one Tesseract instance loaded in-process
+
+Other engines can be added with ``register_backend``.
+
+Recognition settings (languages, page segmentation mode, character
+whitelist, DPI hint) travel with each call as an ``OCRConfig``. A dialog
+region that is known to hold one block of text should use PSM 6 (or 7 for a
+single line) and only the languages the game uses; Tesseract then skips its
+layout analysis and loads less traineddata. The tesserocr backend keeps one
+engine per language set, loaded the first time that set is used.
+"""
+
+import threading
+
+DEFAULT_BACKEND = "pytesseract"
+# White space in pixels between crops packed into one image
+TILE_GAP = 24
+
+DEFAULT_LANG = "eng"
+
+_BACKENDS = {}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+class OCRConfig:
+    """Tesseract settings for one capture region.
+
+    Single-line modes (PSM 7, 8, 10, 13) must not be used on tiled images:
+    ``ocr.BandReader`` therefore reads bands one at a time under such a config.
+    """
+
+    # Page segmentation modes that expect exactly one line (or word/character)
+    SINGLE_LINE_PSMS = (7, 8, 10, 13)
+
+    def __init__(self, lang=None, psm=None, whitelist=None, dpi=None):
+        """Create a config; None leaves Tesseract's default in place.
+
+        Args:
+            lang: language list such as "eng" or "eng+jpn" (default eng)
+            psm: page segmentation mode, e.g. 6 (one block of text) or 7 (one line)
+            whitelist: characters the engine may output
+            dpi: resolution hint for small or scaled captures
+        """
+        if isinstance(lang, (list, tuple)):
+            lang = "+".join(lang)
+        self.lang = lang or DEFAULT_LANG
+        self.psm = int(psm) if psm is not None else None
+        self.whitelist = whitelist or None
+        self.dpi = int(dpi) if dpi else None
+
+    @classmethod
+    def from_dict(cls, settings):
+        """Build a config from a profile's OCR settings (other keys are ignored)."""
+        settings = settings or {}
+        return cls(lang=settings.get("lang"), psm=settings.get("psm"),
+                   whitelist=settings.get("whitelist"), dpi=settings.get("dpi"))
+
+    def to_dict(self):
+        return {"lang": self.lang, "psm": self.psm, "whitelist": self.whitelist, "dpi": self.dpi}
+
+    @property
+    def single_line(self):
+        return self.psm in self.SINGLE_LINE_PSMS
+
+    @property
+    def languages(self):
+        return self.lang.split("+")
+
+    def tesseract_args(self):
+        """Extra command-line options for the tesseract executable."""
+        import shlex
+        args = []
+        if self.psm is not None:
+            args.append("--psm %d" % self.psm)
+        if self.dpi:
+            args.append("--dpi %d" % self.dpi)
+        if self.whitelist:
+            # Quote so spaces and shell-special characters survive pytesseract's arg split
+            args.append("-c tessedit_char_whitelist=%s" % shlex.quote(self.whitelist))
+        return " ".join(args)
+
+    def __eq__(self, other):
+        return isinstance(other, OCRConfig) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash((self.lang, self.psm, self.whitelist, self.dpi))
+
+    def __repr__(self):
+        return "OCRConfig(%s)" % ", ".join("%s=%r" % kv for kv in self.to_dict().items() if kv[1] is not None)
+
+
+def default_config():
+    """Config for dialog regions from $DIALOG_WHISPER_OCR_LANG and $DIALOG_WHISPER_OCR_PSM.
+
+    The page segmentation mode defaults to 6: a dialog region is one block of text.
+    """
+    import os
+    psm = os.environ.get("DIALOG_WHISPER_OCR_PSM", "6")
+    return OCRConfig(lang=os.environ.get("DIALOG_WHISPER_OCR_LANG") or None,
+                     psm=int(psm) if psm.strip() else None)
+
+
+def config_kwargs(config):
+    """Pass config only when set, so backends written before OCRConfig keep working."""
+    return {} if config is None else {"config": config}
+
+
+class OCRBackend:
+    """Common interface for OCR engines.
+
+    Every method takes an optional ``OCRConfig``; None means the engine's defaults.
+    """
+
+    name = None
+    # Persistent backends hold an engine and are created once per process
+    persistent = False
+
+    def image_to_text(self, pil_image, config=None):
+        """Return the text recognized in a PIL image."""
+        raise NotImplementedError
+
+    def images_to_text(self, images, config=None):
+        """Return one string per image. Backends override this when they can batch."""
+        return [self.image_to_text(img, **config_kwargs(config)) for img in images]
+
+    def image_to_result(self, pil_image, config=None):
+        """Return an ``ocr.OCRResult``. Engines without word data return text only."""
+        from .ocr import OCRResult
+        return OCRResult(text=self.image_to_text(pil_image, **config_kwargs(config)))
+
+    def images_to_results(self, images, config=None):
+        """Return one ``ocr.OCRResult`` per image. Backends override this when they can batch."""
+        return [self.image_to_result(img, **config_kwargs(config)) for img in images]
+
+    def close(self):
+        """Release engine resources."""
+
+
+def register_backend(name, factory):
+    """Register an OCR backend class (or zero-argument factory) under a name."""
+    _BACKENDS[name.lower()] = factory
+
+
+def available_backends():
+    """Names of all registered backends, whether or not their deps are installed."""
+    return sorted(_BACKENDS)
+
+
+def get_backend(name=None):
+    """Return an OCR backend instance.
+
+    Args:
+        name: backend name; defaults to $DIALOG_WHISPER_OCR_BACKEND or pytesseract
+
+    Raises:
+        ImportError: If the default backend's dependencies are not available
+    """
+    import os
+    if name is None:
+        name = os.environ.get("DIALOG_WHISPER_OCR_BACKEND", DEFAULT_BACKEND)
+    name = name.lower()
+    if name != DEFAULT_BACKEND:
+        try:
+            return _create(name)
+        except Exception as e:
+            print("OCR backend %r requested but failed to load: %s" % (name, e))
+    return _create(DEFAULT_BACKEND)
+
+
+def _create(name):
+    factory = _BACKENDS.get(name)
+    if factory is None:
+        raise KeyError("unknown OCR backend %r (available: %s)" % (name, ", ".join(available_backends())))
+    if not getattr(factory, "persistent", False):
+        return factory()
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = factory()
+        return _instances[name]
+
+
+def close_backends():
+    """Close and forget all persistent backend instances."""
+    with _instances_lock:
+        for backend in _instances.values():
+            try:
+                backend.close()
+            except Exception:
+                pass
+        _instances.clear()
+
+
+class PytesseractBackend(OCRBackend):
+    """Tesseract via the pytesseract wrapper (one process per call)."""
+
+    name = "pytesseract"
+
+    def __init__(self):
+        try:
+            import pytesseract
+            import os
+
+            # Check common Windows installation path
+            tesseract_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+            if os.path.exists(tesseract_path):
+                pytesseract.pytesseract.tesseract_cmd = tesseract_path
+                print(f"Debug: Found Tesseract at {tesseract_path}")
+            else:
+                print("Debug: Tesseract not found in Program Files, will try PATH")
+        except ImportError as e:
+            if "pytesseract" in str(e):
+                raise ImportError(
+                    "Tesseract not found. Please install Tesseract OCR:\n"
+                    "1. Download from: https://github.com/UB-Mannheim/tesseract/wiki\n"
+                    "2. Install to C:\\Program Files\\Tesseract-OCR\n"
+                    "3. Restart the application"
+                )
+            raise ImportError(str(e))
+        self._pytesseract = pytesseract
+
+    @staticmethod
+    def _options(config):
+        """Keyword arguments for pytesseract calls; none for the default config."""
+        if config is None:
+            return {}
+        return {"lang": config.lang, "config": config.tesseract_args()}
+
+    def image_to_text(self, pil_image, config=None):
+        return self._pytesseract.image_to_string(pil_image, **self._options(config))
+
+    def _image_to_data(self, pil_image, config):
+        return self._pytesseract.image_to_data(pil_image, output_type=self._pytesseract.Output.DICT,
+                                               **self._options(config))
+
+    def images_to_text(self, images, config=None):
+        """Recognize all crops with one tesseract process by tiling them into one image."""
+        if len(images) <= 1:
+            return [self.image_to_text(img, config) for img in images]
+        tiled, offsets = tile_images(images)
+        return split_tiled_data(self._image_to_data(tiled, config), offsets)
+
+    def image_to_result(self, pil_image, config=None):
+        from .ocr import OCRResult
+        return OCRResult.from_data(self._image_to_data(pil_image, config))
+
+    def images_to_results(self, images, config=None):
+        """Word-level results for all crops from one tesseract process."""
+        if len(images) <= 1:
+            return [self.image_to_result(img, config) for img in images]
+        tiled, offsets = tile_images(images)
+        return split_tiled_results(self._image_to_data(tiled, config), offsets)
+
+
+class TesserocrBackend(OCRBackend):
+    """Tesseract through tesserocr's in-process API; the engines stay loaded.
+
+    One ``PyTessBaseAPI`` is kept per language set. Each is created (and its
+    traineddata loaded) the first time a config asks for those languages.
+    Page segmentation mode, whitelist and DPI are per-call settings, applied
+    only when they differ from the engine's current ones.
+    """
+
+    name = "tesserocr"
+    persistent = True
+
+    def __init__(self):
+        try:
+            import tesserocr
+        except Exception as e:
+            raise ImportError("tesserocr is required for the tesserocr OCR backend: %s" % e)
+        self._tesserocr = tesserocr
+        self._apis = {}  # lang -> PyTessBaseAPI
+        self._applied = {}  # lang -> (psm, whitelist, dpi) currently set on that engine
+        self._installed = None
+        # PyTessBaseAPI is not thread-safe
+        self._lock = threading.Lock()
+
+    def _engine(self, config):
+        """Engine for config's languages with its settings applied. Call with the lock held.
+
+        Raises:
+            ValueError: If a requested language has no traineddata installed
+        """
+        config = config or OCRConfig()
+        api = self._apis.get(config.lang)
+        if api is None:
+            if self._installed is None:
+                self._installed = set(self._tesserocr.get_languages()[1])
+            missing = [lang for lang in config.languages if lang not in self._installed]
+            if missing:
+                raise ValueError("no traineddata for %s (installed: %s)"
+                                 % ("+".join(missing), ", ".join(sorted(self._installed))))
+            print(f"Debug: Loading Tesseract languages {config.lang}")
+            api = self._apis[config.lang] = self._tesserocr.PyTessBaseAPI(lang=config.lang)
+        settings = (config.psm, config.whitelist, config.dpi)
+        if self._applied.get(config.lang) != settings:
+            psm = self._tesserocr.PSM.AUTO if config.psm is None else config.psm
+            api.SetPageSegMode(psm)
+            api.SetVariable("tessedit_char_whitelist", config.whitelist or "")
+            api.SetVariable("user_defined_dpi", str(config.dpi or 0))
+            self._applied[config.lang] = settings
+        return api
+
+    def image_to_text(self, pil_image, config=None):
+        with self._lock:
+            api = self._engine(config)
+            api.SetImage(pil_image)
+            return api.GetUTF8Text()
+
+    def images_to_text(self, images, config=None):
+        with self._lock:
+            api = self._engine(config)
+            results = []
+            for img in images:
+                api.SetImage(img)
+                results.append(api.GetUTF8Text())
+            return results
+
+    def image_to_result(self, pil_image, config=None):
+        import tesserocr
+        from .ocr import OCRResult, OCRWord
+
+        level = tesserocr.RIL.WORD
+        words = []
+        line = 0
+        with self._lock:
+            api = self._engine(config)
+            api.SetImage(pil_image)
+            api.Recognize()
+            iterator = api.GetIterator()
+            for item in tesserocr.iterate_level(iterator, level):
+                text = item.GetUTF8Text(level)
+                if not text or not text.strip():
+                    continue
+                if item.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                    line += 1
+                x1, y1, x2, y2 = item.BoundingBox(level)
+                words.append(OCRWord(text, item.Confidence(level), x1, y1, x2 - x1, y2 - y1, line))
+        return OCRResult(words)
+
+    def close(self):
+        with self._lock:
+            for api in self._apis.values():
+                api.End()
+            self._apis.clear()
+            self._applied.clear()
+
+
+def tile_images(images, gap=TILE_GAP):
+    """Stack crops vertically on one white canvas so they can be OCR'd in one pass.
+
+    Crops are converted to grayscale and dark-background crops are inverted,
+    so Tesseract's global threshold suits every tile.
+
+    Returns:
+        tuple: (PIL.Image, offsets) where offsets[i] is the (top, bottom) row range of crop i
+    """
+    from PIL import Image, ImageOps, ImageStat
+
+    prepared = []
+    for img in images:
+        gray = img.convert('L')
+        if ImageStat.Stat(gray).mean[0] < 128:
+            gray = ImageOps.invert(gray)
+        prepared.append(gray)
+
+    width = max(g.width for g in prepared) + 2 * gap
+    height = sum(g.height for g in prepared) + gap * (len(prepared) + 1)
+    canvas = Image.new('L', (width, height), 255)
+    offsets = []
+    y = gap
+    for g in prepared:
+        canvas.paste(g, (gap, y))
+        offsets.append((y, y + g.height))
+        y += g.height + gap
+    return canvas, offsets
+
+
+def _tile_words(data, offsets):
+    """Yield (word index, tile index) for each word of a tiled ``image_to_data`` result.
+
+    Each word goes to the tile containing its vertical center (words in a gap
+    go to the nearest tile above).
+    """
+    import bisect
+
+    tops = [top for top, _ in offsets]
+    for i, word in enumerate(data["text"]):
+        if not word or not word.strip():
+            continue
+        center = data["top"][i] + data["height"][i] / 2.0
+        yield i, max(0, bisect.bisect_right(tops, center) - 1)
+
+
+def split_tiled_data(data, offsets):
+    """Split ``image_to_data`` output for a tiled image back into one string per tile.
+
+    Words are joined per Tesseract line.
+    """
+    crops = [{} for _ in offsets]
+    for i, idx in _tile_words(data, offsets):
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        crops[idx].setdefault(key, []).append(data["text"][i])
+    return ["\n".join(" ".join(words) for words in lines.values()) for lines in crops]
+
+
+def split_tiled_results(data, offsets, gap=TILE_GAP):
+    """Split ``image_to_data`` output for a tiled image into one ``ocr.OCRResult`` per tile.
+
+    Word boxes are made relative to their tile.
+    """
+    from .ocr import OCRResult, OCRWord
+
+    crops = [[] for _ in offsets]
+    for i, idx in _tile_words(data, offsets):
+        conf = float(data["conf"][i])
+        crops[idx].append(OCRWord(
+            data["text"][i], conf if conf >= 0 else None,
+            data["left"][i] - gap, data["top"][i] - offsets[idx][0],
+            data["width"][i], data["height"][i],
+            (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+        ))
+    return [OCRResult(words) for words in crops]
+
+
+register_backend(PytesseractBackend.name, PytesseractBackend)
+register_backend(TesserocrBackend.name, TesserocrBackend)
+
+
+def text_accuracy(expected, actual):
+    """Similarity of two strings in [0, 1], ignoring case and whitespace layout."""
+    import difflib
+    a = " ".join(expected.lower().split())
+    b = " ".join(actual.lower().split())
+    if not a and not b:
+        return 1.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def benchmark(images, expected=None, backends=None, repeat=1, tiled=False, tile_batch=8):
+    """Run each backend over the same images and report speed and accuracy.
+
+    Every backend OCRs one image per image_to_text call, so rows are
+    comparable. With tiled=True each backend gets a second row, labeled
+    ``"<name> (tiled)"``, that passes tile_batch images at a time to
+    images_to_text (pytesseract then reads them from one tiled canvas).
+
+    Args:
+        images: list of PIL.Image
+        expected: optional list of ground-truth strings, one per image
+        backends: backend names to run; defaults to every registered backend
+        repeat: passes over the corpus per backend (the fastest pass is reported)
+        tiled: also benchmark batched images_to_text calls
+        tile_batch: images per batched call
+
+    Returns:
+        dict: row name -> {"ms_per_image", "accuracy", "error"}; backends that
+        fail to load report only "error"
+    """
+    import time
+
+    def per_image(backend):
+        return [backend.image_to_text(img) for img in images]
+
+    def batched(backend):
+        step = max(1, tile_batch)
+        texts = []
+        for i in range(0, len(images), step):
+            texts.extend(backend.images_to_text(images[i:i + step]))
+        return texts
+
+    modes = [("", per_image)] + ([(" (tiled)", batched)] if tiled else [])
+    results = {}
+    for name in backends or available_backends():
+        try:
+            backend = _create(name.lower())
+        except Exception as e:
+            results[name] = {"error": str(e)}
+            continue
+        for suffix, run in modes:
+            best = None
+            texts = []
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                texts = run(backend)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            entry = {"ms_per_image": 1000.0 * best / max(1, len(images)), "accuracy": None, "error": None}
+            if expected is not None:
+                scores = [text_accuracy(e, t) for e, t in zip(expected, texts)]
+                entry["accuracy"] = sum(scores) / len(scores) if scores else None
+            results[name + suffix] = entry
+    return results
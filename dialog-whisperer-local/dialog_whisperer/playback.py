@@ -0,0 +1,357 @@
+"""Preemptible speech playback driven by a priority queue.
+
+``PlaybackController`` owns the speaking thread. New dialog is submitted with
+``submit()``; by default the newest line wins: it interrupts
+the utterance in progress and older pending lines are dropped as stale.
+
+``AdaptiveRate`` speeds speech up when dialog arrives faster than it can be
+spoken, so the lag between a line appearing and being heard stays bounded.
+"""
+
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+# Average characters per spoken word including the space, for rate estimates
+CHARS_PER_WORD = 6.0
+
+
+class AdaptiveRate:
+    """Pick a speech rate that keeps end-to-end lag under a target.
+
+    The controller tracks how many characters arrived recently and how many
+    are waiting. The speed needed is the one that keeps up with arrivals and
+    also clears the backlog within ``target_lag`` seconds. The speed moves
+    towards that value gradually, so speech does not jump between lines.
+    """
+
+    def __init__(self, base_rate=200, max_speed=1.6, target_lag=5.0, window=30.0,
+                 smoothing=0.5, skip=False):
+        """Create a rate controller.
+
+        Args:
+            base_rate: normal speech rate in words per minute (pyttsx3's default is 200)
+            max_speed: highest multiple of base_rate to use
+            target_lag: seconds of backlog to aim for
+            window: seconds of arrivals used for the arrival rate
+            smoothing: fraction of the distance to the needed speed covered per line
+            skip: drop the oldest pending lines when even max_speed cannot meet target_lag
+        """
+        self.base_rate = base_rate
+        self.max_speed = max_speed
+        self.target_lag = target_lag
+        self.window = window
+        self.smoothing = smoothing
+        self.skip = skip
+        self.speed = 1.0
+        self._arrivals = collections.deque()  # (time, chars)
+        self._arrived_chars = 0
+
+    def chars_per_second(self, speed=1.0):
+        return self.base_rate * speed * CHARS_PER_WORD / 60.0
+
+    def arrived(self, text, now=None):
+        """Record a submitted line."""
+        now = time.monotonic() if now is None else now
+        self._arrivals.append((now, len(text)))
+        self._arrived_chars += len(text)
+        self._expire(now)
+
+    def _expire(self, now):
+        while self._arrivals and now - self._arrivals[0][0] > self.window:
+            self._arrived_chars -= self._arrivals.popleft()[1]
+
+    def arrival_rate(self, now=None):
+        """Characters per second submitted over the last window."""
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        return self._arrived_chars / self.window
+
+    def lag(self, backlog_chars, speed=None):
+        """Seconds needed to speak backlog_chars at the given (default current) speed."""
+        return backlog_chars / self.chars_per_second(self.speed if speed is None else speed)
+
+    def over_budget(self, backlog_chars):
+        """True if skipping is enabled and the backlog cannot meet target_lag even at max speed."""
+        return self.skip and self.lag(backlog_chars, self.max_speed) > self.target_lag
+
+    def next_rate(self, backlog_chars, now=None):
+        """Update the speed for the next line and return it as a rate in words per minute.
+
+        Args:
+            backlog_chars: characters still waiting after the line about to be spoken
+
+        Returns:
+            int rate; base_rate once the backlog is cleared, so an engine left at a
+            raised rate is set back to normal
+        """
+        needed = self.arrival_rate(now) + backlog_chars / self.target_lag
+        wanted = min(self.max_speed, max(1.0, needed / self.chars_per_second()))
+        self.speed += self.smoothing * (wanted - self.speed)
+        if self.speed < 1.02:
+            self.speed = 1.0
+            return self.base_rate
+        return int(round(self.base_rate * self.speed))
+
+
+class PlaybackController:
+    """Speak submitted text on a background thread, newest line first."""
+
+    def __init__(self, speak_fn=None, stop_fn=None, preempt=True, max_age=None, on_state=None,
+                 on_line=None, rate_control=None, batch_fn=None, max_batch=1, generation_fn=None,
+                 report_start=None):
+        """Create a controller.
+
+        Args:
+            speak_fn: callable(text) that blocks while speaking; defaults to tts.speak
+            stop_fn: callable() that interrupts speak_fn; defaults to tts.stop
+            preempt: if True, newer lines interrupt the current one and older
+                pending lines are dropped. If False, lines are spoken in order.
+            max_age: drop pending lines older than this many seconds (None keeps all)
+            on_state: optional callable(speaking: bool) called on the playback thread
+            on_line: optional callable(text, meta, tts_latency) called once per
+                line. tts_latency is the seconds from submit() until its audio
+                started (with report_start) or until it was handed to speak_fn;
+                it is None for lines dropped as stale or stopped before any audio
+                played. With report_start the call may come from the TTS engine's
+                thread. Lines removed by clear() or shutdown() are not reported.
+            rate_control: optional AdaptiveRate; speak_fn is then called as
+                speak_fn(text, rate=rate) with the rate it picks
+            batch_fn: callable(texts) that speaks several lines back to back;
+                defaults to tts.speak_many when speak_fn is the default
+            max_batch: in-order mode only, speak up to this many pending lines
+                of the same priority with one batch_fn call
+            generation_fn: callable() returning a token that stop_fn invalidates
+                (tts.current_generation by default with the default stop_fn). The
+                token is taken under the lock when a line is picked and passed as
+                speak_fn(..., generation=token), so a line preempted before it
+                starts playing is not spoken.
+            report_start: speak_fn and batch_fn take on_start=callable() and call
+                it when audio starts, which times tts_latency; True by default
+                with the default speak_fn
+        """
+        if speak_fn is None or stop_fn is None:
+            from . import tts
+            if speak_fn is None and batch_fn is None:
+                batch_fn = tts.speak_many
+            if stop_fn is None and generation_fn is None:
+                generation_fn = tts.current_generation
+            if speak_fn is None and report_start is None:
+                report_start = True
+            speak_fn = speak_fn or tts.speak
+            stop_fn = stop_fn or tts.stop
+        self.speak_fn = speak_fn
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, int(max_batch))
+        self.stop_fn = stop_fn
+        self.preempt = preempt
+        self.max_age = max_age
+        self.on_state = on_state
+        self.on_line = on_line
+        self.rate_control = rate_control
+        self.generation_fn = generation_fn
+        self.report_start = bool(report_start)
+
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._current = None  # (priority, seq) of the item being spoken
+        self._running = False
+        self._run_id = 0  # bumped by start(); a thread from an earlier run exits
+        self._thread = None
+        self.dropped = 0
+
+    def _key(self, priority, seq):
+        # heapq pops the smallest key: higher priority first, then newest
+        # (preempt) or oldest (in-order) within a priority
+        return (-priority, -seq if self.preempt else seq)
+
+    def start(self):
+        """Start the playback thread. Calling start twice is a no-op.
+
+        A thread left over from before shutdown() (still inside speak_fn when
+        the join timed out) sees the new run and exits without taking lines.
+        """
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._run_id += 1
+            run_id = self._run_id
+            self._current = None
+        self._thread = threading.Thread(target=self._run, args=(run_id,), name="whisper-playback",
+                                        daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout=1.0):
+        """Stop the thread, drop pending lines and interrupt the current one."""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify_all()
+        self.cancel_current()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, text, priority=0, meta=None):
+        """Queue text for speaking. Returns immediately.
+
+        In preempt mode the current utterance is interrupted if the new line
+        has the same or a higher priority. ``meta`` is passed back to on_line.
+        """
+        if not text:
+            return
+        with self._cond:
+            seq = next(self._seq)
+            if self.rate_control is not None:
+                self.rate_control.arrived(text)
+            heapq.heappush(self._heap, (self._key(priority, seq), seq, priority, time.monotonic(), text, meta))
+            self._cond.notify()
+            if self.preempt and self._current is not None and priority >= self._current[0]:
+                self._stop_locked()
+
+    def cancel_current(self):
+        """Interrupt the utterance in progress, if any."""
+        with self._cond:
+            self._stop_locked()
+
+    def _stop_locked(self):
+        # Called with the lock held so the stop cannot hit the next utterance. A line
+        # picked but not yet playing is covered by its generation token (see _next_item).
+        if self._current is None:
+            return
+        try:
+            self.stop_fn()
+        except Exception as e:
+            print(f"Speech stop error: {e}")
+
+    def clear(self):
+        """Drop all pending lines without touching the current one."""
+        with self._cond:
+            self._heap.clear()
+
+    @property
+    def speaking(self):
+        return self._current is not None
+
+    def pending(self):
+        """Number of lines waiting to be spoken."""
+        with self._cond:
+            return len(self._heap)
+
+    def _backlog_chars(self):
+        return sum(len(item[4]) for item in self._heap)
+
+    def _next_item(self, dropped, run_id):
+        """Block until items are available; return (items, kwargs) or None when shut down.
+
+        kwargs are the extra speak_fn arguments (rate, generation).
+
+        More than one item is returned only when batching in in-order mode.
+
+        Items discarded as stale are appended to ``dropped``. Returns None as
+        well once run_id is no longer the current run.
+        """
+        with self._cond:
+            while self._running and run_id == self._run_id:
+                while self._heap:
+                    if (self.rate_control is not None and len(self._heap) > 1
+                            and self.rate_control.over_budget(self._backlog_chars())):
+                        # Too far behind to catch up: skip the oldest lowest-priority
+                        # line (in preempt mode the heap top is the newest one)
+                        oldest = min(self._heap, key=lambda other: (other[2], other[1]))
+                        self._heap.remove(oldest)
+                        heapq.heapify(self._heap)
+                        dropped.append(oldest)
+                        continue
+                    item = heapq.heappop(self._heap)
+                    _, seq, priority, submitted, text, meta = item
+                    if self.max_age is not None and time.monotonic() - submitted > self.max_age:
+                        dropped.append(item)
+                        continue
+                    if self.preempt:
+                        # Everything older at the same or lower priority is stale
+                        fresh = []
+                        for other in self._heap:
+                            if other[2] <= priority and other[1] < seq:
+                                dropped.append(other)
+                            else:
+                                fresh.append(other)
+                        self._heap = fresh
+                        heapq.heapify(self._heap)
+                    items = [item]
+                    if not self.preempt and self.batch_fn is not None:
+                        # Pending lines queued behind this one are read in the same batch
+                        while (self._heap and len(items) < self.max_batch
+                               and self._heap[0][2] == priority):
+                            items.append(heapq.heappop(self._heap))
+                    self._current = (priority, seq)
+                    kwargs = {}
+                    if self.rate_control is not None:
+                        kwargs["rate"] = self.rate_control.next_rate(self._backlog_chars())
+                    if self.generation_fn is not None:
+                        # Taken under the lock, so any later preemption invalidates it
+                        kwargs["generation"] = self.generation_fn()
+                    return items, kwargs
+                self._cond.wait()
+            return None
+
+    def _notify(self, speaking):
+        if self.on_state is not None:
+            try:
+                self.on_state(speaking)
+            except Exception as e:
+                print(f"Playback state callback error: {e}")
+
+    def _report(self, text, meta, tts_latency):
+        if self.on_line is not None:
+            try:
+                self.on_line(text, meta, tts_latency)
+            except Exception as e:
+                print(f"Playback line callback error: {e}")
+
+    def _run(self, run_id):
+        while True:
+            dropped = []
+            nxt = self._next_item(dropped, run_id)
+            self.dropped += len(dropped)
+            for _, _, _, _, stale_text, stale_meta in dropped:
+                self._report(stale_text, stale_meta, None)
+            if nxt is None:
+                return
+            items, kwargs = nxt
+            reported = threading.Lock()
+            pending = [items]
+
+            def report(started=True):
+                # Once per batch: when audio starts, or as unplayed after speak_fn returns
+                with reported:
+                    batch = pending.pop() if pending else ()
+                now = time.monotonic()
+                for _, _, _, submitted, text, meta in batch:
+                    self._report(text, meta, now - submitted if started else None)
+
+            if self.report_start:
+                kwargs["on_start"] = report
+            else:
+                report()
+            self._notify(True)
+            try:
+                if len(items) == 1:
+                    self.speak_fn(items[0][4], **kwargs)
+                else:
+                    self.batch_fn([item[4] for item in items], **kwargs)
+            except Exception as e:
+                print(f"Speech error: {e}")
+            finally:
+                report(started=False)
+                with self._cond:
+                    # A newer run owns _current and the speaking state
+                    current = run_id == self._run_id
+                    if current:
+                        self._current = None
+                if current:
+                    self._notify(False)
@@ -0,0 +1,168 @@
+"""Per-game profiles saved to disk (lazy imports).
+
+A profile is a directory holding:
+- ``profile.json``: region, hotkeys, OCR/TTS settings and template metadata
+- ``data-<n>/descriptors.npy``: stacked template block descriptors
+- ``data-<n>/templates/<i>.npy``: one RGB array per UI template
+
+Every save writes its arrays into a new ``data-<n>`` folder and then
+replaces ``profile.json``, which names the folder, atomically. A reader sees
+either the old profile or the new one, never a mix of the two.
+
+Arrays are opened with ``numpy.load(mmap_mode='r')`` and template images are
+only decoded when a template is first verified, so switching games does not
+re-read or re-fingerprint every reference image.
+
+Profiles live in ``~/.dialog_whisperer/profiles`` unless
+``DIALOG_WHISPER_PROFILE_DIR`` points elsewhere.
+"""
+
+import json
+import os
+import re
+
+PROFILE_VERSION = 1
+
+
+class Profile:
+    """Settings loaded from (or to be saved to) a profile directory."""
+
+    def __init__(self, name, region=None, templates=None, hotkeys=None, ocr=None, tts=None):
+        """Create a profile.
+
+        Args:
+            name: profile name, usually the game
+            region: (x1, y1, x2, y2) capture region or None
+            templates: templates.TemplateLibrary or None
+            hotkeys: dict of hotkey name -> key combination
+            ocr: dict of OCR settings (e.g. {"backend": "tesserocr"})
+            tts: dict of TTS settings (e.g. {"backend": "coqui", "rate": 200})
+        """
+        self.name = name
+        self.region = tuple(region) if region else None
+        self.templates = templates
+        self.hotkeys = dict(hotkeys or {})
+        self.ocr = dict(ocr or {})
+        self.tts = dict(tts or {})
+
+
+def profile_root():
+    """Directory that holds all profiles."""
+    default = os.path.join(os.path.expanduser("~"), ".dialog_whisperer", "profiles")
+    return os.environ.get("DIALOG_WHISPER_PROFILE_DIR", default)
+
+
+def _profile_path(name, root=None):
+    safe = re.sub(r"[^\w.-]", "_", name).strip(".") or "default"
+    return os.path.join(root or profile_root(), safe)
+
+
+def list_profiles(root=None):
+    """Names of saved profiles, sorted."""
+    root = root or profile_root()
+    if not os.path.isdir(root):
+        return []
+    return sorted(d for d in os.listdir(root)
+                  if os.path.exists(os.path.join(root, d, "profile.json")))
+
+
+def _data_dirs(path):
+    """Numbers of the data-<n> folders in a profile directory."""
+    numbers = []
+    for entry in os.listdir(path):
+        match = re.fullmatch(r"data-(\d+)", entry)
+        if match:
+            numbers.append(int(match.group(1)))
+    return numbers
+
+
+def save_profile(profile, root=None):
+    """Write a profile to disk and return its directory.
+
+    The arrays go into a fresh data folder and profile.json is replaced
+    last, atomically, so a crash mid-save leaves the previous profile intact.
+    Data folders from earlier saves are then removed.
+    """
+    import shutil
+    import numpy as np
+
+    path = _profile_path(profile.name, root)
+    os.makedirs(path, exist_ok=True)
+    data_dir = "data-%d" % (max(_data_dirs(path), default=0) + 1)
+    template_dir = os.path.join(path, data_dir, "templates")
+    os.makedirs(template_dir)
+
+    entries = []
+    descriptors = []
+    if profile.templates is not None:
+        for name in profile.templates.names():
+            template = profile.templates.get(name)
+            # Copy fingerprints out of any memory map, so the old data folder
+            # can be deleted (Windows refuses to remove mapped files)
+            template.descriptor = np.array(template.descriptor)
+            descriptors.append(template.descriptor)
+            image = np.asarray(template.image.convert("RGB"))
+            filename = f"{len(entries)}.npy"
+            np.save(os.path.join(template_dir, filename), image)
+            entries.append({"name": name, "hash": "%016x" % template.hash, "file": filename})
+    if descriptors:
+        np.save(os.path.join(path, data_dir, "descriptors.npy"), np.stack(descriptors))
+
+    data = {
+        "version": PROFILE_VERSION,
+        "name": profile.name,
+        "region": list(profile.region) if profile.region else None,
+        "hotkeys": profile.hotkeys,
+        "ocr": profile.ocr,
+        "tts": profile.tts,
+        "data": data_dir,
+        "templates": entries,
+    }
+    tmp_path = os.path.join(path, "profile.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, "profile.json"))
+
+    # Remove arrays of earlier saves. A folder still mapped by a loaded
+    # profile is retried on the next save.
+    for n in _data_dirs(path):
+        if "data-%d" % n != data_dir:
+            shutil.rmtree(os.path.join(path, "data-%d" % n), ignore_errors=True)
+    return path
+
+
+def load_profile(name, root=None):
+    """Load a saved profile.
+
+    Raises:
+        FileNotFoundError: If no profile with this name exists
+        ValueError: If the profile was written by a newer version
+    """
+    import numpy as np
+    from .templates import Template, TemplateLibrary
+
+    path = _profile_path(name, root)
+    with open(os.path.join(path, "profile.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version", 0) > PROFILE_VERSION:
+        raise ValueError("profile %r has unsupported version %s" % (name, data.get("version")))
+
+    library = TemplateLibrary()
+    entries = data.get("templates") or []
+    if entries:
+        data_path = os.path.join(path, data["data"])
+        descriptors = np.load(os.path.join(data_path, "descriptors.npy"), mmap_mode="r")
+        for i, entry in enumerate(entries):
+            image = np.load(os.path.join(data_path, "templates", entry["file"]), mmap_mode="r")
+            library.add_template(Template(entry["name"], image,
+                                          hash_value=int(entry["hash"], 16),
+                                          descriptor=descriptors[i]))
+
+    return Profile(
+        data.get("name", name),
+        region=data.get("region"),
+        templates=library,
+        hotkeys=data.get("hotkeys"),
+        ocr=data.get("ocr"),
+        tts=data.get("tts"),
+    )
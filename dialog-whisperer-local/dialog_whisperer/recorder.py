@@ -0,0 +1,244 @@
+"""Record the frames the monitor captures, and replay them later.
+
+``FrameRecorder`` takes each captured region frame with its timestamp and
+hands it to a background thread, so the monitor loop never waits on
+compression or disk. The thread groups frames into chunks and writes each
+chunk as a compressed ``.npz``. A chunk stores its first frame as is and every
+later frame as the (wrapping uint8) difference from the previous one. Dialog
+boxes change rarely, so most differences are zeros and compress to almost
+nothing. Each chunk adds one line to ``index.jsonl``. A session that is cut
+off still has every chunk written before the crash.
+
+``RecordedSession`` reads a session back and ``ReplaySource`` plays it to
+``monitor.Monitor`` as a frame source on a (simulated) clock. Sessions can
+then drive replay benchmarks and go into bug reports.
+
+Set ``DIALOG_WHISPER_RECORD`` to a directory to record every monitoring run
+into a new session folder there.
+"""
+
+import bisect
+import json
+import os
+import queue
+import threading
+import time
+
+INDEX_NAME = "index.jsonl"
+
+
+def default_directory():
+    """Directory to record sessions into, or None when recording is off."""
+    return os.environ.get("DIALOG_WHISPER_RECORD") or None
+
+
+def new_session_path(directory):
+    """A fresh session folder name under directory."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, "session-" + stamp)
+    n = 1
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(directory, "session-%s-%d" % (stamp, n))
+    return path
+
+
+def encode_chunk(frames):
+    """Delta-encode a stack of equally sized uint8 frames (first frame kept as is)."""
+    import numpy as np
+    deltas = np.empty_like(frames)
+    deltas[0] = frames[0]
+    np.subtract(frames[1:], frames[:-1], out=deltas[1:])
+    return deltas
+
+
+def decode_chunk(deltas):
+    """Inverse of encode_chunk: uint8 addition wraps, so a running sum restores the frames."""
+    import numpy as np
+    return np.cumsum(deltas, axis=0, dtype=np.uint8)
+
+
+class FrameRecorder:
+    """Stream timestamped frames to a session folder from a background thread."""
+
+    def __init__(self, path, chunk_frames=64, max_queue=256):
+        """Create a recorder (call start() before add()).
+
+        Args:
+            path: session folder; created if missing
+            chunk_frames: frames per chunk file
+            max_queue: frames waiting for the writer; later frames are dropped
+                (and counted in ``dropped``) rather than stalling the monitor
+        """
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._closed = False
+        self.recorded = 0
+        self.dropped = 0
+        self._chunks = 0
+
+    def start(self):
+        """Start the writer thread. Calling start twice is a no-op."""
+        if self._thread is not None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="whisper-recorder", daemon=True)
+        self._thread.start()
+
+    def add(self, image, timestamp, bbox=None):
+        """Queue a frame. Never blocks; returns False if the frame was dropped.
+
+        Frames added after close() are ignored.
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait((image, timestamp, tuple(bbox) if bbox else None))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=5.0):
+        """Write the frames still queued and stop the writer thread."""
+        self._closed = True
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        import numpy as np
+
+        frames, times, key = [], [], None
+        while True:
+            item = self._queue.get()
+            if item is not None:
+                image, timestamp, bbox = item
+                array = np.asarray(image.convert("RGB"))
+                # A chunk holds frames of one size and region
+                if frames and (array.shape, bbox) != key:
+                    self._write_chunk(frames, times, key[1])
+                    frames, times = [], []
+                key = (array.shape, bbox)
+                frames.append(array)
+                times.append(timestamp)
+            if frames and (item is None or len(frames) >= self.chunk_frames):
+                self._write_chunk(frames, times, key[1])
+                frames, times = [], []
+            if item is None:
+                return
+
+    def _write_chunk(self, frames, times, bbox):
+        import numpy as np
+
+        name = "chunk-%05d.npz" % self._chunks
+        try:
+            np.savez_compressed(os.path.join(self.path, name),
+                                deltas=encode_chunk(np.stack(frames)),
+                                times=np.asarray(times, dtype="float64"))
+            entry = {"file": name, "first": self.recorded, "count": len(frames),
+                     "start": times[0], "end": times[-1], "shape": list(frames[0].shape),
+                     "bbox": list(bbox) if bbox else None}
+            with open(os.path.join(self.path, INDEX_NAME), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._chunks += 1
+            self.recorded += len(frames)
+        except Exception as e:
+            print(f"Debug: Failed to write recording chunk {name}: {e}")
+
+
+class RecordedSession:
+    """Read access to a recorded session; chunks are decoded on demand."""
+
+    def __init__(self, path):
+        """Open a session folder written by FrameRecorder.
+
+        Raises:
+            FileNotFoundError: If the folder has no index
+        """
+        self.path = path
+        with open(os.path.join(path, INDEX_NAME), encoding="utf-8") as f:
+            self.chunks = [json.loads(line) for line in f if line.strip()]
+        self._starts = [chunk["start"] for chunk in self.chunks]
+        self._cached = (None, None, None)
+
+    def __len__(self):
+        return sum(chunk["count"] for chunk in self.chunks)
+
+    @property
+    def start(self):
+        return self.chunks[0]["start"] if self.chunks else 0.0
+
+    @property
+    def duration(self):
+        return self.chunks[-1]["end"] - self.start if self.chunks else 0.0
+
+    def _load(self, i):
+        import numpy as np
+
+        if self._cached[0] != i:
+            with np.load(os.path.join(self.path, self.chunks[i]["file"])) as data:
+                self._cached = (i, decode_chunk(data["deltas"]), data["times"])
+        return self._cached[1], self._cached[2]
+
+    def frame_at(self, timestamp):
+        """The last frame captured at or before timestamp (the first frame before the start).
+
+        Returns:
+            tuple: (PIL.Image, timestamp, bbox), or None for an empty session
+        """
+        from PIL import Image
+
+        if not self.chunks:
+            return None
+        i = max(0, bisect.bisect_right(self._starts, timestamp) - 1)
+        frames, times = self._load(i)
+        j = max(0, bisect.bisect_right(times, timestamp) - 1)
+        bbox = self.chunks[i]["bbox"]
+        return Image.fromarray(frames[j]), float(times[j]), tuple(bbox) if bbox else None
+
+    def frames(self):
+        """Yield (PIL.Image, timestamp, bbox) for every frame in order."""
+        from PIL import Image
+
+        for i, chunk in enumerate(self.chunks):
+            frames, times = self._load(i)
+            bbox = tuple(chunk["bbox"]) if chunk["bbox"] else None
+            for frame, timestamp in zip(frames, times):
+                yield Image.fromarray(frame), float(timestamp), bbox
+
+
+class ReplaySource:
+    """Frame source for ``monitor.Monitor`` that plays back a recorded session.
+
+    Clock time 0 (or the clock's time when the source is created, with
+    offset=None) maps to the first recorded frame. Every capture returns the
+    frame that was on screen at that point of the recording, whatever bbox is
+    asked for.
+    """
+
+    def __init__(self, session, clock, offset=0.0):
+        self.session = session
+        self.clock = clock
+        self.offset = clock.now() if offset is None else offset
+        self.captures = 0
+
+    @property
+    def finished(self):
+        """True once the clock has passed the last recorded frame."""
+        return self.clock.now() - self.offset > self.session.duration
+
+    def capture(self, bbox):
+        self.captures += 1
+        frame = self.session.frame_at(self.session.start + self.clock.now() - self.offset)
+        if frame is None:
+            raise ValueError("recorded session is empty")
+        return frame[0]
+
+    def grab_monitor(self, bbox):
+        image = self.capture(bbox)
+        return image, tuple(bbox[:2])
@@ -5,15 +5,24 @@ import tkinter as tk
 class RegionSelector:
     """Transparent overlay window for selecting screen regions by dragging."""
     
-    def __init__(self, callback):
+    def __init__(self, callback, bounds=None):
         """Create a full-screen transparent window for region selection.
         
         Args:
             callback: Function to call with (x1, y1, x2, y2) coordinates when selection completes
+            bounds: optional (left, top, width, height) of the virtual desktop; when given
+                the overlay spans every monitor instead of only the primary one
         """
         self.root = tk.Tk()
         self.root.attributes('-alpha', 0.3)  # semi-transparent
-        self.root.attributes('-fullscreen', True)
+        self.offset = (0, 0)
+        if bounds is None:
+            self.root.attributes('-fullscreen', True)
+        else:
+            left, top, width, height = bounds
+            self.offset = (left, top)
+            self.root.overrideredirect(True)
+            self.root.geometry("%dx%d%+d%+d" % (width, height, left, top))
         self.root.attributes('-topmost', True)
         
         # Make it look like a selection overlay
@@ -63,6 +72,8 @@ class RegionSelector:
             # Convert to screen coordinates
             x1, x2 = int(min(x1, x2)), int(max(x1, x2))
             y1, y2 = int(min(y1, y2)), int(max(y1, y2))
+            x1, x2 = x1 + self.offset[0], x2 + self.offset[0]
+            y1, y2 = y1 + self.offset[1], y2 + self.offset[1]
             self.root.destroy()
             if self.callback:
                 self.callback(x1, y1, x2, y2)
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""Library of UI reference templates with indexed lookup (lazy imports).
+
+Games have many UI states (menu, inventory, map) that should all suppress
+reading. Each template is fingerprinted with a 64-bit difference hash and a
+small block-mean descriptor. Lookup finds hash neighbours through a BK-tree
+(Hamming distance), ranks them by descriptor distance in one vectorized
+step, and confirms the best candidates with ``capture.ReferenceMatcher``.
+"""
+
+
+def dhash(img, hash_size=8):
+    """Difference hash of an image as an int with hash_size * hash_size bits."""
+    from PIL import Image
+
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def block_descriptor(img, grid=(16, 4)):
+    """Mean brightness of each cell of a grid (columns, rows), as float32 in [0, 1]."""
+    import numpy as np
+    from PIL import Image
+
+    small = img.convert('L').resize(grid, Image.BOX)
+    return np.asarray(small, dtype='float32').ravel() / 255
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes with Hamming distance."""
+
+    def __init__(self):
+        self._root = None  # [key, values, {distance: child}]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, key, value):
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            d = hamming(key, node[0])
+            if d == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, [value], {}]
+                return
+            node = child
+
+    def search(self, key, max_distance):
+        """Return [(distance, value)] for all entries within max_distance of key."""
+        found = []
+        if self._root is None:
+            return found
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = hamming(key, node[0])
+            if d <= max_distance:
+                found.extend((d, v) for v in node[1])
+            # Triangle inequality: only children at distance d +/- max_distance can match
+            for child_d, child in node[2].items():
+                if d - max_distance <= child_d <= d + max_distance:
+                    stack.append(child)
+        return found
+
+
+class Template:
+    """A stored UI reference and its precomputed fingerprints.
+
+    ``image`` may be a PIL image or an RGB uint8 array (e.g. memory-mapped
+    from a profile). When the fingerprints are passed in, the image is only
+    decoded when the template is first verified.
+    """
+
+    def __init__(self, name, image, hash_value=None, descriptor=None):
+        self.name = name
+        self._image = image
+        self._matcher = None
+        self.hash = dhash(self.image) if hash_value is None else hash_value
+        self.descriptor = block_descriptor(self.image) if descriptor is None else descriptor
+
+    @property
+    def image(self):
+        if not hasattr(self._image, "convert"):
+            import numpy as np
+            from PIL import Image
+            self._image = Image.fromarray(np.asarray(self._image))
+        return self._image
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            from .capture import ReferenceMatcher
+            self._matcher = ReferenceMatcher(self.image)
+        return self._matcher
+
+
+class TemplateLibrary:
+    """Match frames against many UI templates without a linear scan.
+
+    The GUI edits the library on the Tk thread while the monitor thread calls
+    match(), so every method takes a lock. match() holds it only while it
+    looks up candidates; hashing and verification run outside it.
+    """
+
+    def __init__(self, max_hash_distance=12, max_descriptor_distance=0.08, verify=True):
+        """Create an empty library.
+
+        Args:
+            max_hash_distance: Hamming radius (of 64 bits) for index candidates
+            max_descriptor_distance: mean absolute block difference allowed for a match
+            verify: confirm candidates with the full block comparison
+        """
+        import threading
+
+        self.max_hash_distance = max_hash_distance
+        self.max_descriptor_distance = max_descriptor_distance
+        self.verify = verify
+        self._templates = {}
+        self._index = BKTree()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._templates)
+
+    def names(self):
+        with self._lock:
+            return list(self._templates)
+
+    def get(self, name):
+        with self._lock:
+            return self._templates.get(name)
+
+    def add(self, name, image):
+        """Add (or replace) a template and return it."""
+        template = Template(name, image)
+        self.add_template(template)
+        return template
+
+    def add_template(self, template):
+        with self._lock:
+            if template.name in self._templates:
+                self.remove(template.name)
+            self._templates[template.name] = template
+            self._index.add(template.hash, template.name)
+
+    def remove(self, name):
+        """Remove a template; the index is rebuilt since BK-trees do not support deletion."""
+        with self._lock:
+            if self._templates.pop(name, None) is None:
+                return
+            self._index = BKTree()
+            for template in self._templates.values():
+                self._index.add(template.hash, template.name)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._index = BKTree()
+
+    def match(self, img):
+        """Return the name of the template shown in img, or None."""
+        import numpy as np
+
+        with self._lock:
+            if not self._templates:
+                return None
+        frame_hash = dhash(img)
+        with self._lock:
+            candidates = [self._templates[name]
+                          for _, name in self._index.search(frame_hash, self.max_hash_distance)]
+        if not candidates:
+            return None
+        descriptors = np.stack([template.descriptor for template in candidates])
+        distances = np.abs(descriptors - block_descriptor(img)).mean(axis=1)
+        for i in np.argsort(distances):
+            if distances[i] > self.max_descriptor_distance:
+                break
+            template = candidates[i]
+            if not self.verify or template.matcher.matches(img):
+                return template.name
+        return None
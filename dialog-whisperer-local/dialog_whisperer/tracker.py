@@ -0,0 +1,209 @@
+"""Follow a dialog box that moves on screen (lazy imports).
+
+The tracker keeps a template of the dialog box taken when monitoring starts.
+Each tick it checks, at a downsampled scale, whether the border of the
+captured region (the box chrome, not the text inside) still looks like the
+template's, so a new line of dialog does not count as a move. Only when it
+does not is the full screen grabbed, downsampled, and searched with FFT-based
+normalized cross-correlation; the best hit is then refined at full resolution
+around the coarse position, and the template is refreshed from it.
+"""
+
+
+def _gray_array(img, scale=1):
+    import numpy as np
+
+    gray = img.convert('L')
+    if scale > 1:
+        gray = gray.reduce(scale)
+    return np.asarray(gray, dtype='float64') / 255
+
+
+def _window_sums(arr, th, tw):
+    """Sum of every th x tw window of arr (valid positions), via an integral image."""
+    import numpy as np
+
+    ii = np.zeros((arr.shape[0] + 1, arr.shape[1] + 1))
+    ii[1:, 1:] = arr.cumsum(0).cumsum(1)
+    return ii[th:, tw:] - ii[:-th, tw:] - ii[th:, :-tw] + ii[:-th, :-tw]
+
+
+def match_template(image, template):
+    """Normalized cross-correlation of template at every valid position of image.
+
+    Args:
+        image: 2-D float array
+        template: 2-D float array no larger than image
+
+    Returns:
+        2-D array of scores in [-1, 1], shape (ih - th + 1, iw - tw + 1)
+    """
+    import numpy as np
+
+    ih, iw = image.shape
+    th, tw = template.shape
+    t = template - template.mean()
+    t_norm = np.sqrt((t ** 2).sum())
+    if t_norm == 0:
+        return np.zeros((ih - th + 1, iw - tw + 1))
+
+    # Correlation as a convolution with the flipped template. Because t sums to
+    # zero, correlating with the raw image equals correlating with the
+    # window-mean-subtracted image.
+    shape = (ih + th - 1, iw + tw - 1)
+    spectrum = np.fft.rfft2(image, shape) * np.fft.rfft2(t[::-1, ::-1], shape)
+    corr = np.fft.irfft2(spectrum, shape)[th - 1:ih, tw - 1:iw]
+
+    n = th * tw
+    sums = _window_sums(image, th, tw)
+    sq_sums = _window_sums(image ** 2, th, tw)
+    variance = np.maximum(sq_sums - sums ** 2 / n, 0)
+    denom = np.sqrt(variance) * t_norm
+    scores = np.zeros_like(corr)
+    valid = denom > 1e-9
+    scores[valid] = corr[valid] / denom[valid]
+    return scores
+
+
+class RegionTracker:
+    """Keep a capture bbox locked onto a dialog box that moves."""
+
+    def __init__(self, template, bbox, scale=4, min_score=0.6, retry_interval=1.0, pixel_scale=1.0,
+                 border=8):
+        """Create a tracker.
+
+        Bboxes are logical coordinates, as passed to capture.capture_region;
+        templates and screen grabs are physical pixels.
+
+        Args:
+            template: PIL.Image of the dialog box at bbox
+            bbox: logical (left, top, right, bottom) where the template was captured
+            scale: downsampling factor for the per-tick check and the screen search
+            min_score: correlation needed to accept a location
+            retry_interval: seconds to wait after a failed screen search before
+                searching again (e.g. while a menu covers the box)
+            pixel_scale: physical pixels per logical pixel (capture.dpi_scale())
+            border: width in physical pixels of the edge band still_there compares;
+                dialog text is expected to sit further inside the region
+        """
+        self.bbox = tuple(bbox)
+        self.scale = max(1, int(scale))
+        self.min_score = min_score
+        self.border = border
+        self._set_template(template)
+        self.retry_interval = retry_interval
+        self.pixel_scale = pixel_scale
+        self.searches = 0
+        self._next_search = 0.0
+
+    def _set_template(self, template):
+        import numpy as np
+
+        self.template = template
+        self._coarse = _gray_array(template, self.scale)
+        self._full = _gray_array(template)
+        # Edge band of the coarse template; the middle holds the text
+        ring = np.ones(self._coarse.shape, dtype=bool)
+        width = max(1, self.border // self.scale)
+        if ring.shape[0] > 2 * width and ring.shape[1] > 2 * width:
+            ring[width:-width, width:-width] = False
+        self._ring = ring
+
+    def still_there(self, frame):
+        """True if the border of a capture at the current bbox still matches the template's.
+
+        Only the edge band is compared, so new text inside the box does not
+        look like a move.
+        """
+        import numpy as np
+
+        if frame.size != self.template.size:
+            return False
+        coarse = _gray_array(frame, self.scale)[self._ring]
+        expected = self._coarse[self._ring]
+        a = coarse - coarse.mean()
+        b = expected - expected.mean()
+        denom = np.sqrt((a ** 2).sum() * (b ** 2).sum())
+        if denom < 1e-9:
+            # Flat border (e.g. a plain box background): same only if equally bright
+            return abs(coarse.mean() - expected.mean()) < 0.05
+        return (a * b).sum() / denom >= self.min_score
+
+    def locate(self, screen, origin=(0, 0)):
+        """Find the template in a screen grab.
+
+        Args:
+            screen: PIL.Image of the screen (or a large area), physical pixels
+            origin: physical screen coordinates of screen's top-left pixel
+
+        Returns:
+            tuple: (bbox, score); bbox is logical, the same size as self.bbox, and
+            None if no location reaches min_score
+        """
+        import numpy as np
+
+        self.searches += 1
+        coarse_screen = _gray_array(screen, self.scale)
+        th, tw = self._coarse.shape
+        if coarse_screen.shape[0] < th or coarse_screen.shape[1] < tw or th == 0 or tw == 0:
+            return None, 0.0
+        scores = match_template(coarse_screen, self._coarse)
+        y, x = np.unravel_index(np.argmax(scores), scores.shape)
+
+        # Refine at full resolution within one coarse pixel of the hit
+        width, height = self.template.size
+        pad = self.scale
+        left = max(0, x * self.scale - pad)
+        top = max(0, y * self.scale - pad)
+        right = min(screen.width, x * self.scale + width + pad)
+        bottom = min(screen.height, y * self.scale + height + pad)
+        window = _gray_array(screen.crop((left, top, right, bottom)))
+        if window.shape[0] < height or window.shape[1] < width:
+            return None, float(scores[y, x])
+        fine = match_template(window, self._full)
+        fy, fx = np.unravel_index(np.argmax(fine), fine.shape)
+        score = float(fine[fy, fx])
+        if score < self.min_score:
+            return None, score
+        x1 = int(origin[0] + left + fx)
+        y1 = int(origin[1] + top + fy)
+        size = (self.bbox[2] - self.bbox[0], self.bbox[3] - self.bbox[1])
+        if self.pixel_scale == 1:
+            return (x1, y1, x1 + size[0], y1 + size[1]), score
+        from .capture import to_logical
+        return to_logical((x1, y1, x1 + width, y1 + height), self.pixel_scale, size), score
+
+    def follow(self, frame, grab_screen, now=None):
+        """Check the current frame and re-locate the box if it moved.
+
+        Args:
+            frame: PIL.Image captured at self.bbox
+            grab_screen: callable returning (screen PIL.Image, origin)
+            now: current time in seconds for retry_interval (default time.monotonic())
+
+        Returns:
+            The new bbox if the box moved and was found, otherwise None
+        """
+        if now is None:
+            import time
+            now = time.monotonic()
+
+        if self.still_there(frame) or now < self._next_search:
+            return None
+        screen, origin = grab_screen()
+        bbox, score = self.locate(screen, origin)
+        if bbox is None:
+            self._next_search = now + self.retry_interval
+            return None
+        # Compare against how the box looks now from here on
+        physical = bbox
+        if self.pixel_scale != 1:
+            from .capture import to_physical
+            physical = to_physical(bbox, self.pixel_scale)
+        left, top = physical[0] - origin[0], physical[1] - origin[1]
+        width, height = self.template.size
+        self._set_template(screen.crop((left, top, left + width, top + height)))
+        if bbox == self.bbox:
+            return None
+        self.bbox = bbox
+        return bbox
@@ -0,0 +1,208 @@
+"""Append-only dialog transcript with full-text search.
+
+Entries are stored in SQLite in WAL mode so the GUI can search while the
+writer appends. ``log()`` only puts the entry on a queue; a background thread
+inserts whatever has queued up in one transaction, so the monitor loop never
+waits on disk. When the SQLite build has FTS5, searches use a full-text index;
+otherwise they fall back to LIKE.
+
+The transcript lives at ``~/.dialog_whisperer/transcript.db`` unless
+``DIALOG_WHISPER_TRANSCRIPT`` points elsewhere.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    text TEXT NOT NULL,
+    region TEXT,
+    confidence REAL,
+    tts_latency REAL,
+    audio_path TEXT,
+    profile TEXT
+)
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(text, content='entries', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+_COLUMNS = ("id", "timestamp", "text", "region", "confidence", "tts_latency", "audio_path", "profile")
+
+
+def default_path():
+    default = os.path.join(os.path.expanduser("~"), ".dialog_whisperer", "transcript.db")
+    return os.environ.get("DIALOG_WHISPER_TRANSCRIPT", default)
+
+
+def _row_to_entry(row):
+    entry = dict(zip(_COLUMNS, row))
+    if entry["region"]:
+        entry["region"] = tuple(json.loads(entry["region"]))
+    return entry
+
+
+class TranscriptStore:
+    """SQLite-backed transcript with a batching background writer."""
+
+    def __init__(self, path=None, batch_size=100):
+        """Open (or create) a transcript.
+
+        Args:
+            path: database file; defaults to $DIALOG_WHISPER_TRANSCRIPT or ~/.dialog_whisperer/transcript.db
+            batch_size: maximum entries written per transaction
+        """
+        self.path = path or default_path()
+        self.batch_size = batch_size
+        self.has_fts = False
+        self._queue = queue.Queue()
+        self._thread = None
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5
+                pass
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def start(self):
+        """Start the writer thread. Calling start twice is a no-op."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="whisper-transcript", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=2.0):
+        """Write pending entries and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def log(self, text, region=None, confidence=None, tts_latency=None, audio_path=None,
+            profile=None, timestamp=None):
+        """Queue an entry for writing. Never blocks."""
+        region_json = json.dumps(list(region)) if region else None
+        self._queue.put((timestamp or time.time(), text, region_json, confidence,
+                         tts_latency, audio_path, profile))
+
+    def flush(self, timeout=None):
+        """Wait until every queued entry has been written.
+
+        Args:
+            timeout: seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            bool: False if entries were still queued when the timeout ran out
+        """
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            running = True
+            while running:
+                batch = [self._queue.get()]
+                # Take whatever else is already waiting, without delaying the first entry
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                rows = [row for row in batch if row is not None]
+                running = len(rows) == len(batch)
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO entries (timestamp, text, region, confidence, tts_latency, audio_path, profile)"
+                            " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                except sqlite3.Error as e:
+                    print(f"Transcript write error: {e}")
+                for _ in batch:
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return [_row_to_entry(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def recent(self, limit=50):
+        """Most recent entries, newest first."""
+        return self._query("SELECT %s FROM entries ORDER BY id DESC LIMIT ?" % ", ".join(_COLUMNS), (limit,))
+
+    def get(self, entry_id):
+        rows = self._query("SELECT %s FROM entries WHERE id = ?" % ", ".join(_COLUMNS), (entry_id,))
+        return rows[0] if rows else None
+
+    def search(self, query, limit=50):
+        """Entries whose text contains every word of query, newest first."""
+        words = query.split()
+        if not words:
+            return self.recent(limit)
+        columns = ", ".join("e." + c for c in _COLUMNS)
+        if self.has_fts:
+            # Quote each word so punctuation in dialog is not read as FTS syntax
+            match = " ".join('"%s"' % w.replace('"', '""') for w in words)
+            return self._query(
+                "SELECT %s FROM entries_fts f JOIN entries e ON e.id = f.rowid"
+                " WHERE entries_fts MATCH ? ORDER BY e.id DESC LIMIT ?" % columns, (match, limit))
+        where = " AND ".join("e.text LIKE ?" for _ in words)
+        params = ["%" + w + "%" for w in words] + [limit]
+        return self._query("SELECT %s FROM entries e WHERE %s ORDER BY e.id DESC LIMIT ?" % (columns, where), params)
+
+    def export(self, path):
+        """Export all entries to JSONL, or CSV if path ends with .csv. Returns the entry count."""
+        import csv
+
+        entries = self._query("SELECT %s FROM entries ORDER BY id" % ", ".join(_COLUMNS))
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if path.lower().endswith(".csv"):
+                writer = csv.DictWriter(f, fieldnames=_COLUMNS)
+                writer.writeheader()
+                for entry in entries:
+                    row = dict(entry)
+                    if row["region"]:
+                        row["region"] = json.dumps(list(row["region"]))
+                    writer.writerow(row)
+            else:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+        return len(entries)
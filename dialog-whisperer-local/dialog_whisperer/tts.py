@@ -1,12 +1,221 @@
 """Small TTS helper using pyttsx3 with lazy import."""
 
+import itertools
+import queue
+import threading
 
-_engine = None
+# pyttsx3's default rate in words per minute; Coqui speeds are relative to it
+DEFAULT_RATE = 200
+
+
+class TTSService:
+    """Owns a pyttsx3 engine on one dedicated thread.
+
+    pyttsx3 engines are not thread-safe, so every engine call happens on the
+    service thread, which runs the engine with ``startLoop(False)`` and pumps
+    it with ``iterate()`` while an utterance is playing. Other threads talk to
+    it through a command queue. Properties are only set when they change.
+    """
+
+    # Seconds between iterate() calls while speaking; bounds stop() latency
+    POLL_INTERVAL = 0.01
+    # Seconds between checks that the engine thread is still alive while waiting
+    WAIT_INTERVAL = 0.5
+
+    def __init__(self):
+        self._commands = queue.Queue()
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._ids = itertools.count()
+        self._pending = {}  # utterance name -> threading.Event
+        self._on_start = {}  # utterance name -> callable() run when it starts
+        self._props = {}
+        self._generation = 0  # bumped by stop(); utterances carry the value they started with
+        self._closed = False
+
+    def start(self):
+        """Start the engine thread and wait until the engine is initialized.
+
+        Raises:
+            ImportError: If pyttsx3 is missing or the engine fails to initialize
+        """
+        if self._thread is not None:
+            return
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="whisper-tts", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            self._thread = None
+            raise ImportError("pyttsx3 is required for TTS: %s" % self._error)
+
+    @property
+    def running(self):
+        thread = self._thread
+        return not self._closed and thread is not None and thread.is_alive()
+
+    def _wait(self, events):
+        """Wait for utterances to finish; give up if the engine thread goes away."""
+        for done in events:
+            while not done.wait(self.WAIT_INTERVAL):
+                if not self.running:
+                    return
+
+    def current_generation(self):
+        """Token for utterances starting now; stop() invalidates it."""
+        return self._generation
+
+    def speak(self, text, rate=None, volume=None, generation=None, on_start=None):
+        """Speak text and block until it finishes or is stopped.
+
+        With generation (from current_generation()), nothing is spoken if
+        stop() was called since that token was taken. on_start() is called on
+        the engine thread when the utterance starts playing. Returns at once
+        if the service was shut down or its engine thread died.
+        """
+        if not self.running:
+            return
+        if generation is None:
+            generation = self._generation
+        if rate is not None:
+            self._commands.put(("set", "rate", rate))
+        if volume is not None:
+            self._commands.put(("set", "volume", float(volume)))
+        done = threading.Event()
+        self._commands.put(("say", text, done, generation, on_start))
+        self._wait([done])
+
+    def speak_many(self, texts, rate=None, volume=None, generation=None, on_start=None):
+        """Queue several utterances at once so the engine reads them back to back.
+
+        on_start() is called when the first one starts playing.
+        """
+        if not self.running:
+            return
+        if generation is None:
+            generation = self._generation
+        if rate is not None:
+            self._commands.put(("set", "rate", rate))
+        if volume is not None:
+            self._commands.put(("set", "volume", float(volume)))
+        events = []
+        for text in texts:
+            done = threading.Event()
+            self._commands.put(("say", text, done, generation, on_start))
+            events.append(done)
+            on_start = None
+        self._wait(events)
+
+    def stop(self):
+        """Interrupt the current utterance. Safe to call from any thread."""
+        self._generation += 1
+        self._commands.put(("stop",))
+
+    def shutdown(self, timeout=1.0):
+        """Stop speaking and end the engine thread."""
+        self._closed = True
+        if self._thread is None:
+            return
+        self._commands.put(("quit",))
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _on_started(self, name):
+        on_start = self._on_start.pop(name, None)
+        if on_start is not None:
+            try:
+                on_start()
+            except Exception as e:
+                print(f"TTS start callback error: {e}")
+
+    def _on_finished(self, name, completed):
+        self._on_start.pop(name, None)
+        done = self._pending.pop(name, None)
+        if done is not None:
+            done.set()
+
+    def _release_pending(self):
+        for done in self._pending.values():
+            done.set()
+        self._pending.clear()
+        self._on_start.clear()
+
+    def _handle(self, engine, cmd):
+        """Run one command on the engine thread. Returns False to quit."""
+        kind = cmd[0]
+        if kind == "say":
+            _, text, done, generation, on_start = cmd
+            if generation != self._generation:
+                # Stopped after this utterance was picked but before it reached the engine
+                done.set()
+                return True
+            name = str(next(self._ids))
+            self._pending[name] = done
+            if on_start is not None:
+                self._on_start[name] = on_start
+            engine.say(text, name)
+        elif kind == "set":
+            _, prop, value = cmd
+            if self._props.get(prop) != value:
+                engine.setProperty(prop, value)
+                self._props[prop] = value
+        elif kind == "stop":
+            engine.stop()
+            self._release_pending()
+        elif kind == "quit":
+            engine.stop()
+            self._release_pending()
+            return False
+        return True
+
+    def _run(self):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.connect("started-utterance", self._on_started)
+            engine.connect("finished-utterance", self._on_finished)
+            engine.startLoop(False)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        running = True
+        while running:
+            # Block while idle; poll only while an utterance needs pumping
+            try:
+                cmd = self._commands.get(timeout=self.POLL_INTERVAL if self._pending else None)
+            except queue.Empty:
+                cmd = None
+            try:
+                if cmd is not None:
+                    running = self._handle(engine, cmd)
+                if self._pending:
+                    engine.iterate()
+            except Exception as e:
+                print(f"TTS engine error: {e}")
+                self._release_pending()
+        try:
+            engine.endLoop()
+        except Exception:
+            pass
+
+
+_service = None
 
 def _get_engine():
-    """Get or initialize the TTS engine."""
-    global _engine
-    if _engine is None:
+    """Get the Coqui backend module or start the pyttsx3 service.
+
+    A service whose engine thread died is replaced by a new one.
+    """
+    global _service
+    if _service is not None and not _service.running:
+        print("Debug: TTS engine thread stopped, starting a new one")
+        _service.shutdown()
+        _service = None
+    if _service is None:
         # Allow optional Coqui backend via environment variable
         import os
         backend = os.environ.get("DIALOG_WHISPER_TTS_BACKEND", "pyttsx3").lower()
@@ -17,41 +226,84 @@ def _get_engine():
             except Exception as e:
                 print("Coqui TTS backend requested but failed to load: %s" % e)
 
+        service = TTSService()
+        service.start()
+        _service = service
+    return _service
+
+def _coqui_selected():
+    import os
+    return os.environ.get("DIALOG_WHISPER_TTS_BACKEND", "pyttsx3").lower() == "coqui"
+
+def current_generation():
+    """Token that stop() invalidates; pass it to speak() to drop a line stopped before it started.
+
+    Never starts an engine: with none running there is nothing to stop yet.
+    """
+    if _coqui_selected():
         try:
-            import pyttsx3
-            _engine = pyttsx3.init()
-        except Exception as e:
-            raise ImportError("pyttsx3 is required for TTS: %s" % e)
-    return _engine
+            from . import tts_coqui
+            return tts_coqui.current_generation()
+        except Exception:
+            pass
+    return _service.current_generation() if _service is not None else 0
 
-def speak(text, rate=None, volume=None):
+def speak(text, rate=None, volume=None, generation=None, on_start=None):
     """Speak text using pyttsx3. Lazy-imports pyttsx3 so file is safe to import without deps.
 
     Args:
         text (str): text to speak
-        rate (int|None): optional speech rate
+        rate (int|None): optional speech rate in words per minute
         volume (float|None): volume 0.0-1.0
+        generation: optional current_generation() token taken when the line was picked
+        on_start: optional callable() run when audio for the line starts playing
     """
     engine = _get_engine()
-    
+
     # Handle Coqui TTS differently
-    if hasattr(engine, 'speak'):  # Coqui TTS module
-        return engine.speak(text)
-        
-    # pyttsx3 engine
-    if rate is not None:
-        engine.setProperty("rate", rate)
-    if volume is not None:
-        engine.setProperty("volume", float(volume))
-    engine.say(text)
-    engine.runAndWait()
+    if not isinstance(engine, TTSService):  # Coqui TTS module
+        return engine.speak(text, speed=rate / DEFAULT_RATE if rate else None, generation=generation,
+                            on_start=on_start)
+
+    engine.speak(text, rate=rate, volume=volume, generation=generation, on_start=on_start)
+
+def speak_many(texts, rate=None, volume=None, generation=None, on_start=None):
+    """Speak several pending lines as one batch, without gaps between them.
+
+    Coqui synthesizes the lines one after another and plays them as one clip;
+    pyttsx3 gets all utterances queued at once.
+    """
+    engine = _get_engine()
+    if not isinstance(engine, TTSService):  # Coqui TTS module
+        return engine.speak_many(list(texts), speed=rate / DEFAULT_RATE if rate else None,
+                                 generation=generation, on_start=on_start)
+    engine.speak_many(texts, rate=rate, volume=volume, generation=generation, on_start=on_start)
+
+def stop():
+    """Interrupt the utterance currently being spoken, if any.
+
+    Safe to call from any thread; does nothing when nothing is playing.
+    """
+    if _coqui_selected():
+        try:
+            from . import tts_coqui
+            tts_coqui.stop()
+        except Exception:
+            pass
+    if _service is not None:
+        _service.stop()
 
 def cleanup():
     """Clean up TTS resources."""
-    global _engine
-    if _engine is not None:
+    global _service
+    if _service is not None:
         try:
-            _engine.stop()
-        except:
+            _service.shutdown()
+        except Exception:
             pass
-        _engine = None
+        _service = None
+    try:
+        from . import tts_coqui
+        tts_coqui.cleanup()
+    except Exception:
+        pass
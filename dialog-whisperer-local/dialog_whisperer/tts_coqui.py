@@ -2,29 +2,204 @@
 
 _TTS = None
 _MODEL_NAME = "tts_models/en/ljspeech/glow-tts"
+# Bumped by stop(); an utterance only plays if the generation it started
+# with is still current, so a stop during synthesis also cancels playback.
+_generation = 0
+# Cleared when the loaded model rejects the speed argument
+_speed_supported = True
+# tts_worker.SynthesisWorker when DIALOG_WHISPER_COQUI_WORKER is set
+_worker = None
+# audio_out.PlaybackDevice, opened on the first utterance and kept open
+_device = None
 
 
-def _ensure_model(model_name=None, use_gpu=False):
-    global _TTS, _MODEL_NAME
-    if model_name:
-        _MODEL_NAME = model_name
-    if _TTS is not None:
-        return _TTS
+def default_threads():
+    """Torch threads for CPU inference: half the cores, so the OCR stage keeps the rest."""
+    import os
+    value = os.environ.get("DIALOG_WHISPER_TORCH_THREADS")
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            pass
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _model_parts(tts):
+    synthesizer = getattr(tts, "synthesizer", None)
+    return [m for m in (getattr(synthesizer, "tts_model", None), getattr(synthesizer, "vocoder_model", None))
+            if m is not None]
+
+
+def tune_cpu(tts, threads=None, quantize=False):
+    """Configure a loaded model for CPU inference.
+
+    Args:
+        tts: TTS.api.TTS instance
+        threads: torch intra-op threads (default: default_threads())
+        quantize: apply dynamic int8 quantization to Linear/LSTM/GRU layers. Conv
+            layers are left in float, so conv-heavy models gain less.
+
+    Returns:
+        tts, modified in place
+    """
+    import torch
+
+    torch.set_num_threads(threads or default_threads())
+    try:
+        # Only allowed before the first parallel region runs
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    if quantize:
+        synthesizer = tts.synthesizer
+        layers = {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}
+        for attr in ("tts_model", "vocoder_model"):
+            model = getattr(synthesizer, attr, None)
+            if model is not None:
+                setattr(synthesizer, attr, torch.quantization.quantize_dynamic(model, layers, dtype=torch.qint8))
+    for model in _model_parts(tts):
+        model.eval()
+    return tts
+
+
+def export_onnx(tts, path):
+    """Export a loaded VITS model to ONNX for use with DIALOG_WHISPER_COQUI_ONNX.
+
+    Raises:
+        NotImplementedError: If the model has no ONNX export (only VITS models do)
+    """
+    model = tts.synthesizer.tts_model
+    if not hasattr(model, "export_onnx"):
+        raise NotImplementedError("%s models cannot be exported to ONNX; use a VITS model"
+                                  % type(model).__name__)
+    model.export_onnx(output_path=path)
+    return path
+
+
+class OnnxModel:
+    """Run an exported VITS model with onnxruntime behind the TTS.api interface.
+
+    The PyTorch model is still used for text processing and the sample rate.
+    """
+
+    def __init__(self, tts, onnx_path):
+        model = tts.synthesizer.tts_model
+        if not hasattr(model, "load_onnx"):
+            raise NotImplementedError("%s models have no ONNX runtime support" % type(model).__name__)
+        model.load_onnx(onnx_path, cuda=False)
+        self._model = model
+        self.synthesizer = tts.synthesizer
+
+    def tts(self, text, speed=None):
+        import numpy as np
+
+        if speed:
+            raise ValueError("speed is not supported by the ONNX model")
+        ids = np.asarray([self._model.tokenizer.text_to_ids(text)], dtype=np.int64)
+        return np.asarray(self._model.inference_onnx(ids), dtype='float32').ravel()
+
+
+def load_model(model_name, use_gpu=False, threads=None, quantize=False, onnx_path=None):
+    """Load a Coqui model, tuned for CPU inference when use_gpu is False."""
     try:
         from TTS.api import TTS
     except Exception as e:
         raise ImportError("Coqui TTS (TTS) package is required: %s" % e)
 
     # Initialize model (may download weights on first run)
-    _TTS = TTS(_MODEL_NAME, progress_bar=False, gpu=use_gpu)
+    tts = TTS(model_name, progress_bar=False, gpu=use_gpu)
+    if not use_gpu:
+        tune_cpu(tts, threads=threads, quantize=quantize)
+        if onnx_path:
+            tts = OnnxModel(tts, onnx_path)
+    return tts
+
+
+def real_time_factor(tts, texts, repeat=1):
+    """Measure synthesis speed: seconds of compute per second of audio.
+
+    Each text is synthesized once untimed (warm-up) and then repeat times;
+    the fastest pass is used. An RTF below 1.0 means faster than real time.
+
+    Returns:
+        dict with rtf, synth_seconds and audio_seconds
+    """
+    import time
+
+    for text in texts:
+        _to_audio(tts.tts(text), tts)
+    best = None
+    audio_seconds = 0.0
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        audio_seconds = 0.0
+        for text in texts:
+            audio, sr = _to_audio(tts.tts(text), tts)
+            audio_seconds += len(audio) / sr
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "rtf": best / audio_seconds if audio_seconds else None,
+        "synth_seconds": best,
+        "audio_seconds": audio_seconds,
+    }
+
+
+def _ensure_model(model_name=None, use_gpu=False):
+    """Load the model once.
+
+    CPU tuning comes from DIALOG_WHISPER_TORCH_THREADS, DIALOG_WHISPER_COQUI_QUANTIZE=1
+    and DIALOG_WHISPER_COQUI_ONNX=<path to an exported model>.
+    """
+    import os
+    global _TTS, _MODEL_NAME
+    if model_name:
+        _MODEL_NAME = model_name
+    if _TTS is not None:
+        return _TTS
+    quantize = os.environ.get("DIALOG_WHISPER_COQUI_QUANTIZE", "").lower() in ("1", "true", "yes")
+    _TTS = load_model(_MODEL_NAME, use_gpu=use_gpu, quantize=quantize,
+                      onnx_path=os.environ.get("DIALOG_WHISPER_COQUI_ONNX") or None)
     return _TTS
 
 
-def _play_wave_bytes(wave_bytes_path):
-    """Play a WAV file using the stdlib wave reader and sounddevice (no extra deps)."""
+def _get_device():
+    global _device
+    if _device is None:
+        from .audio_out import PlaybackDevice
+        _device = PlaybackDevice()
+    return _device
+
+
+def _play(audio, sr, generation, on_start=None):
+    """Play audio on the shared output stream unless stop() was called since the utterance started.
+
+    on_start() is called just before the samples are queued on the stream.
+    """
+    device = _get_device()
+    if on_start is not None and generation == _generation:
+        on_start()
+    device.play(audio, sr, when=lambda: generation == _generation)
+
+
+def current_generation():
+    """Token for utterances starting now; stop() invalidates it."""
+    return _generation
+
+
+def stop():
+    """Interrupt the current utterance, including one still being synthesized."""
+    global _generation
+    _generation += 1
+    if _device is not None:
+        _device.stop()
+
+
+def _read_wave(wave_bytes_path):
+    """Read a WAV file as (float32 mono samples, sample rate) with the stdlib wave reader."""
     import wave
     import numpy as np
-    import sounddevice as sd
 
     with wave.open(wave_bytes_path, "rb") as wf:
         sr = wf.getframerate()
@@ -49,38 +224,162 @@ def _play_wave_bytes(wave_bytes_path):
     if np.issubdtype(audio.dtype, np.integer):
         max_val = float(2 ** (8 * sampwidth - 1))
         audio = audio.astype('float32') / max_val
+    if audio.ndim > 1:
+        # The output stream is mono
+        audio = audio.mean(axis=1)
+    return audio, sr
+
+
+def _play_wave_bytes(wave_bytes_path, generation=None, on_start=None):
+    """Play a WAV file using the stdlib wave reader and sounddevice (no extra deps)."""
+    audio, sr = _read_wave(wave_bytes_path)
+    _play(audio, sr, _generation if generation is None else generation, on_start)
+
+
+def _synthesize(tts, text, speed):
+    """Call tts.tts, passing speed when set and the model accepts it."""
+    global _speed_supported
+    if speed and speed != 1.0 and _speed_supported:
+        try:
+            return tts.tts(text, speed=speed)
+        except (TypeError, ValueError) as e:
+            print(f"Debug: Coqui model does not support speed, using normal speed: {e}")
+            _speed_supported = False
+    return tts.tts(text)
+
+
+def _sample_rate(tts):
+    """Output sample rate of a loaded model (22050 Hz if it does not say)."""
+    synthesizer = getattr(tts, "synthesizer", None)
+    return getattr(synthesizer, "output_sample_rate", None) or 22050
+
+
+def _to_audio(res, tts):
+    """Normalize a tts.tts() result to (float32 mono array, sample rate)."""
+    import numpy as np
+
+    if isinstance(res, tuple) and len(res) == 2:
+        wav, sr = res
+    else:
+        wav, sr = res, _sample_rate(tts)
+    return np.asarray(wav, dtype='float32').ravel(), int(sr)
+
+
+def _join_audio(chunks, sr, gap=0.0):
+    """Concatenate mono clips with gap seconds of silence between them."""
+    import numpy as np
+
+    if len(chunks) == 1 or gap <= 0:
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    silence = np.zeros(int(sr * gap), dtype='float32')
+    parts = []
+    for i, chunk in enumerate(chunks):
+        if i:
+            parts.append(silence)
+        parts.append(chunk)
+    return np.concatenate(parts)
+
+
+def synthesize_many(tts, texts, speed=None, gap=0.0):
+    """Synthesize several lines with one loaded model, one model call per line.
+
+    The clips are joined back to back, with gap seconds of silence between
+    them (none by default).
+
+    Returns:
+        tuple: (float32 array, sample rate)
+    """
+    chunks = []
+    sr = _sample_rate(tts)
+    for text in texts:
+        audio, sr = _to_audio(_synthesize(tts, text, speed), tts)
+        chunks.append(audio)
+    return _join_audio(chunks, sr, gap), sr
+
+
+def _use_worker():
+    import os
+    return os.environ.get("DIALOG_WHISPER_COQUI_WORKER", "").lower() in ("1", "true", "yes")
+
+
+def _get_worker(model_name=None, use_gpu=False):
+    global _worker
+    if _worker is not None and not _worker.running:
+        # The child crashed or was shut down after a timeout: start a fresh one
+        print("Debug: Synthesis worker is not running, restarting it")
+        _worker.shutdown()
+        _worker = None
+    if _worker is None:
+        from .tts_worker import SynthesisWorker
+        _worker = SynthesisWorker(model_name=model_name or _MODEL_NAME, use_gpu=use_gpu)
+        _worker.start()
+    return _worker
+
+
+def cleanup():
+    """Stop the synthesis worker process and close the output stream, if open."""
+    global _worker, _device
+    if _worker is not None:
+        _worker.shutdown()
+        _worker = None
+    if _device is not None:
+        _device.close()
+        _device = None
+
 
-    sd.play(audio, sr)
-    sd.wait()
+def speak_many(texts, model_name=None, use_gpu=False, speed=None, generation=None, on_start=None,
+               gap=0.0):
+    """Synthesize several pending lines and play them as one clip.
+
+    The lines are synthesized one after another by the loaded model (in the
+    worker process when enabled), then joined with gap seconds of silence
+    (none by default) and played without the stream restarting between
+    lines. See speak for generation and on_start.
+    """
+    if generation is None:
+        generation = _generation
+    if _use_worker():
+        audio, sr = _get_worker(model_name, use_gpu).synthesize_many(texts, speed=speed, gap=gap)
+    else:
+        audio, sr = synthesize_many(_ensure_model(model_name=model_name, use_gpu=use_gpu), texts, speed, gap)
+    _play(audio, sr, generation, on_start)
 
 
-def speak(text, model_name=None, use_gpu=False):
+def speak(text, model_name=None, use_gpu=False, speed=None, generation=None, on_start=None):
     """Synthesize and play text using Coqui TTS.
 
+    Args:
+        speed: optional speaking speed relative to normal (e.g. 1.3), for models that support it
+        generation: current_generation() taken when the line was picked; nothing
+            plays if stop() was called since. Defaults to the generation on entry.
+        on_start: optional callable() run once synthesis is done and the audio
+            is about to play
+
     Notes:
+    - With DIALOG_WHISPER_COQUI_WORKER=1 the model runs in a separate process
+      (see tts_worker) and audio comes back through shared memory.
     - This will download model files on first run if not present.
-    - Playback uses sounddevice (already in requirements).
+    - Playback goes through one persistent sounddevice stream (see audio_out).
     """
     import tempfile
     import os
 
+    if generation is None:
+        generation = _generation
+    if _use_worker():
+        # Inference runs in the worker process so it never holds this process's GIL
+        audio, sr = _get_worker(model_name, use_gpu).synthesize(text, speed=speed)
+        _play(audio, sr, generation, on_start)
+        return
+
     tts = _ensure_model(model_name=model_name, use_gpu=use_gpu)
 
     # Try to get waveform directly
     try:
-        res = tts.tts(text)
-        # res may be (wav, sr) or numpy array
-        if isinstance(res, tuple) and len(res) == 2:
-            wav, sr = res
-            import sounddevice as sd
-            sd.play(wav, sr)
-            sd.wait()
-            return
-        elif hasattr(res, "dtype"):
-            # assume numpy array, assume 22050Hz
-            import sounddevice as sd
-            sd.play(res, 22050)
-            sd.wait()
+        res = _synthesize(tts, text, speed)
+        # res may be (wav, sr), a numpy array or a list of samples
+        if (isinstance(res, tuple) and len(res) == 2) or hasattr(res, "dtype") or isinstance(res, list):
+            _play(*_to_audio(res, tts), generation, on_start)
             return
     except Exception:
         # Fall back to writing to a temporary wav file
@@ -100,7 +399,7 @@ def speak(text, model_name=None, use_gpu=False):
             # last resort: try tts.tts_to_file_v2
             tts.tts_to_file(text=text, file_path=tmp_path)
 
-        _play_wave_bytes(tmp_path)
+        _play_wave_bytes(tmp_path, generation, on_start)
     finally:
         try:
             os.remove(tmp_path)
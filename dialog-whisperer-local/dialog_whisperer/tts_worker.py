@@ -0,0 +1,197 @@
+"""Coqui synthesis in a separate process (lazy imports).
+
+Torch inference holds the GIL for long stretches, which stalls capture ticks
+and Tk events when it runs in the GUI process. ``SynthesisWorker`` starts a
+child process that loads the model once and keeps it warm. Text goes to the
+child over a pipe; the PCM it produces comes back through a
+``multiprocessing.shared_memory`` block, so only the block name and sample
+count cross the pipe. The parent picks the block name for each request, so
+it can remove the block even when the reply never arrives.
+
+Enable it for the Coqui backend with ``DIALOG_WHISPER_COQUI_WORKER=1``.
+"""
+
+import os
+import threading
+
+
+def _release_block(name):
+    """Unlink a shared memory block if it exists."""
+    from multiprocessing import shared_memory
+
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _load_model(model_name, use_gpu):
+    from . import tts_coqui
+    return tts_coqui._ensure_model(model_name=model_name, use_gpu=use_gpu)
+
+
+def _serve(conn, model_name, use_gpu, model_factory):
+    """Child process main loop: answer synthesis requests until told to quit."""
+    from multiprocessing import shared_memory
+    import numpy as np
+    from . import tts_coqui
+
+    try:
+        tts = (model_factory or _load_model)(model_name, use_gpu)
+    except Exception as e:
+        conn.send(("error", None, "model failed to load: %s" % e))
+        return
+    conn.send(("ready", None, None))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg[0] == "quit":
+            return
+        _, request_id, texts, speed, gap, name = msg
+        try:
+            audio, sr = tts_coqui.synthesize_many(tts, texts, speed, gap)
+            shm = shared_memory.SharedMemory(name=name, create=True, size=max(1, audio.nbytes))
+            try:
+                np.ndarray(audio.shape, dtype='float32', buffer=shm.buf)[:] = audio
+            finally:
+                # The parent unlinks the block once it has copied the samples
+                shm.close()
+            conn.send(("audio", request_id, (name, len(audio), sr)))
+        except Exception as e:
+            conn.send(("error", request_id, str(e)))
+
+
+class SynthesisWorker:
+    """Client for a Coqui synthesis process that keeps the model loaded."""
+
+    def __init__(self, model_name=None, use_gpu=False, model_factory=None, start_timeout=300,
+                 request_timeout=120):
+        """Create a worker (not started).
+
+        Args:
+            model_name: Coqui model to load in the child
+            use_gpu: passed to the model
+            model_factory: optional picklable callable(model_name, use_gpu) returning
+                an object with a ``tts(text)`` method; defaults to loading the Coqui model
+            start_timeout: seconds to wait for the model to load (first runs download it)
+            request_timeout: seconds to wait for one synthesis request; a child that
+                takes longer is terminated
+        """
+        self.model_name = model_name
+        self.use_gpu = use_gpu
+        self.model_factory = model_factory
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self._process = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._ids = 0
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the child process and wait until its model is loaded.
+
+        Raises:
+            RuntimeError: If the model fails to load or the child does not answer
+        """
+        import multiprocessing
+
+        if self._process is not None:
+            return
+        # spawn: never fork a process that has Tk and capture threads running
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(target=_serve, name="whisper-synth", daemon=True,
+                                    args=(child_conn, self.model_name, self.use_gpu, self.model_factory))
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        if not parent_conn.poll(self.start_timeout):
+            self.shutdown()
+            raise RuntimeError("synthesis worker did not start within %ss" % self.start_timeout)
+        kind, _, error = parent_conn.recv()
+        if kind != "ready":
+            self.shutdown()
+            raise RuntimeError("synthesis worker failed: %s" % error)
+
+    def synthesize(self, text, speed=None):
+        """Synthesize text in the worker. See synthesize_many."""
+        return self.synthesize_many([text], speed=speed)
+
+    def synthesize_many(self, texts, speed=None, gap=0.0):
+        """Synthesize several lines in one request, joined into one clip.
+
+        The child synthesizes the lines one by one; gap seconds of silence go
+        between them (none by default).
+
+        Returns:
+            tuple: (float32 numpy array, sample rate)
+
+        Raises:
+            RuntimeError: If the worker is not running, did not answer within
+                request_timeout (it is then shut down) or synthesis failed
+        """
+        from multiprocessing import shared_memory
+        import numpy as np
+
+        with self._lock:
+            if not self.running:
+                raise RuntimeError("synthesis worker is not running")
+            self._ids += 1
+            request_id = self._ids
+            blocks = [self._block_name(request_id)]
+            # Every block this request may have created is removed, whatever happens
+            try:
+                try:
+                    self._conn.send(("synth", request_id, list(texts), speed, gap, blocks[0]))
+                    if not self._conn.poll(self.request_timeout):
+                        # A hung child would hold the lock forever; the next caller restarts it
+                        self.shutdown(timeout=0.5)
+                        raise RuntimeError("synthesis worker did not answer within %ss"
+                                           % self.request_timeout)
+                    kind, reply_id, payload = self._conn.recv()
+                except (EOFError, OSError) as e:
+                    self.shutdown(timeout=0.5)
+                    raise RuntimeError("synthesis worker exited: %s" % e)
+                if kind == "audio" and reply_id != request_id:
+                    blocks.append(payload[0])
+                if kind != "audio" or reply_id != request_id:
+                    raise RuntimeError("synthesis failed: %s" % (payload,))
+
+                name, n_samples, sr = payload
+                shm = shared_memory.SharedMemory(name=name)
+                try:
+                    return np.ndarray((n_samples,), dtype='float32', buffer=shm.buf).copy(), sr
+                finally:
+                    shm.close()
+            finally:
+                for name in blocks:
+                    _release_block(name)
+
+    def _block_name(self, request_id):
+        """Name of the shared memory block the child writes for request_id."""
+        return "wsynth-%d-%d-%d" % (os.getpid(), id(self), request_id)
+
+    def shutdown(self, timeout=2.0):
+        """Ask the child to exit, and terminate it if it does not."""
+        if self._process is None:
+            return
+        try:
+            self._conn.send(("quit",))
+        except Exception:
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout)
+        self._conn.close()
+        self._process = None
+        self._conn = None
@@ -0,0 +1,101 @@
+"""Compare OCR backends on the same image corpus.
+
+Usage:
+    python -m scripts.benchmark_ocr [--corpus DIR] [--backends pytesseract tesserocr] [--repeat N]
+        [--tiled] [--json OUT]
+
+The corpus directory holds images (png/jpg/bmp). An image ``foo.png`` is scored
+against ``foo.txt`` when that file exists. Without --corpus a few synthetic
+dialog images are rendered with known text. Each image is OCR'd on its own;
+--tiled adds a row per backend for batched calls (tiled canvases for
+pytesseract).
+"""
+import argparse
+import json
+import os
+from PIL import Image, ImageDraw, ImageFont
+
+from dialog_whisperer import ocr_backends
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+SAMPLE_LINES = [
+    "Welcome back, traveler.",
+    "The gate to the north is sealed.",
+    "SCORE: 12345  HP: 78/100",
+    "Will you help us find the key?",
+]
+
+
+def synthetic_corpus():
+    try:
+        font = ImageFont.truetype("arial.ttf", 32)
+    except Exception:
+        font = ImageFont.load_default()
+    images = []
+    for line in SAMPLE_LINES:
+        img = Image.new('RGB', (800, 80), color=(30, 30, 30))
+        ImageDraw.Draw(img).text((20, 20), line, fill=(255, 255, 255), font=font)
+        images.append(img)
+    return images, list(SAMPLE_LINES)
+
+
+def load_corpus(directory):
+    images, expected = [], []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in IMAGE_EXTS:
+            continue
+        img = Image.open(os.path.join(directory, name))
+        img.load()
+        images.append(img)
+        truth = os.path.join(directory, stem + '.txt')
+        if os.path.exists(truth):
+            with open(truth, encoding='utf-8') as f:
+                expected.append(f.read())
+        else:
+            expected.append(None)
+    # Only score when every image has ground truth
+    if any(e is None for e in expected):
+        expected = None
+    return images, expected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', '-c', help='Directory of screenshots (with optional .txt ground truth)')
+    parser.add_argument('--backends', '-b', nargs='+', help='Backends to run (default: all registered)')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Passes per backend; the fastest is reported')
+    parser.add_argument('--tiled', action='store_true', help='Also time batched (tiled) OCR calls')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    if args.corpus:
+        images, expected = load_corpus(args.corpus)
+    else:
+        images, expected = synthetic_corpus()
+    if not images:
+        print("No images found")
+        return
+    print(f"Benchmarking {len(images)} images...")
+
+    results = ocr_backends.benchmark(images, expected, backends=args.backends, repeat=args.repeat,
+                                     tiled=args.tiled)
+
+    print(f"{'backend':<22}{'ms/image':>10}{'accuracy':>10}")
+    for name, entry in results.items():
+        if entry.get("error"):
+            print(f"{name:<22}  unavailable: {entry['error']}")
+            continue
+        acc = entry["accuracy"]
+        acc_text = f"{acc:.1%}" if acc is not None else "-"
+        print(f"{name:<22}{entry['ms_per_image']:>10.1f}{acc_text:>10}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Time the hot capture/compare/OCR/audio primitives on standard frame sizes.
+
+Usage:
+    python -m scripts.benchmark_primitives [--only NAME ...] [--json OUT] [--number N] [--repeat R]
+    python -m scripts.benchmark_primitives --compare BASELINE.json [--tolerance 0.15]
+
+Each case is timed with ``timeit``: ``repeat`` runs of ``number`` calls, and
+the fastest run is reported as milliseconds per call. With --compare the
+suite runs and each case is reported as a ratio to the baseline file; cases
+slower than the baseline by more than --tolerance are flagged and the exit
+status is 1. Cases whose dependencies are missing (e.g. tesseract) are
+reported as skipped.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from dialog_whisperer import capture, ocr, tts_coqui
+from dialog_whisperer.monitor import Monitor, SimulatedClock, SyntheticScreen
+
+FRAME_SIZES = [(400, 100), (1280, 300), (1920, 1080)]
+
+
+def dialog_frame(size, seed=0, text_rows=3):
+    """A dark dialog box with bright text-like strokes, deterministic per seed."""
+    rng = np.random.default_rng(seed)
+    img = Image.new('RGB', size, (20, 20, 40))
+    draw = ImageDraw.Draw(img)
+    row_height = max(12, size[1] // (text_rows + 1))
+    for row in range(text_rows):
+        y = row_height // 2 + row * row_height
+        x = 10
+        while x < size[0] - 40:
+            width = int(rng.integers(8, 40))
+            draw.rectangle((x, y, x + width, y + row_height // 2), fill=(230, 230, 230))
+            x += width + int(rng.integers(6, 16))
+    return img
+
+
+def cases():
+    """Yield (name, setup) pairs; setup() returns the callable to time."""
+    for w, h in FRAME_SIZES:
+        def setup(w=w, h=h):
+            a, b = dialog_frame((w, h), 0), dialog_frame((w, h), 1)
+            return lambda: capture.compare_images(a, b)
+        yield f"compare_images/{w}x{h}", setup
+
+        def setup(w=w, h=h):
+            matcher = capture.ReferenceMatcher(dialog_frame((w, h), 0))
+            b = dialog_frame((w, h), 1)
+            return lambda: matcher.matches(b)
+        yield f"reference_matcher/{w}x{h}", setup
+
+        def setup(w=w, h=h):
+            bgra = np.ascontiguousarray(np.asarray(dialog_frame((w, h)).convert('RGBA'))[:, :, [2, 1, 0, 3]])
+            return lambda: capture._to_image(bgra)
+        yield f"bgra_to_rgb/{w}x{h}", setup
+
+        def setup(w=w, h=h):
+            detector = capture.DirtyRegionDetector()
+            frames = [dialog_frame((w, h), 0), dialog_frame((w, h), 1)]
+            state = {"i": 0}
+            def run():
+                state["i"] ^= 1
+                detector.update(frames[state["i"]])
+            return run
+        yield f"dirty_regions/{w}x{h}", setup
+
+        def setup(w=w, h=h):
+            frame = dialog_frame((w, h))
+            return lambda: ocr.text_classifier.likely_has_text(frame)
+        yield f"likely_has_text/{w}x{h}", setup
+
+    def setup():
+        from scripts.benchmark_ocr import synthetic_corpus
+        from dialog_whisperer.ocr_backends import get_backend
+        images, _ = synthetic_corpus()
+        # image_to_text swallows engine errors; call the engine once so a missing one skips the case
+        get_backend().image_to_text(images[0])
+        return lambda: [ocr.image_to_text(img) for img in images]
+    yield "image_to_text/demo_corpus", setup
+
+    def setup():
+        import wave
+        path = os.path.join(tempfile.mkdtemp(), "bench.wav")
+        samples = (np.sin(np.linspace(0, 2000, 22050 * 3)) * 20000).astype(np.int16)
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(22050)
+            wf.writeframes(samples.tobytes())
+        return lambda: tts_coqui._read_wave(path)
+    yield "read_wave/3s_22050", setup
+
+    def setup():
+        clock = SimulatedClock()
+        screen = SyntheticScreen(clock, [(i * 3.0, ["Line %d of the dialog" % i]) for i in range(50)])
+        result = ocr.OCRResult(text="")
+
+        class NullReader:
+            def read(self, image):
+                return result
+
+            def reset(self):
+                pass
+        monitor = Monitor((100, 500, 1180, 680), lambda text, conf: None, source=screen,
+                          clock=clock, reader=NullReader())
+        def run():
+            monitor.tick()
+            clock.sleep(0.5)
+        return run
+    yield "monitor_tick/synthetic", setup
+
+
+def run_suite(only=None, number=20, repeat=5):
+    results = {}
+    for name, setup in cases():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            fn = setup()
+            fn()  # warm-up
+            n = max(1, number // 10) if name.startswith("image_to_text") else number
+            best = min(timeit.repeat(fn, number=n, repeat=repeat))
+            results[name] = {"ms": best / n * 1000}
+        except Exception as e:
+            results[name] = {"skipped": str(e)}
+        entry = results[name]
+        shown = f"{entry['ms']:10.3f} ms" if "ms" in entry else f"   skipped: {entry['skipped']}"
+        print(f"{name:<32}{shown}")
+    return results
+
+
+def compare(baseline, current, tolerance):
+    """Print current/baseline ratios; return the names that regressed beyond tolerance."""
+    regressions = []
+    print(f"\n{'case':<32}{'baseline':>11}{'current':>11}{'ratio':>8}")
+    for name, entry in current.items():
+        base = baseline.get(name, {})
+        if "ms" not in entry or "ms" not in base:
+            continue
+        ratio = entry["ms"] / base["ms"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{name:<32}{base['ms']:>9.3f}ms{entry['ms']:>9.3f}ms{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--only', nargs='+', help='Run only cases whose name starts with one of these')
+    parser.add_argument('--number', '-n', type=int, default=20, help='Calls per timing run')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Timing runs; the fastest is reported')
+    parser.add_argument('--json', help='Write results to this JSON file (use as a later baseline)')
+    parser.add_argument('--compare', help='Baseline JSON file from an earlier --json run')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed slowdown before a case counts as a regression (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    results = run_suite(args.only, args.number, args.repeat)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "machine": platform.machine(),
+                       "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Measure Coqui real-time factor (RTF) with and without CPU tuning.
+
+Usage:
+    python -m scripts.benchmark_tts [--model NAME] [--modes baseline quantized onnx]
+                                    [--threads N] [--onnx PATH] [--repeat N] [--json OUT]
+
+RTF is synthesis time divided by the duration of the audio produced; below
+1.0 is faster than real time. ``baseline`` loads the model with default
+torch threading, ``tuned`` sets the thread count, ``quantized`` also applies
+dynamic int8 quantization and ``onnx`` runs an exported VITS model (exported
+to --onnx first if the file does not exist).
+"""
+import argparse
+import json
+import os
+
+from dialog_whisperer import tts_coqui
+
+SAMPLE_LINES = [
+    "Welcome back, traveler.",
+    "The gate to the north has been sealed since the storm.",
+    "Will you help us find the key?",
+    "Come back when you have gathered enough supplies for the journey.",
+]
+
+MODES = ("baseline", "tuned", "quantized", "onnx")
+
+
+def load(mode, model_name, threads, onnx_path):
+    if mode == "baseline":
+        from TTS.api import TTS
+        return TTS(model_name, progress_bar=False, gpu=False)
+    if mode == "onnx" and not os.path.exists(onnx_path):
+        print(f"Exporting ONNX model to {onnx_path}...")
+        tts_coqui.export_onnx(tts_coqui.load_model(model_name, threads=threads), onnx_path)
+    return tts_coqui.load_model(model_name, threads=threads, quantize=(mode == "quantized"),
+                                onnx_path=onnx_path if mode == "onnx" else None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', '-m', default=tts_coqui._MODEL_NAME, help='Coqui model name')
+    parser.add_argument('--modes', nargs='+', default=["baseline", "tuned", "quantized"], choices=MODES)
+    parser.add_argument('--threads', '-t', type=int, default=None,
+                        help='Torch threads for tuned modes (default: half the cores)')
+    parser.add_argument('--onnx', default='coqui_model.onnx', help='ONNX file for the onnx mode')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Timed passes; the fastest is reported')
+    parser.add_argument('--json', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        print(f"Loading {args.model} ({mode})...")
+        try:
+            tts = load(mode, args.model, args.threads, args.onnx)
+            results[mode] = tts_coqui.real_time_factor(tts, SAMPLE_LINES, repeat=args.repeat)
+        except Exception as e:
+            results[mode] = {"error": str(e)}
+
+    print(f"{'mode':<12}{'RTF':>8}{'synth s':>10}{'audio s':>10}")
+    for mode, entry in results.items():
+        if entry.get("error"):
+            print(f"{mode:<12}  unavailable: {entry['error']}")
+            continue
+        print(f"{mode:<12}{entry['rtf']:>8.3f}{entry['synth_seconds']:>10.2f}{entry['audio_seconds']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
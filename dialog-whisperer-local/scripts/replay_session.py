@@ -0,0 +1,54 @@
+"""Replay a recorded monitoring session through the monitor loop and time it.
+
+Usage:
+    python -m scripts.replay_session SESSION_DIR [--interval 0.5] [--backend NAME]
+
+Record a session by running the GUI with DIALOG_WHISPER_RECORD=DIR. The
+replay runs the real OCR pipeline (band reader and confidence gate) on a
+simulated clock, so it finishes as fast as OCR allows and every run sees the
+same frames. Recognized lines are printed with their time in the recording.
+"""
+import argparse
+import time
+
+from dialog_whisperer import ocr
+from dialog_whisperer.monitor import Monitor, SimulatedClock
+from dialog_whisperer.recorder import RecordedSession, ReplaySource
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('session', help='Session folder written by the frame recorder')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between monitor ticks')
+    parser.add_argument('--backend', help='OCR backend (default: $DIALOG_WHISPER_OCR_BACKEND)')
+    args = parser.parse_args()
+
+    session = RecordedSession(args.session)
+    if not len(session):
+        print("Session has no frames")
+        return
+    print(f"{len(session)} frames over {session.duration:.1f}s in {len(session.chunks)} chunks")
+
+    clock = SimulatedClock()
+    source = ReplaySource(session, clock)
+    reader = ocr.BandReader(backend=args.backend)
+    lines = []
+    bbox = session.chunks[0]["bbox"] or (0, 0, 0, 0)
+    monitor = Monitor(bbox, lambda text, conf: lines.append((clock.now(), text, conf)),
+                      source=source, clock=clock, reader=reader, interval=args.interval)
+
+    start = time.perf_counter()
+    while not source.finished:
+        monitor.tick()
+        clock.sleep(args.interval)
+    elapsed = time.perf_counter() - start
+
+    for at, text, conf in lines:
+        shown = f"{conf:.0f}" if conf is not None else "-"
+        print(f"[{at:7.1f}s conf {shown:>3}] {text}")
+    print(f"\n{monitor.ticks} ticks in {elapsed:.2f}s ({1000 * elapsed / max(1, monitor.ticks):.1f} ms/tick), "
+          f"{len(lines)} lines, bands read {reader.bands_read} / reused {reader.bands_reused}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,26 @@
 
 Usage:
     python -m scripts.run_screenshot_test --image PATH [--tts]
+    python -m scripts.run_screenshot_test --batch DIR_OR_GLOB [--out results.csv|.jsonl]
+        [--workers N] [--backend NAME] [--crop L T R B] [--scale F] [--truth-dir DIR]
+        [--lang eng+jpn] [--psm 6] [--whitelist CHARS] [--dpi N]
 
 If --image is not provided a demo image is generated.
+
+Batch mode OCRs every image in a directory (or matching a glob) across a pool
+of worker processes, without showing or speaking anything. Each image gets a
+row with its text, preprocessing and OCR time in milliseconds and, when a
+ground-truth ``<stem>.txt`` exists next to the image (or in --truth-dir), an
+accuracy score from ``ocr_backends.text_accuracy``. --lang, --psm,
+--whitelist and --dpi set the OCR config, so settings can be compared on
+the same screenshots.
 """
 import argparse
+import csv
+import glob
+import json
 import os
+import time
 from PIL import Image, ImageDraw, ImageFont
 
 from dialog_whisperer import ocr
@@ -26,13 +41,152 @@ def make_demo_image(path):
     return path
 
 
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp')
+FIELDS = ['path', 'text', 'preprocess_ms', 'ocr_ms', 'accuracy', 'error']
+
+
+def find_images(spec):
+    """Image paths in a directory, or matching a glob pattern, sorted."""
+    if os.path.isdir(spec):
+        paths = [os.path.join(spec, name) for name in os.listdir(spec)]
+    else:
+        paths = glob.glob(spec, recursive=True)
+    return sorted(p for p in paths if os.path.splitext(p)[1].lower() in IMAGE_EXTS)
+
+
+def truth_path(img_path, truth_dir=None):
+    """Where the ground-truth text for an image would be."""
+    stem = os.path.splitext(os.path.basename(img_path))[0]
+    return os.path.join(truth_dir or os.path.dirname(img_path), stem + '.txt')
+
+
+def preprocess(img, crop=None, scale=None):
+    """Crop and rescale a screenshot the way the batch was asked to."""
+    img = img.convert('RGB')
+    if crop:
+        img = img.crop(tuple(crop))
+    if scale and scale != 1:
+        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))), Image.LANCZOS)
+    return img
+
+
+def ocr_file(img_path, backend=None, crop=None, scale=None, truth_dir=None, config=None):
+    """OCR one image file; returns a result row (see FIELDS)."""
+    from dialog_whisperer import ocr_backends
+
+    row = {'path': img_path, 'text': '', 'preprocess_ms': None, 'ocr_ms': None,
+           'accuracy': None, 'error': None}
+    try:
+        start = time.perf_counter()
+        with Image.open(img_path) as src:
+            img = preprocess(src, crop, scale)
+        row['preprocess_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+        # Call the engine directly: ocr.image_to_text writes ocr_debug.png,
+        # which parallel workers would overwrite
+        engine = ocr_backends.get_backend(backend)
+        start = time.perf_counter()
+        row['text'] = '' if ocr._is_blank(img) else engine.image_to_text(img, **ocr_backends.config_kwargs(config)).strip()
+        row['ocr_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    except Exception as e:
+        row['error'] = str(e)
+        return row
+
+    truth = truth_path(img_path, truth_dir)
+    if os.path.exists(truth):
+        with open(truth, encoding='utf-8') as f:
+            row['accuracy'] = round(ocr_backends.text_accuracy(f.read(), row['text']), 4)
+    return row
+
+
+def _ocr_job(job):
+    return ocr_file(*job)
+
+
+def run_batch(paths, workers=None, backend=None, crop=None, scale=None, truth_dir=None, config=None):
+    """OCR many images in parallel; returns rows in the order of paths.
+
+    Worker processes each load their own engine, so persistent backends such
+    as tesserocr are never shared between threads.
+    """
+    jobs = [(p, backend, crop, scale, truth_dir, config) for p in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return [_ocr_job(job) for job in jobs]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_ocr_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def write_results(rows, out):
+    """Write rows as JSON lines (.jsonl) or CSV (anything else)."""
+    with open(out, 'w', encoding='utf-8', newline='') as f:
+        if out.lower().endswith('.jsonl'):
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+        else:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def summarize(rows, elapsed):
+    """Print totals for a batch run."""
+    done = [r for r in rows if r['error'] is None]
+    print(f"Images: {len(rows)}  failed: {len(rows) - len(done)}  wall time: {elapsed:.2f}s")
+    if done:
+        print(f"Mean OCR time: {sum(r['ocr_ms'] for r in done) / len(done):.1f} ms/image"
+              f"  throughput: {len(rows) / elapsed:.1f} images/s")
+    scored = [r['accuracy'] for r in done if r['accuracy'] is not None]
+    if scored:
+        print(f"Mean accuracy: {sum(scored) / len(scored):.3f} over {len(scored)} scored images")
+    for r in rows:
+        if r['error'] is not None:
+            print(f"  {r['path']}: {r['error']}")
+
+
+def batch_main(args):
+    paths = find_images(args.batch)
+    if not paths:
+        print(f"No images found for {args.batch}")
+        return
+    print(f"OCR on {len(paths)} images with {args.workers or os.cpu_count()} workers...")
+    start = time.perf_counter()
+    config = None
+    if any(v is not None for v in (args.lang, args.psm, args.whitelist, args.dpi)):
+        from dialog_whisperer.ocr_backends import OCRConfig
+        config = OCRConfig(lang=args.lang, psm=args.psm, whitelist=args.whitelist, dpi=args.dpi)
+        print(f"Using {config}")
+    rows = run_batch(paths, args.workers, args.backend, args.crop, args.scale, args.truth_dir, config)
+    summarize(rows, time.perf_counter() - start)
+    if args.out:
+        write_results(rows, args.out)
+        print(f"Results written to {args.out}")
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--image', '-i', help='Path to screenshot image file')
     parser.add_argument('--tts', action='store_true', help='Speak recognized text (requires pyttsx3)')
     parser.add_argument('--select', action='store_true', help='Interactively select a region from the image before OCR')
+    parser.add_argument('--batch', '-b', help='Directory or glob of screenshots to OCR in parallel')
+    parser.add_argument('--out', '-o', help='Batch results file (.csv or .jsonl)')
+    parser.add_argument('--workers', '-w', type=int, help='Batch worker processes (default: CPU count)')
+    parser.add_argument('--backend', help='OCR backend (default: $DIALOG_WHISPER_OCR_BACKEND)')
+    parser.add_argument('--crop', type=int, nargs=4, metavar=('L', 'T', 'R', 'B'),
+                        help='Crop every batch image to this box before OCR')
+    parser.add_argument('--scale', type=float, help='Resize factor applied after cropping (batch)')
+    parser.add_argument('--truth-dir', help='Directory of <stem>.txt ground truth (default: next to each image)')
+    parser.add_argument('--lang', help='Tesseract languages, e.g. eng or eng+jpn (batch)')
+    parser.add_argument('--psm', type=int, help='Page segmentation mode, e.g. 6 for one block, 7 for one line (batch)')
+    parser.add_argument('--whitelist', help='Only recognize these characters (batch)')
+    parser.add_argument('--dpi', type=int, help='Resolution hint for the engine (batch)')
     args = parser.parse_args()
 
+    if args.batch:
+        batch_main(args)
+        return
+
     if args.image:
         img_path = args.image
         if not os.path.exists(img_path):
@@ -0,0 +1,33 @@
+"""Fakes and test images shared by several test modules."""
+
+from PIL import Image
+from dialog_whisperer import ocr
+
+REGION = (100, 500, 1180, 680)
+
+class ScriptReader:
+    """Stands in for OCR: 'reads' the lines the synthetic screen is showing."""
+    def __init__(self, screen, confidence=90.0):
+        self.screen = screen
+        self.confidence = confidence
+        self.reads = 0
+
+    def read(self, image):
+        self.reads += 1
+        lines, _ = self.screen._current()
+        words = [ocr.OCRWord(word, self.confidence, 0, 0, 1, 1, i)
+                 for i, line in enumerate(lines or ()) for word in line.split()]
+        return ocr.OCRResult(words)
+
+    def reset(self):
+        pass
+
+def draw_lines(lines, size=(300, 120)):
+    """Dark dialog box with one white bar per non-empty entry, 30 rows apart."""
+    from PIL import ImageDraw
+    img = Image.new('RGB', size, (20, 20, 40))
+    draw = ImageDraw.Draw(img)
+    for i, width in enumerate(lines):
+        for x in range(10, 10 + width, 6):
+            draw.rectangle((x, 10 + 30 * i, x + 3, 20 + 30 * i), fill='white')
+    return img
@@ -0,0 +1,86 @@
+"""Test the asyncio API."""
+
+import asyncio
+import time
+import pytest
+from PIL import Image
+from dialog_whisperer import aio
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    texts = iter(["Hello", "Hello", "World", "", "Again"])
+    monkeypatch.setattr('dialog_whisperer.capture.capture_region',
+                        lambda bbox=None: Image.new('RGB', (100, 30), 'black'))
+    monkeypatch.setattr('dialog_whisperer.ocr.image_to_text', lambda img: next(texts, ""))
+    monkeypatch.setattr('dialog_whisperer.tts.speak', lambda text, rate=None, volume=None: None)
+
+def test_awaitable_wrappers(fake_pipeline):
+    """Wrapped helpers return the same values as the blocking ones."""
+    async def run():
+        img = await aio.capture_region((0, 0, 100, 30))
+        return img.size, await aio.image_to_text(img)
+
+    assert asyncio.run(run()) == ((100, 30), "Hello")
+
+def test_reader_yields_new_lines(fake_pipeline):
+    """Repeated and empty text is not yielded."""
+    async def run():
+        lines = []
+        async with aio.AsyncReader((0, 0, 100, 30), interval=0) as reader:
+            async for line in reader:
+                lines.append(line)
+                if len(lines) == 3:
+                    reader.stop()
+        return lines
+
+    assert asyncio.run(run()) == ["Hello", "World", "Again"]
+
+def test_reader_stop_is_immediate(fake_pipeline):
+    """Stopping wakes the reader without waiting for the poll interval."""
+    async def run():
+        reader = aio.AsyncReader((0, 0, 100, 30), interval=30)
+        task = asyncio.create_task(reader.speak_lines())
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        reader.stop()
+        await task
+        reader.close()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) < 1.0
+
+def test_reference_check_runs_off_the_event_loop(fake_pipeline, monkeypatch):
+    """The UI reference comparison runs on the capture executor."""
+    import threading
+    threads = []
+
+    class FakeMatcher:
+        def __init__(self, reference):
+            threads.append(threading.current_thread())
+
+        def matches(self, img):
+            threads.append(threading.current_thread())
+            return True
+
+    monkeypatch.setattr('dialog_whisperer.capture.ReferenceMatcher', FakeMatcher)
+
+    async def run():
+        reader = aio.AsyncReader((0, 0, 100, 30), reference_image=Image.new('RGB', (100, 30)))
+        try:
+            return await reader.read_once()
+        finally:
+            reader.close()
+
+    assert asyncio.run(run()) is None
+    assert len(threads) == 2 and threading.main_thread() not in threads
+
+def test_speak_lines_waits_for_the_speaker_task(fake_pipeline):
+    """No speaker task is left pending once speak_lines returns."""
+    async def run():
+        reader = aio.AsyncReader((0, 0, 100, 30), interval=0)
+        asyncio.get_running_loop().call_later(0.05, reader.stop)
+        await reader.speak_lines()
+        reader.close()
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
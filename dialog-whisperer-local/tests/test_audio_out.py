@@ -0,0 +1,37 @@
+"""Test the persistent audio output device."""
+
+import numpy as np
+from dialog_whisperer import audio_out
+
+def test_resample_and_ring_buffer_wraparound():
+    """Resampling keeps duration; the ring buffer returns samples in order across the wrap."""
+    audio = np.sin(np.linspace(0, 20, 22050)).astype('float32')
+    out = audio_out.resample(audio, 22050, 48000)
+    assert abs(len(out) - 48000) <= 1 and out.dtype == np.float32
+
+    ring = audio_out.RingBuffer(8)
+    assert ring.write(np.arange(6, dtype='float32')) == 6
+    block = np.empty(4, dtype='float32')
+    ring.read_into(block)
+    assert ring.write(np.arange(6, 12, dtype='float32')) == 6
+    rest = np.empty(10, dtype='float32')
+    assert ring.read_into(rest) == 8
+    assert list(rest) == [4, 5, 6, 7, 8, 9, 10, 11, 0, 0]
+
+def test_device_plays_back_to_back_on_one_stream():
+    """Utterances share one stream and play gaplessly; cancelled ones are skipped."""
+    streams = []
+    def factory(samplerate, blocksize, callback):
+        streams.append(audio_out.NullStream(samplerate, blocksize, callback, record=True))
+        return streams[-1]
+
+    device = audio_out.PlaybackDevice(sample_rate=16000, blocksize=256, stream_factory=factory)
+    ones = np.ones(1000, dtype='float32')
+    assert device.play(ones, 16000, wait=False)
+    assert device.play(ones * 0.5, 16000)
+    assert not device.play(ones, 16000, when=lambda: False)
+    device.close()
+    assert len(streams) == 1
+    played = np.concatenate(streams[0].played)
+    start = np.flatnonzero(played)[0]
+    assert np.all(played[start:start + 1000] == 1) and np.all(played[start + 1000:start + 2000] == 0.5)
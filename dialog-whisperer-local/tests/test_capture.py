@@ -3,6 +3,7 @@
 import pytest
 from PIL import Image
 from dialog_whisperer import capture
+from tests.helpers import draw_lines
 
 def test_capture_imports():
     """Verify capture module imports."""
@@ -28,4 +29,73 @@ def test_capture_missing_deps(monkeypatch):
     
     with pytest.raises(ImportError) as exc:
         capture.capture_region((0, 0, 100, 100))
-    assert "mss" in str(exc.value)
\ No newline at end of file
+    assert "mss" in str(exc.value)
+
+def make_frame(text_box=None, size=(400, 100)):
+    """Dark frame with an optional bright box (x1, y1, x2, y2)."""
+    from PIL import ImageDraw
+    img = Image.new('RGB', size, (20, 20, 40))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, size[0] - 1, 20), fill=(200, 180, 60))
+    if text_box:
+        draw.rectangle(text_box, fill=(255, 255, 255))
+    return img
+
+def test_compare_images_blocks():
+    """Identical frames match and very different frames do not."""
+    ui = make_frame()
+    assert capture.compare_images(ui, ui.copy())
+    assert not capture.compare_images(ui, Image.new('RGB', ui.size, 'white'))
+    assert not capture.compare_images(ui, Image.new('RGB', (10, 10)))
+
+def test_reference_matcher_agrees_with_compare_images():
+    """The pyramid matcher gives the same answers as the full comparison."""
+    ui = make_frame()
+    matcher = capture.ReferenceMatcher(ui)
+    frames = [ui.copy(), make_frame((10, 40, 60, 60)), make_frame((0, 0, 399, 99)),
+              Image.new('RGB', ui.size, 'white'), Image.new('RGB', (50, 50))]
+    for frame in frames:
+        assert matcher.matches(frame) == capture.compare_images(frame, ui)
+    assert matcher.coarse_decisions > 0
+
+def test_monitor_for_picks_largest_overlap():
+    """Regions map to the monitor holding most of them, including negative coordinates."""
+    left = {"left": -1920, "top": 0, "width": 1920, "height": 1080}
+    primary = {"left": 0, "top": 0, "width": 2560, "height": 1440}
+    assert capture.monitor_for((-300, 100, 100, 200), [primary, left]) is left
+    assert capture.monitor_for((-100, 100, 300, 200), [primary, left]) is primary
+    assert capture.monitor_for((5000, 0, 5100, 100), [primary, left]) is None
+    assert capture.to_physical((10, 20, 110, 70), 1.5) == (15, 30, 165, 105)
+    assert capture._intersect((-100, -50, 300, 200), primary) == (0, 0, 300, 200)
+
+def test_capture_pads_regions_that_leave_the_monitor(monkeypatch):
+    """A region hanging off its monitor keeps its full size; the outside is black."""
+    import numpy as np
+
+    class FakeGrabber:
+        monitors = [{"left": 0, "top": 0, "width": 200, "height": 100},
+                    {"left": 0, "top": 0, "width": 200, "height": 100}]
+
+        def grab(self, monitor):
+            self.grabbed = monitor
+            return np.full((monitor["height"], monitor["width"], 4), 255, dtype=np.uint8)
+
+    grabber = FakeGrabber()
+    monkeypatch.setattr(capture, "_grabber", lambda: grabber)
+    img = capture.capture_region((150, 50, 250, 150), scale=1)
+    assert img.size == (100, 100)
+    assert grabber.grabbed == {"left": 150, "top": 50, "width": 50, "height": 50}
+    assert img.getpixel((10, 10)) == (255, 255, 255)
+    assert img.getpixel((60, 60)) == (0, 0, 0)
+
+def test_dirty_region_detector_marks_changed_lines():
+    """Only the line band whose pixels changed is dirty."""
+    detector = capture.DirtyRegionDetector()
+    bands, dirty = detector.update(draw_lines([120, 200, 80]))
+    assert len(bands) == 3 and all(dirty)
+
+    bands, dirty = detector.update(draw_lines([120, 200, 80]))
+    assert dirty == [False, False, False]
+
+    bands, dirty = detector.update(draw_lines([120, 150, 80]))
+    assert dirty == [False, True, False]
@@ -0,0 +1,81 @@
+"""Test marshalling hotkey callbacks and background work onto the Tk thread."""
+
+import threading
+import time
+
+from dialog_whisperer.hotkeys import TkDispatcher
+
+class FakeRoot:
+    """Records after() calls instead of running a Tk loop."""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        self.scheduled[after_id - 1] = None
+
+    def tick(self):
+        """Run the callbacks scheduled so far, like one pass of the Tk loop."""
+        due, self.scheduled = self.scheduled, []
+        for fn in due:
+            if fn is not None:
+                fn()
+
+def test_hotkeys_run_on_the_polling_thread_and_coalesce():
+    """Presses from another thread run on the Tk thread, once per burst."""
+    root = FakeRoot()
+    dispatcher = TkDispatcher(root)
+    dispatcher.start()
+    seen = []
+    press = dispatcher.handler(lambda: seen.append(threading.current_thread().name), key="capture")
+
+    hook = threading.Thread(target=lambda: [press() for _ in range(5)], name="keyboard-hook")
+    hook.start()
+    hook.join()
+    assert seen == []
+    root.tick()
+    assert seen == [threading.current_thread().name]
+    press()
+    root.tick()
+    assert len(seen) == 2
+
+    dispatcher.stop()
+    press()
+    root.tick()
+    assert len(seen) == 2 and not any(root.scheduled)
+
+def test_run_async_returns_results_on_the_tk_thread():
+    """Slow work runs off the Tk thread; repeated starts are ignored while it runs."""
+    root = FakeRoot()
+    dispatcher = TkDispatcher(root)
+    dispatcher.start()
+    release = threading.Event()
+    results = []
+
+    def work():
+        release.wait(5)
+        return threading.current_thread().name
+
+    assert dispatcher.run_async(work, results.append, key="start")
+    assert not dispatcher.run_async(work, results.append, key="start")
+    root.tick()
+    assert results == [] and dispatcher.busy("start")
+
+    release.set()
+    deadline = time.time() + 5
+    while not results and time.time() < deadline:
+        root.tick()
+        time.sleep(0.01)
+    assert results == ["whisper-task"]
+    assert not dispatcher.busy("start")
+
+    errors = []
+    dispatcher.run_async(lambda: 1 / 0, results.append, errors.append)
+    deadline = time.time() + 5
+    while not errors and time.time() < deadline:
+        root.tick()
+        time.sleep(0.01)
+    assert isinstance(errors[0], ZeroDivisionError)
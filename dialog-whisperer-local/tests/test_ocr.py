@@ -4,6 +4,7 @@ import pytest
 from PIL import Image
 import io
 from dialog_whisperer import ocr
+from tests.helpers import draw_lines
 
 def test_ocr_imports():
     """Verify OCR module imports."""
@@ -33,4 +34,149 @@ def test_ocr_missing_tesseract(monkeypatch):
     img = Image.new('RGB', (100, 50), 'white')
     with pytest.raises(ImportError) as exc:
         ocr.image_to_text(img)
-    assert "Tesseract not found" in str(exc.value)
\ No newline at end of file
+    assert "Tesseract not found" in str(exc.value)
+
+def test_text_classifier_skips_empty_frames():
+    """Blank, uniform and gradient frames are rejected; rendered dialog is not."""
+    import numpy as np
+    from dialog_whisperer.monitor import SimulatedClock, SyntheticScreen
+
+    region = (100, 500, 1180, 680)
+    dialog = SyntheticScreen(SimulatedClock(), [(0, ["Hello there, traveler."])]).capture(region)
+    empty_box = SyntheticScreen(SimulatedClock(), [(0, [])]).capture(region)
+    gradient = Image.fromarray(np.tile(np.linspace(0, 255, 1080).astype(np.uint8), (180, 1)))
+    classifier = ocr.TextClassifier()
+    assert classifier.likely_has_text(dialog)
+    assert not any(classifier.likely_has_text(img) for img in
+                   (empty_box, gradient, Image.new('RGB', (400, 100), (20, 20, 40))))
+
+def test_tile_images_offsets():
+    """Crops are stacked with gaps and dark crops are inverted."""
+    from dialog_whisperer import ocr_backends
+    crops = [Image.new('RGB', (50, 10), 'black'), Image.new('RGB', (80, 20), 'white')]
+    tiled, offsets = ocr_backends.tile_images(crops, gap=5)
+    assert tiled.size == (90, 45)
+    assert offsets == [(5, 15), (20, 40)]
+    assert tiled.getpixel((10, 10)) == 255  # black crop inverted to white
+
+def test_images_to_text_single_process(monkeypatch):
+    """Several crops are recognized with one image_to_data call and split back."""
+    import sys
+    import types
+
+    calls = []
+    def image_to_data(img, output_type=None):
+        calls.append(img.size)
+        # The white crop is skipped, so tiles span rows (24, 54), (78, 108), (132, 162)
+        return {
+            "text": ["Alice", "Hello", "there", "", "Bye"],
+            "top": [30, 80, 80, 0, 140],
+            "height": [10, 10, 10, 0, 10],
+            "block_num": [1, 2, 2, 2, 3],
+            "par_num": [1, 1, 1, 1, 1],
+            "line_num": [1, 1, 1, 1, 1],
+        }
+    fake = types.ModuleType("pytesseract")
+    fake.pytesseract = types.SimpleNamespace(tesseract_cmd=None)
+    fake.Output = types.SimpleNamespace(DICT="dict")
+    fake.image_to_data = image_to_data
+    monkeypatch.setitem(sys.modules, "pytesseract", fake)
+
+    def text_crop():
+        # Dark crop with a bright stroke, so the text classifier lets it through
+        img = Image.new('RGB', (100, 30), 'black')
+        img.paste((255, 255, 255), (10, 10, 60, 20))
+        return img
+    crops = [text_crop(), Image.new('RGB', (100, 30), 'white'), text_crop(), text_crop()]
+    texts = ocr.images_to_text(crops, backend="pytesseract")
+    assert len(calls) == 1
+    assert texts == ["Alice", "", "Hello there", "Bye"]
+
+def make_data(words):
+    """image_to_data style dict from (text, conf, line) tuples."""
+    return {
+        "text": [w[0] for w in words],
+        "conf": [w[1] for w in words],
+        "left": [10 * i for i in range(len(words))],
+        "top": [0] * len(words),
+        "width": [8] * len(words),
+        "height": [12] * len(words),
+        "block_num": [1] * len(words),
+        "par_num": [1] * len(words),
+        "line_num": [w[2] for w in words],
+    }
+
+def test_ocr_result_from_data():
+    """Results keep word confidences, boxes and line structure."""
+    result = ocr.OCRResult.from_data(make_data([("", -1, 1), ("Hello", 90, 1), ("world", 80, 1), ("Bye", 70, 2)]))
+    assert result.text == "Hello world\nBye"
+    assert [w.conf for w in result.words] == [90, 80, 70]
+    assert result.words[1].left == 20
+    assert round(result.mean_confidence, 1) == 81.5
+
+def test_confidence_gate():
+    """Low-confidence frames are rejected and garbage words are filtered."""
+    gate = ocr.ConfidenceGate(min_confidence=60, min_word_confidence=30)
+    good = ocr.OCRResult.from_data(make_data([("Hello", 95, 1), ("~", 10, 1), ("friend", 90, 1)]))
+    garbage = ocr.OCRResult.from_data(make_data([("l1|", 20, 1), ("_-", 15, 1), ("word", 70, 1)]))
+    assert gate.accepts(good)
+    assert gate.text(good) == "Hello friend"
+    assert not gate.accepts(garbage)
+    assert gate.accepts(ocr.OCRResult())
+    assert gate.accepts(ocr.OCRResult(text="no confidences"))
+
+def test_band_reader_reads_only_changed_lines(monkeypatch):
+    """Unchanged lines come from the previous result; changed ones are OCR'd again."""
+    from dialog_whisperer import ocr_backends
+
+    class WidthBackend(ocr_backends.OCRBackend):
+        """'Reads' a band as the width of its white bar."""
+        name = "width"
+        persistent = True
+        crops = []
+
+        def image_to_result(self, img):
+            WidthBackend.crops.append(img.size)
+            bbox = img.convert('L').point(lambda v: 255 if v > 128 else 0).getbbox()
+            word = ocr.OCRWord(str(bbox[2] - bbox[0]), 90.0, bbox[0], bbox[1], 1, 1, 1)
+            return ocr.OCRResult([word])
+
+    monkeypatch.setitem(ocr_backends._BACKENDS, "width", WidthBackend)
+    try:
+        reader = ocr.BandReader(backend="width")
+        assert reader.read(draw_lines([120, 200, 80])).text == "118\n202\n82"
+        assert len(WidthBackend.crops) == 3
+
+        result = reader.read(draw_lines([120, 150, 80]))
+        assert result.text == "118\n148\n82"
+        assert len(WidthBackend.crops) == 4
+
+        # Lines scrolling to another band position are found by content
+        assert reader.read(draw_lines([200, 80, 150])).text == "202\n82\n148"
+        assert len(WidthBackend.crops) == 4
+        assert reader.bands_read == 4
+    finally:
+        ocr_backends.close_backends()
+
+def test_band_reader_does_not_tile_under_single_line_psm(monkeypatch):
+    """With PSM 7 every changed band goes to the engine on its own."""
+    from dialog_whisperer import ocr_backends
+
+    class BatchBackend(ocr_backends.OCRBackend):
+        name = "batch"
+        persistent = True
+        batches = []
+
+        def images_to_results(self, images, config=None):
+            BatchBackend.batches.append((len(images), config.psm if config else None))
+            return [ocr.OCRResult(text="line") for _ in images]
+
+    monkeypatch.setitem(ocr_backends._BACKENDS, "batch", BatchBackend)
+    try:
+        ocr.BandReader(backend="batch", config=ocr_backends.OCRConfig(psm=6)).read(draw_lines([120, 200, 80]))
+        assert BatchBackend.batches == [(3, 6)]
+        BatchBackend.batches.clear()
+        ocr.BandReader(backend="batch", config=ocr_backends.OCRConfig(psm=7)).read(draw_lines([120, 200, 80]))
+        assert BatchBackend.batches == [(1, 7)] * 3
+    finally:
+        ocr_backends.close_backends()
@@ -0,0 +1,146 @@
+"""Test OCR backend selection and benchmarking."""
+
+import pytest
+from PIL import Image
+from dialog_whisperer import ocr, ocr_backends
+
+class EchoBackend(ocr_backends.OCRBackend):
+    """Returns the image's info text so results are predictable."""
+    name = "echo"
+    persistent = True
+    created = 0
+
+    def __init__(self):
+        EchoBackend.created += 1
+
+    def image_to_text(self, pil_image):
+        return pil_image.info.get("text", "")
+
+@pytest.fixture
+def echo_backend(monkeypatch):
+    monkeypatch.setitem(ocr_backends._BACKENDS, "echo", EchoBackend)
+    yield EchoBackend
+    ocr_backends.close_backends()
+
+def make_image(text):
+    img = Image.new('RGB', (100, 30), 'black')
+    img.paste((255, 255, 255), (10, 10, 60, 20))  # a stroke, so the frame is not skipped as blank
+    img.info["text"] = text
+    return img
+
+def test_registry_lists_builtin_backends():
+    """Both built-in backends are registered."""
+    names = ocr_backends.available_backends()
+    assert "pytesseract" in names
+    assert "tesserocr" in names
+
+def test_backend_selected_by_env(monkeypatch, tmp_path, echo_backend):
+    """DIALOG_WHISPER_OCR_BACKEND picks the engine and persistent engines are reused."""
+    monkeypatch.setenv("DIALOG_WHISPER_OCR_BACKEND", "echo")
+    monkeypatch.chdir(tmp_path)
+    assert ocr.image_to_text(make_image("hello")) == "hello"
+    assert ocr.image_to_text(make_image("again")) == "again"
+    assert echo_backend.created == 1
+
+def test_unknown_backend_falls_back(monkeypatch):
+    """An unknown backend name falls back to pytesseract like the TTS switch does."""
+    monkeypatch.setenv("DIALOG_WHISPER_OCR_BACKEND", "nope")
+    assert isinstance(ocr_backends.get_backend(), ocr_backends.PytesseractBackend)
+
+def test_benchmark_reports_speed_and_accuracy(echo_backend):
+    """The harness scores each backend against ground truth."""
+    images = [make_image("Hello there"), make_image("General")]
+    results = ocr_backends.benchmark(images, ["Hello there", "General Kenobi"], backends=["echo", "missing"])
+    assert results["echo"]["ms_per_image"] >= 0
+    assert 0.5 < results["echo"]["accuracy"] < 1.0
+    assert results["missing"]["error"]
+
+def test_benchmark_reads_images_one_at_a_time(monkeypatch):
+    """Rows time single-image calls; batched calls only appear as a labeled tiled row."""
+    batches = []
+
+    class BatchEcho(EchoBackend):
+        def images_to_text(self, images, config=None):
+            batches.append(len(images))
+            return [img.info.get("text", "") for img in images]
+
+    monkeypatch.setitem(ocr_backends._BACKENDS, "batchecho", BatchEcho)
+    images = [make_image("line %d" % i) for i in range(5)]
+    expected = ["line %d" % i for i in range(5)]
+    results = ocr_backends.benchmark(images, expected, backends=["batchecho"])
+    assert list(results) == ["batchecho"] and batches == []
+    results = ocr_backends.benchmark(images, expected, backends=["batchecho"], tiled=True, tile_batch=2)
+    assert list(results) == ["batchecho", "batchecho (tiled)"]
+    assert batches == [2, 2, 1]
+    assert results["batchecho (tiled)"]["accuracy"] == results["batchecho"]["accuracy"] == 1.0
+
+def test_text_accuracy_ignores_layout():
+    """Case and whitespace differences do not count as errors."""
+    assert ocr_backends.text_accuracy("Hello  World\n", "hello world") == 1.0
+
+def test_pytesseract_gets_region_config(monkeypatch):
+    """Languages and PSM/whitelist/DPI reach tesseract; no config means no extra args."""
+    import shlex
+    import sys
+    import types
+
+    calls = []
+    fake = types.ModuleType("pytesseract")
+    fake.pytesseract = types.SimpleNamespace(tesseract_cmd=None)
+    fake.image_to_string = lambda img, **kwargs: calls.append(kwargs) or "ok"
+    monkeypatch.setitem(sys.modules, "pytesseract", fake)
+
+    backend = ocr_backends.PytesseractBackend()
+    config = ocr_backends.OCRConfig.from_dict({"lang": ["eng", "jpn"], "psm": "7",
+                                               "whitelist": "AB C'", "dpi": 300, "backend": "x"})
+    backend.image_to_text(make_image(""), config=config)
+    backend.image_to_text(make_image(""))
+    assert calls[0]["lang"] == "eng+jpn"
+    assert shlex.split(calls[0]["config"]) == ["--psm", "7", "--dpi", "300", "-c", "tessedit_char_whitelist=AB C'"]
+    assert calls[1] == {}
+
+def test_tesserocr_loads_languages_lazily(monkeypatch):
+    """One engine per language set, created on first use; settings change only when needed."""
+    import sys
+    import types
+
+    class FakeAPI:
+        created = []
+
+        def __init__(self, lang="eng"):
+            self.lang = lang
+            self.calls = []
+            FakeAPI.created.append(lang)
+
+        def SetPageSegMode(self, psm):
+            self.calls.append(("psm", psm))
+
+        def SetVariable(self, name, value):
+            self.calls.append((name, value))
+
+        def SetImage(self, img):
+            pass
+
+        def GetUTF8Text(self):
+            return self.lang
+
+        def End(self):
+            pass
+
+    fake = types.ModuleType("tesserocr")
+    fake.PyTessBaseAPI = FakeAPI
+    fake.PSM = types.SimpleNamespace(AUTO=3)
+    fake.get_languages = lambda: ("/usr/share/tessdata", ["eng", "jpn", "osd"])
+    monkeypatch.setitem(sys.modules, "tesserocr", fake)
+
+    backend = ocr_backends.TesserocrBackend()
+    assert FakeAPI.created == []  # nothing loads until a language is used
+    block = ocr_backends.OCRConfig(psm=6)
+    assert backend.images_to_text([make_image("")] * 2, config=block) == ["eng", "eng"]
+    assert backend.image_to_text(make_image(""), config=block) == "eng"
+    assert backend._apis["eng"].calls.count(("psm", 6)) == 1
+    assert backend.image_to_text(make_image(""), config=ocr_backends.OCRConfig(lang="eng+jpn")) == "eng+jpn"
+    assert FakeAPI.created == ["eng", "eng+jpn"]
+    with pytest.raises(ValueError):
+        backend.image_to_text(make_image(""), config=ocr_backends.OCRConfig(lang="kor"))
+    backend.close()
@@ -0,0 +1,245 @@
+"""Test preemptible speech playback."""
+
+import threading
+import time
+from dialog_whisperer.playback import PlaybackController
+
+class FakeSpeaker:
+    """Blocks in speak() until stop() is called or the line is released."""
+    def __init__(self):
+        self.spoken = []
+        self.interrupted = []
+        self.started = threading.Event()
+        self._stop = threading.Event()
+
+    def speak(self, text):
+        self._stop.clear()
+        self.spoken.append(text)
+        self.started.set()
+        if self._stop.wait(2):
+            self.interrupted.append(text)
+
+    def stop(self):
+        self._stop.set()
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+def test_newest_line_preempts_current():
+    """A new line interrupts the current one and stale pending lines are dropped."""
+    speaker = FakeSpeaker()
+    pc = PlaybackController(speaker.speak, speaker.stop)
+    pc.start()
+    pc.submit("one")
+    assert speaker.started.wait(1)
+    pc.clear()
+    # Queue two lines atomically relative to the worker
+    with pc._cond:
+        pc.submit("two")
+        pc.submit("three")
+    assert wait_for(lambda: "three" in speaker.spoken)
+    assert speaker.interrupted[0] == "one"
+    assert "two" not in speaker.spoken
+    assert pc.dropped == 1
+    pc.shutdown()
+
+def test_in_order_mode_keeps_every_line():
+    """Without preemption lines are spoken in submission order."""
+    spoken = []
+    pc = PlaybackController(spoken.append, lambda: None, preempt=False)
+    for text in ["a", "b", "c"]:
+        pc.submit(text)
+    pc.start()
+    assert wait_for(lambda: len(spoken) == 3)
+    assert spoken == ["a", "b", "c"]
+    pc.shutdown()
+
+def test_priority_and_max_age():
+    """Higher priority lines go first and expired lines are skipped."""
+    spoken = []
+    pc = PlaybackController(spoken.append, lambda: None, preempt=False, max_age=0.05)
+    pc.submit("old")
+    time.sleep(0.1)
+    pc.submit("normal")
+    pc.submit("urgent", priority=1)
+    pc.start()
+    assert wait_for(lambda: len(spoken) == 2)
+    assert spoken == ["urgent", "normal"]
+    assert pc.dropped == 1
+    pc.shutdown()
+
+def test_shutdown_is_immediate():
+    """Shutdown interrupts the current utterance instead of waiting for it."""
+    speaker = FakeSpeaker()
+    pc = PlaybackController(speaker.speak, speaker.stop)
+    pc.start()
+    pc.submit("long line")
+    assert speaker.started.wait(1)
+    start = time.monotonic()
+    pc.shutdown()
+    assert time.monotonic() - start < 0.5
+    assert speaker.interrupted == ["long line"]
+
+def test_on_line_reports_latency_and_drops():
+    """Each line is reported once: with its latency, or None if dropped."""
+    reported = []
+    spoken = []
+    pc = PlaybackController(spoken.append, lambda: None, on_line=lambda t, m, lat: reported.append((t, m, lat)))
+    pc.submit("stale", meta={"n": 1})
+    pc.submit("fresh", meta={"n": 2})
+    pc.start()
+    assert wait_for(lambda: len(reported) == 2)
+    assert reported[0] == ("stale", {"n": 1}, None)
+    assert reported[1][:2] == ("fresh", {"n": 2})
+    assert reported[1][2] >= 0
+    pc.shutdown()
+
+def test_latency_runs_until_audio_starts():
+    """With report_start, latency covers synthesis; a line that never starts reports None."""
+    reported = []
+
+    def speak(text, on_start):
+        time.sleep(0.05)  # synthesis
+        if text != "silent":
+            on_start()
+
+    pc = PlaybackController(speak, lambda: None, preempt=False, report_start=True,
+                            on_line=lambda t, m, lat: reported.append((t, lat)))
+    pc.start()
+    pc.submit("spoken")
+    pc.submit("silent")
+    assert wait_for(lambda: len(reported) == 2)
+    assert reported[0][0] == "spoken" and reported[0][1] >= 0.05
+    assert reported[1] == ("silent", None)
+    pc.shutdown()
+
+def test_adaptive_rate_speeds_up_under_backlog():
+    """Rate rises smoothly with the backlog, caps at max_speed and relaxes when idle."""
+    from dialog_whisperer.playback import AdaptiveRate
+    rc = AdaptiveRate(base_rate=200, max_speed=1.5, target_lag=5.0, smoothing=0.5)
+    assert rc.next_rate(0, now=0.0) == 200
+
+    # 20 s of speech waiting at normal speed
+    backlog = int(rc.chars_per_second() * 20)
+    first = rc.next_rate(backlog, now=1.0)
+    second = rc.next_rate(backlog, now=2.0)
+    assert 200 < first < second <= 300
+    for t in range(3, 10):
+        rate = rc.next_rate(backlog, now=float(t))
+    assert rate == 300
+
+    for t in range(100, 110):
+        rate = rc.next_rate(0, now=float(t))
+    assert rate == 200
+
+def test_rate_control_passes_rate_and_skips():
+    """With rate control the speaker gets a rate, and hopeless backlogs are skipped."""
+    from dialog_whisperer.playback import AdaptiveRate
+    calls = []
+    release = threading.Event()
+    def speak(text, rate=None):
+        calls.append((text, rate))
+        release.wait(2)
+
+    rc = AdaptiveRate(target_lag=1.0, skip=True, smoothing=1.0)
+    pc = PlaybackController(speak, lambda: None, preempt=False, rate_control=rc)
+    pc.start()
+    pc.submit("first")
+    assert wait_for(lambda: calls)
+    with pc._cond:
+        for i in range(5):
+            pc.submit("x" * 40 + str(i))
+    release.set()
+    assert wait_for(lambda: pc.pending() == 0 and not pc.speaking)
+    spoken = [text for text, _ in calls]
+    assert spoken[-1].endswith("4")
+    assert pc.dropped > 0 and len(spoken) < 6
+    assert calls[-1][1] >= 200
+    pc.shutdown()
+
+def test_backlog_skipping_keeps_the_newest_line_in_preempt_mode():
+    """Over budget, the oldest pending lines are skipped, never the newest."""
+    from dialog_whisperer.playback import AdaptiveRate
+    spoken = []
+    rc = AdaptiveRate(target_lag=1.0, skip=True, smoothing=1.0)
+    pc = PlaybackController(lambda text, rate=None: spoken.append(text), lambda: None, rate_control=rc)
+    for i in range(3):
+        pc.submit("x" * 40 + str(i))
+    pc.start()
+    assert wait_for(lambda: pc.pending() == 0 and not pc.speaking and spoken)
+    assert spoken == ["x" * 40 + "2"]
+    pc.shutdown()
+
+def test_in_order_backlog_is_spoken_as_batches():
+    """Lines waiting behind the current one are handed to batch_fn together."""
+    speaker = FakeSpeaker()
+    batches = []
+    pc = PlaybackController(speaker.speak, speaker.stop, preempt=False,
+                            batch_fn=batches.append, max_batch=3)
+    pc.start()
+    pc.submit("one")
+    assert speaker.started.wait(1)
+    with pc._cond:
+        for text in ("two", "three", "four", "five"):
+            pc.submit(text)
+    speaker.stop()
+    assert wait_for(lambda: "five" in speaker.spoken)
+    speaker.stop()
+    assert wait_for(lambda: not pc.speaking)
+    assert batches == [["two", "three", "four"]]
+    assert speaker.spoken == ["one", "five"]
+    pc.shutdown()
+
+def test_preempted_before_start_is_not_spoken():
+    """A line interrupted after it was picked but before speak_fn ran stays silent."""
+    state = {"generation": 0}
+    played = []
+
+    def speak(text, generation):
+        if generation == state["generation"]:
+            played.append(text)
+
+    def stop():
+        state["generation"] += 1
+
+    def on_line(text, meta, latency):
+        # Runs between picking "old" and calling speak_fn for it
+        if text == "old":
+            pc.submit("new")
+
+    pc = PlaybackController(speak, stop, on_line=on_line, generation_fn=lambda: state["generation"])
+    pc.start()
+    pc.submit("old")
+    assert wait_for(lambda: played == ["new"] and not pc.speaking)
+    pc.shutdown()
+
+def test_restart_does_not_run_two_playback_threads():
+    """A thread still stuck in speak_fn after shutdown never takes lines from the new run."""
+    release = threading.Event()
+    speakers = []
+
+    def speak(text):
+        speakers.append((threading.current_thread(), text))
+        if text == "stuck":
+            release.wait(2)
+
+    pc = PlaybackController(speak, lambda: None, preempt=False)
+    pc.start()
+    pc.submit("stuck")
+    assert wait_for(lambda: speakers)
+    old = speakers[0][0]
+    pc.shutdown(timeout=0.05)
+    assert old.is_alive()
+    pc.start()
+    release.set()
+    old.join(1)
+    assert not old.is_alive()
+    for text in ["a", "b", "c"]:
+        pc.submit(text)
+    assert wait_for(lambda: len(speakers) == 4)
+    assert [text for _, text in speakers] == ["stuck", "a", "b", "c"]
+    assert old not in [thread for thread, _ in speakers[1:]]
+    pc.shutdown()
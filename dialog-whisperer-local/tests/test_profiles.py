@@ -0,0 +1,69 @@
+"""Test saving and loading per-game profiles."""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from dialog_whisperer import profiles, templates
+
+def make_ui(color):
+    img = Image.new('RGB', (200, 80), color)
+    ImageDraw.Draw(img).rectangle((10, 10, 90, 40), fill=(255, 255, 255))
+    return img
+
+def test_profile_round_trip(tmp_path):
+    """Region, settings and templates survive a save/load cycle."""
+    lib = templates.TemplateLibrary()
+    lib.add("menu", make_ui((200, 30, 30)))
+    lib.add("map", make_ui((30, 30, 200)))
+    profile = profiles.Profile("My Game: Part 2", region=(10, 20, 410, 120), templates=lib,
+                               hotkeys={"capture": "ctrl+q"}, ocr={"backend": "tesserocr"},
+                               tts={"backend": "coqui"})
+    profiles.save_profile(profile, root=str(tmp_path))
+    assert profiles.list_profiles(root=str(tmp_path)) == ["My_Game__Part_2"]
+
+    loaded = profiles.load_profile("My Game: Part 2", root=str(tmp_path))
+    assert loaded.region == (10, 20, 410, 120)
+    assert loaded.hotkeys == {"capture": "ctrl+q"}
+    assert loaded.ocr["backend"] == "tesserocr"
+    assert loaded.tts["backend"] == "coqui"
+    assert sorted(loaded.templates.names()) == ["map", "menu"]
+    menu = loaded.templates.get("menu")
+    assert menu.hash == lib.get("menu").hash
+    assert isinstance(menu.descriptor, np.memmap)
+    assert loaded.templates.match(make_ui((200, 30, 30))) == "menu"
+
+def test_resave_drops_removed_templates(tmp_path):
+    """Saving again removes arrays of templates that were deleted."""
+    lib = templates.TemplateLibrary()
+    lib.add("a", make_ui((0, 0, 0)))
+    lib.add("b", make_ui((0, 200, 0)))
+    profiles.save_profile(profiles.Profile("game", templates=lib), root=str(tmp_path))
+    lib.remove("a")
+    profiles.save_profile(profiles.Profile("game", templates=lib), root=str(tmp_path))
+    assert sorted(p.name for p in (tmp_path / "game").iterdir()) == ["data-2", "profile.json"]
+    assert [p.name for p in (tmp_path / "game" / "data-2" / "templates").iterdir()] == ["0.npy"]
+    assert profiles.load_profile("game", root=str(tmp_path)).templates.names() == ["b"]
+
+    # Removing every template leaves no descriptors behind
+    lib.clear()
+    profiles.save_profile(profiles.Profile("game", templates=lib), root=str(tmp_path))
+    assert sorted(p.name for p in (tmp_path / "game").rglob("*")) == ["data-3", "profile.json", "templates"]
+    assert profiles.load_profile("game", root=str(tmp_path)).templates.names() == []
+
+def test_interrupted_save_keeps_previous_profile(tmp_path, monkeypatch):
+    """A save that fails while writing arrays leaves the last complete profile loadable."""
+    lib = templates.TemplateLibrary()
+    lib.add("a", make_ui((0, 0, 0)))
+    profiles.save_profile(profiles.Profile("game", region=(0, 0, 10, 10), templates=lib), root=str(tmp_path))
+    lib.add("b", make_ui((0, 200, 0)))
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(np, "save", crash)
+    with pytest.raises(OSError):
+        profiles.save_profile(profiles.Profile("game", region=(5, 5, 50, 50), templates=lib), root=str(tmp_path))
+    monkeypatch.undo()
+    loaded = profiles.load_profile("game", root=str(tmp_path))
+    assert loaded.region == (0, 0, 10, 10)
+    assert loaded.templates.names() == ["a"]
+    assert loaded.templates.match(make_ui((0, 0, 0))) == "a"
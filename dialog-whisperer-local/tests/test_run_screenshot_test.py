@@ -0,0 +1,54 @@
+"""Test the batch mode of the screenshot OCR script."""
+
+import csv
+import json
+import os
+from dialog_whisperer import ocr_backends
+from scripts import run_screenshot_test as script
+from tests.helpers import draw_lines
+
+class LineCountBackend(ocr_backends.OCRBackend):
+    """'Reads' an image as one word per white bar, so results follow the file."""
+    name = "lines"
+
+    def image_to_text(self, pil_image, config=None):
+        gray = pil_image.convert('L')
+        rows = [y for y in range(10, gray.height, 30) if gray.getpixel((12, y + 5)) > 128]
+        return " ".join("line" for _ in rows)
+
+def make_batch(tmp_path):
+    draw_lines([120, 200]).save(tmp_path / "b.png")
+    draw_lines([120, 200, 80]).save(tmp_path / "a.png")
+    (tmp_path / "a.txt").write_text("line line line", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("not an image", encoding="utf-8")
+    return [str(tmp_path / "a.png"), str(tmp_path / "b.png")]
+
+def test_find_images_and_truth_path(tmp_path):
+    """Only image files are picked up, sorted; truth files sit next to them or in truth_dir."""
+    paths = make_batch(tmp_path)
+    assert script.find_images(str(tmp_path)) == paths
+    assert script.find_images(str(tmp_path / "*.png")) == paths
+    assert script.truth_path(paths[0]) == str(tmp_path / "a.txt")
+    assert script.truth_path(paths[0], truth_dir="truth") == os.path.join("truth", "a.txt")
+
+def test_run_batch_scores_and_writes_results(tmp_path, monkeypatch):
+    """Rows keep the input order, carry accuracy when ground truth exists, and export to CSV and JSONL."""
+    monkeypatch.setitem(ocr_backends._BACKENDS, "lines", LineCountBackend)
+    paths = make_batch(tmp_path)
+    rows = script.run_batch(list(reversed(paths)), workers=1, backend="lines")
+    assert [r['path'] for r in rows] == list(reversed(paths))
+    b, a = rows
+    assert a['text'] == "line line line" and a['accuracy'] == 1.0 and a['error'] is None
+    assert b['text'] == "line line" and b['accuracy'] is None
+    assert a['ocr_ms'] is not None and a['preprocess_ms'] is not None
+
+    script.write_results(rows, str(tmp_path / "out.csv"))
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        table = list(csv.DictReader(f))
+    assert [r['path'] for r in table] == list(reversed(paths))
+    assert list(table[0]) == script.FIELDS
+    assert table[1]['accuracy'] == "1.0"
+
+    script.write_results(rows, str(tmp_path / "out.jsonl"))
+    lines = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert lines == rows
@@ -0,0 +1,83 @@
+"""Test the UI template library."""
+
+import random
+from PIL import Image, ImageDraw
+from dialog_whisperer import templates
+
+def make_ui(seed, size=(320, 120)):
+    """Random blocky 'UI screen' that is stable for a given seed."""
+    rng = random.Random(seed)
+    img = Image.new('RGB', size, (rng.randrange(256), 0, 0))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle((x, y, x + rng.randrange(20, 120), y + rng.randrange(10, 60)), fill=color)
+    return img
+
+def test_dhash_is_stable_under_small_changes():
+    """A small edit moves the hash only a few bits."""
+    ui = make_ui(1)
+    edited = ui.copy()
+    ImageDraw.Draw(edited).rectangle((5, 5, 15, 10), fill=(255, 255, 255))
+    assert templates.hamming(templates.dhash(ui), templates.dhash(edited)) <= 6
+    assert templates.hamming(templates.dhash(ui), templates.dhash(make_ui(2))) > 12
+
+def test_bktree_search_matches_linear_scan():
+    """BK-tree lookup returns exactly the keys within the radius."""
+    rng = random.Random(0)
+    keys = [rng.getrandbits(64) for _ in range(300)]
+    tree = templates.BKTree()
+    for i, k in enumerate(keys):
+        tree.add(k, i)
+    query = keys[5] ^ 0b1011
+    expected = sorted(i for i, k in enumerate(keys) if templates.hamming(k, query) <= 20)
+    assert sorted(v for _, v in tree.search(query, 20)) == expected
+
+def test_library_matches_any_template():
+    """Each stored UI state is recognized and other frames are not."""
+    lib = templates.TemplateLibrary()
+    for seed in range(20):
+        lib.add(f"ui-{seed}", make_ui(seed))
+    assert len(lib) == 20
+    assert lib.match(make_ui(7)) == "ui-7"
+    assert lib.match(make_ui(99)) is None
+    assert lib.match(Image.new('RGB', (320, 120), 'black')) is None
+
+    lib.remove("ui-7")
+    assert lib.match(make_ui(7)) is None
+    assert lib.match(make_ui(8)) == "ui-8"
+
+def test_library_can_change_while_matching():
+    """Adding and removing templates on one thread never breaks match() on another."""
+    import threading
+    lib = templates.TemplateLibrary()
+    lib.add("stay", make_ui(1))
+    frame = make_ui(1)
+    changing = [make_ui(seed) for seed in range(2, 6)]
+    done = threading.Event()
+    errors = []
+
+    def edit():
+        try:
+            for _ in range(50):
+                for seed, img in enumerate(changing):
+                    lib.add(f"ui-{seed}", img)
+                lib.clear()
+                lib.add("stay", frame)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=edit)
+    thread.start()
+    while not done.is_set():
+        try:
+            assert lib.match(frame) in ("stay", None)
+        except Exception as e:
+            errors.append(e)
+            break
+    thread.join()
+    assert errors == []
+    assert lib.match(frame) == "stay"
@@ -0,0 +1,106 @@
+"""Test dialog box tracking."""
+
+import random
+import numpy as np
+from PIL import Image, ImageDraw
+from dialog_whisperer import tracker
+
+def make_screen(box_pos, size=(800, 600), text="Hello"):
+    """Noisy desktop with a framed dialog box (240x80) at box_pos."""
+    rng = random.Random(0)
+    screen = Image.new('RGB', size, (60, 90, 60))
+    draw = ImageDraw.Draw(screen)
+    for _ in range(40):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.rectangle((x, y, x + rng.randrange(10, 80), y + rng.randrange(10, 80)),
+                       fill=tuple(rng.randrange(256) for _ in range(3)))
+    x, y = box_pos
+    draw.rectangle((x, y, x + 239, y + 79), fill=(20, 20, 60), outline=(230, 200, 90), width=4)
+    draw.rectangle((x + 8, y + 8, x + 60, y + 20), fill=(230, 200, 90))
+    draw.text((x + 20, y + 40), text, fill=(255, 255, 255))
+    return screen
+
+def test_match_template_finds_exact_position():
+    """NCC peaks at the template's location."""
+    rng = np.random.default_rng(0)
+    image = rng.random((60, 80))
+    template = image[20:35, 30:52].copy()
+    scores = tracker.match_template(image, template)
+    assert np.unravel_index(np.argmax(scores), scores.shape) == (20, 30)
+    assert abs(scores[20, 30] - 1.0) < 1e-6
+
+def test_tracker_follows_moved_box():
+    """When the box moves, the tracker finds its new bbox."""
+    start = make_screen((100, 120))
+    bbox = (100, 120, 340, 200)
+    t = tracker.RegionTracker(start.crop(bbox), bbox)
+
+    # Same place, different text: no search needed
+    same = make_screen((100, 120), text="Another line")
+    assert t.follow(same.crop(bbox), lambda: (same, (0, 0))) is None
+    assert t.searches == 0
+
+    moved = make_screen((413, 307), text="Moved")
+    new_bbox = t.follow(moved.crop(bbox), lambda: (moved, (0, 0)))
+    assert new_bbox == (413, 307, 653, 387)
+    assert t.bbox == new_bbox
+
+def test_tracker_applies_origin():
+    """Locations are reported in screen coordinates."""
+    screen = make_screen((50, 60))
+    bbox = (50, 60, 290, 140)
+    t = tracker.RegionTracker(screen.crop(bbox), bbox)
+    found, score = t.locate(screen, origin=(-1920, 0))
+    assert found == (-1870, 60, -1630, 140)
+    assert score > 0.9
+
+def test_tracker_reports_logical_coordinates_under_dpi_scaling():
+    """With 1.5 physical pixels per logical pixel, a moved box is reported in logical units."""
+    from dialog_whisperer import capture
+    bbox = (100, 120, 260, 174)
+    physical = capture.to_physical(bbox, 1.5)
+    start = make_screen(physical[:2])
+    t = tracker.RegionTracker(start.crop(physical), bbox, pixel_scale=1.5)
+
+    moved = make_screen((450, 300), text="Moved")
+    new_bbox = t.follow(moved.crop(physical), lambda: (moved, (0, 0)))
+    assert new_bbox == (300, 200, 460, 254)
+    # Capturing the new bbox gives a frame of the template's size, at the box
+    new_physical = capture.to_physical(new_bbox, 1.5)
+    assert new_physical[:2] == (450, 300)
+    assert moved.crop(new_physical).size == t.template.size
+    assert t.still_there(moved.crop(new_physical))
+
+def test_failed_search_waits_on_the_given_clock():
+    """A box that cannot be found is searched for again only after retry_interval."""
+    start = make_screen((100, 120))
+    bbox = (100, 120, 340, 200)
+    t = tracker.RegionTracker(start.crop(bbox), bbox, retry_interval=2.0)
+    blank = Image.new('RGB', (800, 600), (60, 90, 60))
+    grab = lambda: (blank, (0, 0))
+    assert t.follow(blank.crop(bbox), grab, now=1000.0) is None
+    assert t.follow(blank.crop(bbox), grab, now=1001.5) is None
+    assert t.searches == 1
+    assert t.follow(blank.crop(bbox), grab, now=1002.0) is None
+    assert t.searches == 2
+
+def test_new_dialog_text_does_not_trigger_a_search():
+    """Only the box chrome is checked, so a new line at the same place costs no screen search."""
+    from dialog_whisperer.monitor import SimulatedClock, SyntheticScreen
+    box = (100, 500, 1180, 680)
+    moved_box = (60, 40, 1140, 220)
+    clock = SimulatedClock()
+    screen = SyntheticScreen(clock, [(0, ["Hello there!"]), (1, ["A much longer line of new dialog."]),
+                                     (2, ["Hello there!"], moved_box), (3, ["And more text."], moved_box)])
+    t = tracker.RegionTracker(screen.capture(box), box)
+    clock.advance(1)
+    assert t.follow(screen.capture(box), lambda: screen.grab_monitor(box), now=1) is None
+    assert t.searches == 0
+
+    clock.advance(1)
+    new_bbox = t.follow(screen.capture(box), lambda: screen.grab_monitor(box), now=2)
+    assert new_bbox == moved_box
+    assert t.searches == 1
+    clock.advance(1)
+    assert t.follow(screen.capture(new_bbox), lambda: screen.grab_monitor(new_bbox), now=3) is None
+    assert t.searches == 1
@@ -0,0 +1,48 @@
+"""Test the dialog transcript store."""
+
+import json
+from dialog_whisperer.transcript import TranscriptStore
+
+def test_log_search_and_export(tmp_path):
+    """Logged lines are searchable and exportable with their details."""
+    store = TranscriptStore(str(tmp_path / "t.db"))
+    store.start()
+    store.log("Welcome to the castle, traveler.", region=(0, 0, 400, 100), confidence=91.5, tts_latency=0.2)
+    store.log("The gate is sealed.", confidence=80.0)
+    store.log("Find the castle key!", tts_latency=None)
+    store.flush()
+
+    assert [e["text"] for e in store.recent(2)] == ["Find the castle key!", "The gate is sealed."]
+    hits = store.search("castle")
+    assert [e["text"] for e in hits] == ["Find the castle key!", "Welcome to the castle, traveler."]
+    assert hits[1]["region"] == (0, 0, 400, 100)
+    assert hits[1]["confidence"] == 91.5
+    assert store.search('key!" OR') == []  # query syntax is treated as plain words
+
+    out = tmp_path / "t.jsonl"
+    assert store.export(str(out)) == 3
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert lines[0]["tts_latency"] == 0.2
+    store.close()
+
+def test_reopen_keeps_entries(tmp_path):
+    """The log is persistent across store instances."""
+    path = str(tmp_path / "t.db")
+    store = TranscriptStore(path)
+    store.start()
+    store.log("first")
+    store.close()
+    store = TranscriptStore(path)
+    assert [e["text"] for e in store.search("first")] == ["first"]
+    assert store.export(str(tmp_path / "t.csv")) == 1
+
+def test_flush_gives_up_after_timeout(tmp_path):
+    """A stalled writer cannot block flush() past its timeout."""
+    import threading
+    store = TranscriptStore(str(tmp_path / "t.db"))
+    release = threading.Event()
+    store._run = release.wait
+    store.start()
+    store.log("stuck")
+    assert store.flush(timeout=0.05) is False
+    release.set()
@@ -33,4 +33,144 @@ def test_tts_backend_env_var(monkeypatch):
 
     monkeypatch.setattr(builtins, '__import__', mock_import)
     with pytest.raises(ImportError):
-        tts.speak("test")
\ No newline at end of file
+        tts.speak("test")
+
+class FakeEngine:
+    """Minimal pyttsx3 engine that finishes an utterance on the next iterate()."""
+    def __init__(self):
+        self.threads = set()
+        self.props = []
+        self.queued = []
+        self.callbacks = {}
+
+    def _record(self):
+        import threading
+        self.threads.add(threading.get_ident())
+
+    def connect(self, topic, cb):
+        self.callbacks[topic] = cb
+
+    def startLoop(self, use_driver_loop):
+        self._record()
+        assert use_driver_loop is False
+
+    def endLoop(self):
+        self._record()
+
+    def setProperty(self, name, value):
+        self._record()
+        self.props.append((name, value))
+
+    def say(self, text, name=None):
+        self._record()
+        if text != "hang":
+            self.queued.append(name)
+
+    def iterate(self):
+        self._record()
+        while self.queued:
+            name = self.queued.pop(0)
+            self.callbacks["started-utterance"](name)
+            self.callbacks["finished-utterance"](name, True)
+
+    def stop(self):
+        self._record()
+        self.queued.clear()
+
+@pytest.fixture
+def fake_pyttsx3(monkeypatch):
+    import sys
+    import types
+    engine = FakeEngine()
+    module = types.ModuleType("pyttsx3")
+    module.init = lambda: engine
+    monkeypatch.setitem(sys.modules, "pyttsx3", module)
+    monkeypatch.delenv("DIALOG_WHISPER_TTS_BACKEND", raising=False)
+    yield engine
+    tts.cleanup()
+
+def test_on_start_runs_when_the_first_utterance_starts(fake_pyttsx3):
+    """The start callback fires once per call, on the engine thread."""
+    import threading
+    starts = []
+    tts.speak("one", on_start=lambda: starts.append(threading.get_ident()))
+    tts.speak_many(["two", "three"], on_start=lambda: starts.append(threading.get_ident()))
+    assert len(starts) == 2
+    assert set(starts) == fake_pyttsx3.threads
+
+def test_tts_service_single_thread(fake_pyttsx3):
+    """All engine calls run on one thread and unchanged properties are not reset."""
+    import threading
+    tts.speak("one", rate=180)
+    tts.speak("two", rate=180)
+    tts.speak("three", rate=200)
+    assert fake_pyttsx3.props == [("rate", 180), ("rate", 200)]
+    assert len(fake_pyttsx3.threads) == 1
+    assert threading.get_ident() not in fake_pyttsx3.threads
+
+def test_tts_service_stop_releases_speaker(fake_pyttsx3):
+    """stop() from another thread ends a blocked speak() call."""
+    import threading
+    t = threading.Thread(target=tts.speak, args=("hang",))
+    t.start()
+    t.join(0.1)
+    assert t.is_alive()
+    tts.stop()
+    t.join(1)
+    assert not t.is_alive()
+
+def test_engine_rate_returns_to_normal_after_backlog(fake_pyttsx3):
+    """Once a backlog drains, the next line is spoken at the base rate again."""
+    import time
+    from dialog_whisperer.playback import AdaptiveRate, PlaybackController
+    rc = AdaptiveRate(target_lag=1.0, window=0.2, smoothing=1.0)
+    pc = PlaybackController(tts.speak, tts.stop, preempt=False, rate_control=rc)
+    with pc._cond:
+        for i in range(3):
+            pc.submit("a rather long line of queued dialog number %d" % i)
+    pc.start()
+    deadline = time.time() + 5
+    while (pc.pending() or pc.speaking) and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.3)  # let the arrivals age out of the rate window
+    pc.submit("done")
+    deadline = time.time() + 5
+    while (pc.pending() or pc.speaking) and time.time() < deadline:
+        time.sleep(0.01)
+    pc.shutdown()
+    rates = [value for name, value in fake_pyttsx3.props if name == "rate"]
+    assert rates[0] > 200
+    assert rates[-1] == 200
+
+def test_stale_generation_is_not_spoken(fake_pyttsx3):
+    """A line whose generation token predates a stop() returns without reaching the engine."""
+    import threading
+    tts.speak("warm up")
+    token = tts.current_generation()
+    tts.stop()
+    t = threading.Thread(target=tts.speak, args=("hang",), kwargs={"generation": token})
+    t.start()
+    t.join(1)
+    assert not t.is_alive()
+
+def test_speak_returns_after_shutdown(fake_pyttsx3):
+    """speak() never blocks once the service is shut down, even mid-utterance."""
+    import threading
+    service = tts._get_engine()
+    t = threading.Thread(target=service.speak, args=("hang",))
+    t.start()
+    t.join(0.1)
+    assert t.is_alive()
+    service.shutdown()
+    t.join(2)
+    assert not t.is_alive()
+    service.speak("after shutdown")  # returns at once
+
+def test_dead_engine_thread_is_replaced(fake_pyttsx3):
+    """If the engine thread exits on its own, the next speak() starts a new service."""
+    service = tts._get_engine()
+    service._commands.put(("quit",))  # the thread ends without shutdown()
+    service._thread.join(2)
+    assert not service.running
+    tts.speak("hello again")
+    assert tts._get_engine() is not service and tts._get_engine().running
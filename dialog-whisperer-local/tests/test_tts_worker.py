@@ -0,0 +1,131 @@
+"""Test the out-of-process synthesis worker."""
+
+import numpy as np
+import pytest
+from dialog_whisperer.tts_worker import SynthesisWorker
+
+class FakeModel:
+    """Produces one sample per character so results are predictable."""
+    synthesizer = type("Synth", (), {"output_sample_rate": 16000})()
+
+    def tts(self, text, speed=None):
+        if text == "fail":
+            raise RuntimeError("bad text")
+        if text == "hang":
+            import time
+            time.sleep(30)
+        return [0.1 * (speed or 1.0)] * len(text)
+
+def fake_factory(model_name, use_gpu):
+    return FakeModel()
+
+def test_worker_returns_pcm_through_shared_memory():
+    """Audio synthesized in the child comes back intact; errors are raised here."""
+    worker = SynthesisWorker(model_factory=fake_factory, start_timeout=30)
+    worker.start()
+    try:
+        audio, sr = worker.synthesize("hello")
+        assert sr == 16000
+        assert audio.dtype == np.float32 and len(audio) == 5
+        audio, _ = worker.synthesize("hi", speed=2.0)
+        assert np.allclose(audio, 0.2)
+        with pytest.raises(RuntimeError):
+            worker.synthesize("fail")
+        # The worker keeps serving after a failed request
+        assert len(worker.synthesize("again")[0]) == 5
+    finally:
+        worker.shutdown()
+    assert not worker.running
+
+def test_hung_worker_times_out_and_is_replaced(monkeypatch):
+    """A request past request_timeout stops the child; the next call gets a new worker."""
+    from dialog_whisperer import tts_coqui, tts_worker
+    worker = SynthesisWorker(model_factory=fake_factory, start_timeout=30, request_timeout=0.5)
+    worker.start()
+    try:
+        with pytest.raises(RuntimeError, match="did not answer"):
+            worker.synthesize("hang")
+        assert not worker.running
+        with pytest.raises(RuntimeError, match="not running"):
+            worker.synthesize("hello")
+    finally:
+        worker.shutdown()
+
+    class FreshWorker:
+        running = True
+
+        def __init__(self, **kwargs):
+            self.started = False
+
+        def start(self):
+            self.started = True
+
+    monkeypatch.setattr(tts_worker, "SynthesisWorker", FreshWorker)
+    monkeypatch.setattr(tts_coqui, "_worker", worker)
+    replacement = tts_coqui._get_worker()
+    assert isinstance(replacement, FreshWorker) and replacement.started
+    assert tts_coqui._get_worker() is replacement
+
+def block_exists(name):
+    from multiprocessing import shared_memory
+    try:
+        shared_memory.SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+class StaleConn:
+    """Answers every request with a fixed reply."""
+    def __init__(self, reply):
+        self.reply = reply
+
+    def send(self, msg):
+        pass
+
+    def poll(self, timeout):
+        return True
+
+    def recv(self):
+        return self.reply
+
+def test_shared_memory_is_released_on_stale_reply_and_timeout():
+    """No block outlives its request, whether the reply is used, mismatched or never comes."""
+    from multiprocessing import shared_memory
+    worker = SynthesisWorker(model_factory=fake_factory, start_timeout=30, request_timeout=0.5)
+    worker.start()
+    try:
+        worker.synthesize("hello")
+        assert not block_exists(worker._block_name(worker._ids))
+
+        # A reply left over from an earlier request carries its own block
+        stale = shared_memory.SharedMemory(create=True, size=8)
+        stale.close()
+        real_conn = worker._conn
+        worker._conn = StaleConn(("audio", 0, (stale.name, 2, 16000)))
+        with pytest.raises(RuntimeError, match="synthesis failed"):
+            worker.synthesize("hello")
+        worker._conn = real_conn
+        assert not block_exists(stale.name)
+
+        with pytest.raises(RuntimeError, match="did not answer"):
+            worker.synthesize("hang")
+        assert not block_exists(worker._block_name(worker._ids))
+    finally:
+        worker.shutdown()
+
+def test_synthesize_many_joins_lines_back_to_back():
+    """Batched lines are joined back to back; a gap of silence is optional."""
+    from dialog_whisperer import tts_coqui
+    audio, sr = tts_coqui.synthesize_many(FakeModel(), ["abc", "de"])
+    assert len(audio) == 5 and np.all(audio != 0)
+    audio, sr = tts_coqui.synthesize_many(FakeModel(), ["abc", "de"], gap=0.12)
+    gap = int(sr * 0.12)
+    assert len(audio) == 5 + gap
+    assert np.all(audio[3:3 + gap] == 0)
+
+def test_real_time_factor():
+    """RTF is synthesis time over audio duration."""
+    from dialog_whisperer import tts_coqui
+    result = tts_coqui.real_time_factor(FakeModel(), ["a" * 16000, "b" * 8000], repeat=2)
+    assert result["audio_seconds"] == pytest.approx(1.5)
+    assert 0 < result["rtf"] < 1